@@ -5,86 +5,192 @@ Generates comprehensive PDF documentation for RAG system implementation
 """
 
 import os
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timezone
+from itertools import chain, islice
 
+from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT
+from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import inch
 from reportlab.platypus import (
     PageBreak,
-    Paragraph,
     SimpleDocTemplate,
     Spacer,
     Table,
     TableStyle,
 )
 
+# Line breaks are memoized across builds (see homyhive/layout.py)
+from homyhive.layout import CachedParagraph as Paragraph
+from homyhive.layout import default_cache as default_layout_cache
 
-def create_homyhive_documentation():
-    """Create comprehensive HomyHive project documentation"""
+OUTPUT_PATH = "HomyHive_Project_Documentation.pdf"
 
-    # Create the PDF document
-    doc = SimpleDocTemplate(
-        "HomyHive_Project_Documentation.pdf",
-        pagesize=A4,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=18,
-    )
+# HomyHive brand palette, shared with the other PDF builders
+BRAND_RED = colors.HexColor("#fe424d")
+BRAND_TEXT = colors.HexColor("#333333")
+BRAND_SHADE = colors.HexColor("#f8f9fa")
+BRAND_BORDER = colors.HexColor("#dee2e6")
+
+
+def build_styles():
+    """Return the sample stylesheet extended with the HomyHive custom styles"""
 
-    # Define styles
     styles = getSampleStyleSheet()
 
-    # Custom styles
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontSize=24,
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        textColor=colors.HexColor("#fe424d"),
+    styles.add(
+        ParagraphStyle(
+            "CustomTitle",
+            parent=styles["Heading1"],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            textColor=BRAND_RED,
+        )
     )
 
-    heading_style = ParagraphStyle(
-        "CustomHeading",
-        parent=styles["Heading2"],
-        fontSize=16,
-        spaceAfter=12,
-        textColor=colors.HexColor("#fe424d"),
-        spaceBefore=20,
+    styles.add(
+        ParagraphStyle(
+            "CustomHeading",
+            parent=styles["Heading2"],
+            fontSize=16,
+            spaceAfter=12,
+            textColor=BRAND_RED,
+            spaceBefore=20,
+        )
     )
 
-    subheading_style = ParagraphStyle(
-        "CustomSubHeading",
-        parent=styles["Heading3"],
-        fontSize=14,
-        spaceAfter=8,
-        textColor=colors.HexColor("#333333"),
-        spaceBefore=12,
+    styles.add(
+        ParagraphStyle(
+            "CustomSubHeading",
+            parent=styles["Heading3"],
+            fontSize=14,
+            spaceAfter=8,
+            textColor=BRAND_TEXT,
+            spaceBefore=12,
+        )
     )
 
-    normal_style = ParagraphStyle(
-        "CustomNormal",
-        parent=styles["Normal"],
-        fontSize=11,
-        spaceAfter=6,
-        alignment=TA_JUSTIFY,
-        leading=14,
+    styles.add(
+        ParagraphStyle(
+            "CustomNormal",
+            parent=styles["Normal"],
+            fontSize=11,
+            spaceAfter=6,
+            alignment=TA_JUSTIFY,
+            leading=14,
+        )
     )
 
-    code_style = ParagraphStyle(
-        "Code",
-        parent=styles["Normal"],
-        fontSize=9,
-        fontName="Courier",
-        backgroundColor=colors.HexColor("#f8f9fa"),
-        borderColor=colors.HexColor("#dee2e6"),
-        borderWidth=1,
-        borderPadding=6,
-        spaceAfter=8,
+    styles.add(
+        ParagraphStyle(
+            "CustomCode",
+            parent=styles["Normal"],
+            fontSize=9,
+            fontName="Courier",
+            backgroundColor=BRAND_SHADE,
+            borderColor=BRAND_BORDER,
+            borderWidth=1,
+            borderPadding=6,
+            spaceAfter=8,
+        )
     )
 
+    return styles
+
+
+class PageFurniture:
+    """Static page decoration drawn once and referenced from every page
+
+    draw(canvas, doc) paints the parts that never change (bands, rules, fixed
+    header/footer text). The first page that uses the furniture records them
+    into a PDF form XObject; every other page just references that form, so
+    output size and render time grow with content rather than page count.
+    per_page(canvas, doc), if given, adds what does change, like page numbers.
+    Instances are used as SimpleDocTemplate onPage callbacks.
+    """
+
+    def __init__(self, name, draw, per_page=None):
+        self.name = name
+        self.draw = draw
+        self.per_page = per_page
+
+    def __call__(self, canvas, doc):
+        canvas.saveState()
+        if not canvas.hasForm(self.name):
+            canvas.beginForm(self.name)
+            self.draw(canvas, doc)
+            canvas.endForm()
+        canvas.doForm(self.name)
+        if self.per_page:
+            self.per_page(canvas, doc)
+        canvas.restoreState()
+
+
+def _draw_cover_furniture(canvas, doc):
+    width, _ = doc.pagesize
+    canvas.setFillColor(BRAND_RED)
+    canvas.rect(0, 0, width, 12, stroke=0, fill=1)
+
+
+def _draw_body_furniture(canvas, doc):
+    width, height = doc.pagesize
+    canvas.setFillColor(BRAND_RED)
+    canvas.rect(0, height - 28, width, 28, stroke=0, fill=1)
+    canvas.setFillColor(colors.white)
+    canvas.setFont("Helvetica-Bold", 10)
+    canvas.drawString(doc.leftMargin, height - 18, "HomyHive")
+    canvas.setFont("Helvetica", 9)
+    canvas.drawRightString(
+        width - doc.rightMargin, height - 18, "Project Documentation"
+    )
+
+    canvas.setStrokeColor(BRAND_BORDER)
+    canvas.line(doc.leftMargin, 34, width - doc.rightMargin, 34)
+    canvas.setFillColor(BRAND_TEXT)
+    canvas.setFont("Helvetica", 8)
+    canvas.drawString(doc.leftMargin, 22, "HomyHive - Technical Documentation")
+
+
+def _draw_page_number(canvas, doc):
+    width, _ = doc.pagesize
+    canvas.setFillColor(BRAND_TEXT)
+    canvas.setFont("Helvetica", 8)
+    canvas.drawRightString(width - doc.rightMargin, 22, f"Page {doc.page}")
+
+
+COVER_FURNITURE = PageFurniture("HomyHiveCover", _draw_cover_furniture)
+BODY_FURNITURE = PageFurniture(
+    "HomyHiveBody", _draw_body_furniture, per_page=_draw_page_number
+)
+
+
+def generation_date(deterministic=False):
+    """Title page date; reproducible builds take it from SOURCE_DATE_EPOCH"""
+
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc).strftime("%B %d, %Y")
+    return "" if deterministic else datetime.now().strftime("%B %d, %Y")
+
+
+def build_story(styles, generated_on=None):
+    """Return the list of flowables making up the documentation
+
+    An empty generated_on leaves the date off the title page.
+    """
+
+    if generated_on is None:
+        generated_on = generation_date()
+
+    title_style = styles["CustomTitle"]
+    heading_style = styles["CustomHeading"]
+    subheading_style = styles["CustomSubHeading"]
+    normal_style = styles["CustomNormal"]
+    code_style = styles["CustomCode"]
+
     # Story elements
     story = []
 
@@ -95,10 +201,9 @@ def create_homyhive_documentation():
     story.append(Spacer(1, 20))
     story.append(Paragraph("For RAG System Implementation", styles["Heading3"]))
     story.append(Spacer(1, 40))
-    story.append(
-        Paragraph(f"Generated on: {datetime.now().strftime('%B %d, %Y')}", normal_style)
-    )
-    story.append(Spacer(1, 20))
+    if generated_on:
+        story.append(Paragraph(f"Generated on: {generated_on}", normal_style))
+        story.append(Spacer(1, 20))
     story.append(Paragraph("Project Owner: Nagashree-250804", normal_style))
     story.append(PageBreak())
 
@@ -121,7 +226,7 @@ def create_homyhive_documentation():
     toc_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -174,7 +279,7 @@ def create_homyhive_documentation():
     features_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -183,7 +288,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -213,7 +318,7 @@ def create_homyhive_documentation():
     tech_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -222,7 +327,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -314,7 +419,7 @@ def create_homyhive_documentation():
     middleware_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -323,7 +428,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -490,7 +595,7 @@ def create_homyhive_documentation():
     auth_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -499,7 +604,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -530,7 +635,7 @@ def create_homyhive_documentation():
     listing_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -539,7 +644,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -570,7 +675,7 @@ def create_homyhive_documentation():
     review_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -579,7 +684,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -618,7 +723,7 @@ def create_homyhive_documentation():
     static_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -627,7 +732,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -777,7 +882,7 @@ def create_homyhive_documentation():
     frontend_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -786,7 +891,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -919,7 +1024,7 @@ def create_homyhive_documentation():
     features_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("VALIGN", (0, 0), (-1, -1), "TOP"),
@@ -929,7 +1034,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -998,7 +1103,7 @@ def create_homyhive_documentation():
     content_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("VALIGN", (0, 0), (-1, -1), "TOP"),
@@ -1008,7 +1113,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -1142,7 +1247,7 @@ def create_homyhive_documentation():
     security_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -1151,7 +1256,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -1233,7 +1338,7 @@ def create_homyhive_documentation():
     cloud_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -1242,7 +1347,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -1343,7 +1448,7 @@ def create_homyhive_documentation():
     quality_table.setStyle(
         TableStyle(
             [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#fe424d")),
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
                 ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
                 ("ALIGN", (0, 0), (-1, -1), "LEFT"),
                 ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
@@ -1352,7 +1457,7 @@ def create_homyhive_documentation():
                     "ROWBACKGROUNDS",
                     (0, 1),
                     (-1, -1),
-                    [colors.white, colors.HexColor("#f8f9fa")],
+                    [colors.white, BRAND_SHADE],
                 ),
                 ("GRID", (0, 0), (-1, -1), 1, colors.black),
             ]
@@ -1415,26 +1520,217 @@ def create_homyhive_documentation():
         )
     )
 
-    # Build PDF
-    doc.build(story)
-    print("📄 HomyHive project documentation PDF generated successfully!")
-    print("📁 File saved as: HomyHive_Project_Documentation.pdf")
+    return list(with_font_fallback(story))
 
-    story.append(Spacer(1, 40))
-    story.append(Paragraph("End of Documentation", styles["Heading2"]))
-    story.append(Paragraph("End of Documentation", styles["Heading2"]))
-    story.append(Spacer(1, 20))
-    story.append(
-        Paragraph(
-            "This documentation provides comprehensive information about the HomyHive project for RAG system implementation. For technical support or questions, contact the development team.",
-            normal_style,
+
+def with_font_fallback(flowables):
+    """Yield flowables with uncovered characters set in fallback fonts
+
+    Helvetica and Courier have no emoji, box drawing or Indic glyphs; those
+    runs are switched to the first homyhive.fonts font that has them.
+    Flowables pass through unchanged when no fallback font is installed.
+    """
+
+    from homyhive.fonts import apply_fallback, default_chain, register_reportlab
+
+    try:
+        fallback = default_chain()
+    except ValueError:
+        yield from flowables
+        return
+    register_reportlab(fallback)
+    for flowable in flowables:
+        yield apply_fallback(flowable, fallback)
+
+
+class LazyFlowables:
+    """List-like view over an iterator of flowables, for doc.build()
+
+    reportlab's build loop consumes its story from the front (flowables[0],
+    del flowables[0]) and pushes split remainders back (flowables[0:0] = ...),
+    so a small look-ahead buffer is all it ever needs. Flowables are pulled
+    from the iterator as pages are laid out and dropped once drawn, so a story
+    can be arbitrarily long without being materialized.
+    """
+
+    LOOKAHEAD = 32
+
+    def __init__(self, flowables):
+        self._source = iter(flowables)
+        self._buffer = deque()
+        self._exhausted = False
+
+    def _fill(self, count):
+        while len(self._buffer) < count and not self._exhausted:
+            try:
+                self._buffer.append(next(self._source))
+            except StopIteration:
+                self._exhausted = True
+
+    def __len__(self):
+        # Only what is buffered counts, so keepWithNext never looks further
+        self._fill(self.LOOKAHEAD)
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            self._fill(index.stop if index.stop is not None else self.LOOKAHEAD)
+            return list(self._buffer)[index]
+        self._fill(index + 1)
+        return self._buffer[index]
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            for _ in range(len(range(*index.indices(len(self._buffer))))):
+                self._buffer.popleft()
+        elif index == 0:
+            self._buffer.popleft()
+        else:
+            del self._buffer[index]
+
+    def __setitem__(self, index, flowables):
+        if not (isinstance(index, slice) and index.start == index.stop == 0):
+            raise TypeError("LazyFlowables only supports prepending")
+        self._buffer.extendleft(reversed(list(flowables)))
+
+    def insert(self, index, flowable):
+        self._fill(index)
+        self._buffer.insert(index, flowable)
+
+
+def _listing_location(listing):
+    # Seeded listings store location as text, geocoded ones as an object
+    location = listing.get("location") or ""
+    if isinstance(location, dict):
+        location = location.get("address") or ""
+    parts = [location, listing.get("country") or ""]
+    return ", ".join(part for part in parts if part)
+
+
+def read_listings(path):
+    """Yield (title, location, price, rating) from a listings mongoexport"""
+
+    from homyhive import mongoexport
+
+    for listing in mongoexport.read_records(path):
+        price = mongoexport.value(listing.get("price")) or 0
+        rating = mongoexport.value(listing.get("averageRating"))
+        yield (
+            listing.get("title") or "",
+            _listing_location(listing),
+            float(price),
+            float(rating) if rating is not None else None,
         )
+
+
+def _clip(text, length):
+    return text if len(text) <= length else text[: length - 1] + "..."
+
+
+def catalogue_flowables(listings, styles, rows_per_table=50):
+    """Flowables for the listing catalogue appendix, generated lazily
+
+    listings is any iterable of (title, location, price, rating); only one
+    table's worth of rows is held at a time.
+    """
+
+    yield PageBreak()
+    yield Paragraph("Appendix: Listing Catalogue", styles["CustomHeading"])
+    header = ["Title", "Location", "Price / night", "Rating"]
+    listings = iter(listings)
+    total = 0
+    while True:
+        rows = list(islice(listings, rows_per_table))
+        if not rows:
+            break
+        total += len(rows)
+        data = [header] + [
+            [
+                _clip(title, 38),
+                _clip(location, 30),
+                f"INR {price:,.0f}",
+                f"{rating:.1f}" if rating is not None else "-",
+            ]
+            for title, location, price, rating in rows
+        ]
+        table = Table(
+            data, colWidths=[2.6 * inch, 2 * inch, 1.1 * inch, 0.7 * inch], repeatRows=1
+        )
+        table.setStyle(
+            TableStyle(
+                [
+                    ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
+                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                    ("FONTSIZE", (0, 0), (-1, -1), 8),
+                    ("TOPPADDING", (0, 0), (-1, -1), 2),
+                    ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+                    ("ALIGN", (2, 0), (-1, -1), "RIGHT"),
+                    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, BRAND_SHADE]),
+                    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+                ]
+            )
+        )
+        yield table
+    yield Spacer(1, 12)
+    yield Paragraph(f"{total:,} listings.", styles["CustomNormal"])
+
+
+def render_documentation(
+    story, output_path=OUTPUT_PATH, deterministic=False, compress=True, furniture=True
+):
+    """Lay out story into the documentation PDF at output_path
+
+    deterministic builds fix the embedded timestamps and document ID so the
+    same story always produces the same bytes. furniture adds the branded
+    header and footer (see PageFurniture).
+    """
+
+    # Create the PDF document
+    doc = SimpleDocTemplate(
+        output_path,
+        pagesize=A4,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=48,
+        pageCompression=1 if compress else 0,
+        invariant=1 if deterministic else 0,
     )
 
     # Build PDF
-    doc.build(story)
+    if furniture:
+        doc.build(story, onFirstPage=COVER_FURNITURE, onLaterPages=BODY_FURNITURE)
+    else:
+        doc.build(story)
+    default_layout_cache().save()
+
+
+def with_catalogue(story, styles, catalogue_path):
+    """story followed by the listing catalogue streamed from catalogue_path"""
+
+    appendix = with_font_fallback(
+        catalogue_flowables(read_listings(catalogue_path), styles)
+    )
+    return LazyFlowables(chain(story, appendix))
+
+
+def create_homyhive_documentation(
+    output_path=OUTPUT_PATH, deterministic=False, catalogue_path=None
+):
+    """Create comprehensive HomyHive project documentation
+
+    catalogue_path, a JSONL export of the listings collection, appends the
+    listing catalogue; it is streamed rather than loaded into memory.
+    """
+
+    styles = build_styles()
+    story = build_story(styles, generation_date(deterministic))
+    if catalogue_path:
+        story = with_catalogue(story, styles, catalogue_path)
+    render_documentation(story, output_path, deterministic)
     print("📄 HomyHive project documentation PDF generated successfully!")
-    print("📁 File saved as: HomyHive_Project_Documentation.pdf")
+    print(f"📁 File saved as: {output_path}")
 
 
 if __name__ == "__main__":
@@ -9,6 +9,7 @@ const session = require("express-session");
 const MongoStore = require("connect-mongo");
 const flash = require("connect-flash");
 const ExpressError = require("./utils/ExpressError");
+const { asset } = require("./utils/assets");
 
 // ✅ ADDITION (ADMIN BOOTSTRAP KE LIYE)
 const User = require("./models/user");
@@ -26,7 +27,11 @@ const paymentRouter = require("./routes/payment");
 const hostPaymentRouter = require("./routes/host_payment");
 
 // Middleware helpers
-const { attachSupabaseUser, injectChatbot } = require("./middleware");
+const {
+  attachSupabaseUser,
+  injectChatbot,
+  servePrecompressed,
+} = require("./middleware");
 
 const app = express();
 
@@ -76,6 +81,23 @@ app.set("views", path.join(__dirname, "views"));
 app.use(express.urlencoded({ extended: true }));
 app.use(express.json());
 app.use(methodOverride("_method"));
+// Content-addressed build outputs (homyhive/cas.py) never change in place
+const casDir = path.join(__dirname, "public", "static", "cas");
+const casCache = { immutable: true, maxAge: "1y" };
+app.use("/static/cas", servePrecompressed(casDir, { sendOptions: casCache }));
+app.use("/static/cas", express.static(casDir, casCache));
+// Minified, fingerprinted CSS/JS (homyhive/assets.py); views link them via asset()
+const distDir = path.join(__dirname, "public", "dist");
+app.use(
+  "/dist",
+  servePrecompressed(distDir, {
+    extensions: [".css", ".js"],
+    sendOptions: casCache,
+  }),
+);
+app.use("/dist", express.static(distDir, casCache));
+app.locals.asset = asset;
+app.use(servePrecompressed(path.join(__dirname, "public")));
 app.use(express.static(path.join(__dirname, "public")));
 
 // Session store
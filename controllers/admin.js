@@ -3,6 +3,7 @@
 
 const Host = require("../models/host");
 const Listing = require("../models/listing");
+const { derivedImage } = require("../utils/derivedImages");
 
 // -------------------------------
 // Display all host registration requests
@@ -60,7 +61,7 @@ module.exports.viewHostDetails = async (req, res) => {
     // ✅ Find associated listing
     const listing = await Listing.findOne({ host: id });
 
-    res.render("admin/host-detail", { host, listing });
+    res.render("admin/host-detail", { host, listing, derivedImage });
   } catch (error) {
     console.error("Error fetching host details:", error);
     req.flash("error", "Failed to fetch host details");
@@ -390,7 +391,7 @@ module.exports.viewPendingApprovals = async (req, res) => {
       applicationStatus: "pending-approval",
     }).sort({ createdAt: -1 });
 
-    res.render("admin/pending-approvals", { hosts });
+    res.render("admin/pending-approvals", { hosts, derivedImage });
   } catch (error) {
     console.error("Error fetching pending approvals:", error);
     req.flash("error", "Failed to fetch pending approvals");
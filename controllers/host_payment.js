@@ -2,6 +2,7 @@
 const razorpay = require("../utils/razorpay");
 const crypto = require("crypto");
 const Listing = require("../models/listing");
+const Promotion = require("../models/promotion");
 const wrapAsync = require("../utils/wrapAsync");
 const ExpressError = require("../utils/ExpressError");
 
@@ -64,10 +65,33 @@ module.exports.verifyPromotionPayment = wrapAsync(async (req, res) => {
       throw new ExpressError(404, "Listing not found");
     }
 
-    // Update listing with promotion expiry date
-    const now = new Date();
-    listing.promotionExpiresAt = new Date(now.setDate(now.getDate() + PROMOTION_DAYS));
-    await listing.save();
+    // A retried or double-submitted verification has already been applied
+    const recorded = await Promotion.exists({ paymentId: razorpay_payment_id });
+    if (!recorded) {
+      // Update listing with promotion expiry date
+      const now = new Date();
+      listing.promotionExpiresAt = new Date(now.setDate(now.getDate() + PROMOTION_DAYS));
+      await listing.save();
+
+      // Record the payment for receipts and host statements; an upsert on
+      // the unique paymentId so concurrent retries still record it once
+      await Promotion.updateOne(
+        { paymentId: razorpay_payment_id },
+        {
+          $setOnInsert: {
+            listing: listing._id,
+            host: listing.owner,
+            amount: PROMOTION_FEE,
+            days: PROMOTION_DAYS,
+            orderId: razorpay_order_id,
+            paymentStatus: "completed",
+            expiresAt: listing.promotionExpiresAt,
+            createdAt: new Date(),
+          },
+        },
+        { upsert: true },
+      );
+    }
 
     req.flash("success", "Promotion successful! Your listing will be featured for " + PROMOTION_DAYS + " days.");
     res.redirect(`/listings/${listingId}`);
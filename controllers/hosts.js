@@ -7,6 +7,11 @@ const multer = require("multer");
 const path = require("path");
 const fs = require("fs");
 const uploadToImgBB = require("../utils/imgbb");
+const { checkDuplicate } = require("../utils/duplicateCheck");
+const { offlineLookup } = require("../utils/offlineLookup");
+
+// Uploads checked against earlier submissions by the perceptual-hash service
+const ID_DOCUMENT_FIELDS = ["governmentId", "idFront", "idBack"];
 
 // ==========================================
 // RENDER HOST ONBOARDING PAGE
@@ -230,12 +235,19 @@ module.exports.handleDocumentUpload = async (req, res) => {
           const file = req.files[fieldName][0];
           const imageUrl = await uploadToImgBB(file);
           if (imageUrl) {
+            const duplicate = ID_DOCUMENT_FIELDS.includes(fieldName)
+              ? await checkDuplicate(
+                  file,
+                  `${host._id}:${fieldName}:${imageUrl}`,
+                )
+              : null;
             if (!host.documents) host.documents = {};
             host.documents[fieldName] = {
               filename: file.originalname,
               path: imageUrl, // Save ImgBB URL
               uploadedAt: new Date(),
               verificationStatus: "pending",
+              ...duplicate,
             };
           }
         }
@@ -314,15 +326,42 @@ module.exports.verifyPhone = async (req, res) => {
   }
 };
 
+// IFSC and PIN codes are checked against the offline lookup service; without
+// it the placeholder answers below are returned, as before
 module.exports.ifscLookup = async (req, res) => {
+  const code = req.body.ifscCode || req.body.ifsc;
+  const result = await offlineLookup("ifsc", code);
+  if (result && !result.found) {
+    return res
+      .status(404)
+      .json({ success: false, message: "Unknown IFSC code" });
+  }
+  if (result) {
+    return res.json({ success: true, source: "offline", data: result.data });
+  }
   res.json({
     success: true,
+    source: "mock",
     data: { bank: "Mock Bank", branch: "Mock Branch" },
   });
 };
 
 module.exports.pincodeVerify = async (req, res) => {
-  res.json({ success: true, data: { city: "Mock City", state: "Mock State" } });
+  const pincode = req.body.pinCode || req.body.pincode;
+  const result = await offlineLookup("pincode", pincode);
+  if (result && !result.found) {
+    return res
+      .status(404)
+      .json({ success: false, message: "Unknown PIN code" });
+  }
+  if (result) {
+    return res.json({ success: true, source: "offline", data: result.data });
+  }
+  res.json({
+    success: true,
+    source: "mock",
+    data: { city: "Mock City", state: "Mock State" },
+  });
 };
 
 // ==========================================
@@ -394,11 +433,16 @@ module.exports.verifyGovernmentId = async (req, res) => {
     const idFrontFile = req.files.idFront[0];
     const idFrontUrl = await uploadToImgBB(idFrontFile);
     if (idFrontUrl) {
+      const duplicate = await checkDuplicate(
+        idFrontFile,
+        `${host._id}:idFront:${idFrontUrl}`,
+      );
       host.documents = host.documents || {};
       host.documents.idFront = {
         path: idFrontUrl,
         filename: idFrontFile.originalname,
         uploadedAt: new Date(),
+        ...duplicate,
       };
       host.identification.idFront = idFrontFile.originalname;
     }
@@ -408,11 +452,16 @@ module.exports.verifyGovernmentId = async (req, res) => {
     const idBackFile = req.files.idBack[0];
     const idBackUrl = await uploadToImgBB(idBackFile);
     if (idBackUrl) {
+      const duplicate = await checkDuplicate(
+        idBackFile,
+        `${host._id}:idBack:${idBackUrl}`,
+      );
       host.documents = host.documents || {};
       host.documents.idBack = {
         path: idBackUrl,
         filename: idBackFile.originalname,
         uploadedAt: new Date(),
+        ...duplicate,
       };
       host.identification.idBack = idBackFile.originalname;
     }
@@ -1,8 +1,42 @@
 const Listing = require("../models/listing");
 const mbxGeocoding = require("@mapbox/mapbox-sdk/services/geocoding");
 const uploadToImgBB = require("../utils/imgbb");
+const { searchListings } = require("../utils/listingSearch");
+const { similarListingIds } = require("../utils/similarListings");
 const mapToken = process.env.MAP_TOKEN;
 const geocodingClient = mbxGeocoding({ accessToken: mapToken });
+const SIMILAR_LISTINGS_SHOWN = 4;
+
+function renderIndex(res, allListings, page) {
+  const now = new Date();
+  const promotedListings = allListings.filter(
+    (listing) => listing.promotionExpiresAt && listing.promotionExpiresAt > now,
+  );
+
+  const regularListings = allListings.filter(
+    (listing) =>
+      !listing.promotionExpiresAt || listing.promotionExpiresAt <= now,
+  );
+
+  res.render("listings/index.ejs", {
+    allListings,
+    promotedListings,
+    regularListings,
+    searchQuery: page.search || "",
+    categoryCounts: page.categoryCounts,
+    // Matches per category under the other filters (search service only)
+    facets: page.facets || null,
+    priceStats: page.priceStats || {
+      minPrice: 0,
+      maxPrice: 1000,
+      avgPrice: 100,
+    },
+    popularLocations: page.popularLocations,
+    filters: page.filters,
+    resultCount: allListings.length,
+    validCategories: page.validCategories,
+  });
+}
 
 // ✅ MODIFIED: Index function with flexible aggregation
 module.exports.index = async (req, res) => {
@@ -85,6 +119,28 @@ module.exports.index = async (req, res) => {
         sortOptions = { createdAt: -1 };
     }
 
+    // The search service answers from an index of the listings export;
+    // without it, filter and sort in MongoDB
+    const indexed = await searchListings(req.query);
+    if (indexed) {
+      const found = await Listing.find({ _id: { $in: indexed.ids } })
+        .populate("owner reviews")
+        .lean();
+      const byId = new Map(
+        found.map((listing) => [String(listing._id), listing]),
+      );
+      const allListings = indexed.ids.map((id) => byId.get(id)).filter(Boolean);
+      return renderIndex(res, allListings, {
+        search,
+        categoryCounts: indexed.categoryCounts,
+        facets: indexed.facets,
+        priceStats: indexed.priceStats,
+        popularLocations: indexed.popularLocations,
+        filters: { category, minPrice, maxPrice, guests, sortBy },
+        validCategories,
+      });
+    }
+
     // ✅ FIX: Flexible aggregation pipeline
     const allListings = await Listing.aggregate([
       // Apply basic filters first
@@ -125,16 +181,6 @@ module.exports.index = async (req, res) => {
     await Listing.populate(allListings, { path: "owner reviews" });
     console.log("allListings after populate:", allListings);
 
-    const promotedListings = allListings.filter(
-      (listing) =>
-        listing.promotionExpiresAt && listing.promotionExpiresAt > new Date(),
-    );
-
-    const regularListings = allListings.filter(
-      (listing) =>
-        !listing.promotionExpiresAt || listing.promotionExpiresAt <= new Date(),
-    );
-
     const categoryCounts = await Listing.aggregate([
       { $group: { _id: "$category", count: { $sum: 1 } } },
       { $sort: { count: -1 } },
@@ -157,20 +203,12 @@ module.exports.index = async (req, res) => {
       { $limit: 10 },
     ]);
 
-    res.render("listings/index.ejs", {
-      allListings,
-      promotedListings,
-      regularListings,
-      searchQuery: search || "",
+    renderIndex(res, allListings, {
+      search,
       categoryCounts,
-      priceStats: priceStats[0] || {
-        minPrice: 0,
-        maxPrice: 1000,
-        avgPrice: 100,
-      },
+      priceStats: priceStats[0],
       popularLocations,
       filters: { category, minPrice, maxPrice, guests, sortBy },
-      resultCount: allListings.length,
       validCategories,
     });
   } catch (error) {
@@ -262,6 +300,15 @@ module.exports.showListing = async (req, res) => {
 
     // Get current user from Supabase
     const currUser = req.session?.supabaseUser || null;
+
+    // Recommendations come from the precomputed neighbour table
+    const similarIds = await similarListingIds(id, SIMILAR_LISTINGS_SHOWN);
+    const similar = similarIds.length
+      ? await Listing.find({ _id: { $in: similarIds } }).lean()
+      : [];
+    const similarListings = similarIds
+      .map((similarId) => similar.find((l) => String(l._id) === similarId))
+      .filter(Boolean);
     
     console.log("=== SENDING TO TEMPLATE ===");
     console.log("Reviews to render:", reviews ? reviews.length : 0);
@@ -270,7 +317,8 @@ module.exports.showListing = async (req, res) => {
     res.render("listings/show.ejs", { 
       listing, 
       currUser,
-      reviews: reviews || []
+      reviews: reviews || [],
+      similarListings,
     });
   } catch (err) {
     console.error("Error in showListing:", err);
@@ -0,0 +1,9 @@
+"""
+HomyHive Python tooling
+Document generators, build helpers and offline data jobs for the HomyHive app
+"""
+
+import os
+
+# Repository root; the generator scripts live here, outside the package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,5 @@
+import sys
+
+from homyhive.cli import main
+
+sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Precomputed answers for head chat queries
+Most chat traffic asks the same few questions (cancellations, payments,
+hosting requirements, safety). This runs their searches ahead of time and
+publishes the results with the index, so the service answers them with a
+dict lookup:
+
+    python -m homyhive index answers                      # corpus questions
+    python -m homyhive index answers --log chat.jsonl --limit 500
+
+The questions are the question headings of the corpus (FAQ, help and policy
+pages) plus the most frequent messages of any chat logs given (JSON lines
+with a "message" or "query", or plain text lines), counted by query_key():
+lowercase words without stopwords, so "How do I cancel my booking?" and
+"cancel booking" are one entry. The HEAD_SIZE most frequent are kept.
+
+Results are the top CACHE_K after reranking. The answers file records, for
+every query term, a hash of the live chunks containing it (ids, metadata and
+source update times), and with each entry the index's chunk count and average
+length when it was computed. The file is referenced from the manifest like a
+segment, so replicas download it along with the segments. A snapshot only
+serves the entries whose terms' chunks are all unchanged; the service then
+recomputes the stale ones for the new generation in the background.
+
+The cache is approximate in two ways: entries survive changes to the
+collection statistics up to retrieval.ANSWER_DRIFT, and the freshness
+feature is scored as of the build, not the query. Needs numpy.
+"""
+
+import json
+from collections import Counter
+
+from homyhive import rerank
+from homyhive.retrieval import query_key
+
+ANSWERS_VERSION = 2
+# Questions kept, most frequent first
+HEAD_SIZE = 200
+# Results cached per question; searches asking for more run normally
+CACHE_K = 10
+# Time a build may spend reranking one question
+BUILD_BUDGET_MS = 1000
+
+
+def read_log(path):
+    """Yield the messages of a chat log"""
+
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line
+                continue
+            if isinstance(record, dict):
+                message = record.get("message") or record.get("query")
+                if isinstance(message, str):
+                    yield message
+            elif isinstance(record, str):
+                yield record
+
+
+def head_questions(snapshot, log_paths=(), limit=HEAD_SIZE):
+    """[question] worth precomputing, most frequent first"""
+
+    counts, phrasing = Counter(), {}
+
+    def count(text):
+        key = query_key(text)
+        if key:
+            counts[key] += 1
+            phrasing.setdefault(key, text.strip())
+
+    # A question heading counts as one asking; the logs say how often it's asked
+    for chunk in snapshot.chunks():
+        if chunk.get("section", "").endswith("?"):
+            count(chunk["section"])
+    for path in log_paths:
+        for message in read_log(path):
+            count(message)
+    ranked = sorted(counts, key=lambda key: (-counts[key], key))
+    return [phrasing[key] for key in ranked[:limit]]
+
+
+def refresh(index, questions=None):
+    """Recompute the answers that are stale for the index's current snapshot
+
+    questions replaces the published set; by default it is kept. Answers
+    still valid are reused. Returns stats, or None when there is nothing to
+    compute or the index changed while computing (the next refresh retries).
+    """
+
+    snapshot = index.snapshot
+    previous = snapshot.answer_cache
+    if questions is None:
+        if not previous:
+            return None
+        questions = [entry["query"] for entry in previous["answers"].values()]
+
+    answers, computed = {}, 0
+    for question in questions:
+        key = query_key(question)
+        if not key or key in answers:
+            continue
+        if key in snapshot.answers:
+            answers[key] = snapshot.answers[key]
+            continue
+        hits, reranked = rerank.search(
+            snapshot, question, CACHE_K, budget_ms=BUILD_BUDGET_MS
+        )
+        answers[key] = {
+            "query": question,
+            "reranked": reranked,
+            "stats": snapshot.stats(),
+            "results": [
+                dict(chunk, score=round(score, 4)) for score, chunk in hits
+            ],
+        }
+        computed += 1
+
+    terms = sorted({term for key in answers for term in key.split()})
+    answers_id = index.write_answers(
+        {
+            "version": ANSWERS_VERSION,
+            "generation": snapshot.generation,
+            "k": CACHE_K,
+            "fingerprints": snapshot.fingerprints(terms),
+            "answers": answers,
+        }
+    )
+    if answers_id is None:
+        return None
+    return {
+        "id": answers_id,
+        "generation": snapshot.generation,
+        "questions": len(answers),
+        "computed": computed,
+        "kept": len(answers) - computed,
+    }
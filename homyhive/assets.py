@@ -0,0 +1,346 @@
+"""
+Static asset build for public/
+Minifies the site's CSS and JavaScript, writes content-hash fingerprinted
+copies under public/dist with gzip/brotli variants, and records them in
+public/dist/manifest.json ("/css/style.css" -> "/dist/css/style.<hash>.css").
+The EJS layouts resolve asset URLs through that manifest (utils/assets.js), so
+fingerprinted files can be served with immutable long-cache headers.
+
+    python -m homyhive assets
+
+Files are processed in parallel and skipped when their source hash matches
+the manifest. Standard library only (brotli variants need the brotli package).
+"""
+
+import glob
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from homyhive import ROOT, webpdf
+
+PUBLIC_DIR = "public"
+DIST_DIR = os.path.join(PUBLIC_DIR, "dist")
+MANIFEST_NAME = "manifest.json"
+
+SOURCES = ["css/*.css", "js/*.js", "chatbot/*.css", "chatbot/*.js"]
+
+# Bump when the minifiers change so every asset is rebuilt
+MINIFIER_VERSION = "1"
+
+FINGERPRINT_CHARS = 10
+
+# Characters around which whitespace carries no meaning
+_CSS_PUNCTUATION = set("{};,>")
+_JS_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "void"}
+
+
+def _scan_string(source, i, quote):
+    """Index just past the string literal starting at source[i]"""
+
+    i += 1
+    while i < len(source):
+        if source[i] == "\\":
+            i += 2
+            continue
+        if source[i] == quote:
+            return i + 1
+        i += 1
+    return i
+
+
+def minify_css(source):
+    """Drop comments and redundant whitespace, leaving strings intact"""
+
+    out, i, pending_space = [], 0, False
+    while i < len(source):
+        ch = source[i]
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = len(source) if end < 0 else end + 2
+            pending_space = True
+            continue
+        if ch.isspace():
+            pending_space = True
+            i += 1
+            continue
+        if pending_space and out and out[-1][-1] not in _CSS_PUNCTUATION:
+            if ch not in _CSS_PUNCTUATION:
+                out.append(" ")
+        pending_space = False
+        if ch in "\"'":
+            end = _scan_string(source, i, ch)
+            out.append(source[i:end])
+            i = end
+            continue
+        if ch == "}" and out and out[-1] == ";":
+            out.pop()
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def minify_js(source):
+    """Conservative JavaScript minifier
+
+    Removes comments and indentation and collapses whitespace runs, but keeps
+    line breaks so automatic semicolon insertion behaves exactly as before.
+    String, template and regex literals are copied verbatim.
+    """
+
+    out = []
+    i, n = 0, len(source)
+    # Brace depth at which each open `${` returns to its template literal
+    template_stack = []
+    depth = 0
+    last = ""  # last significant character emitted
+
+    def emit_space(newline):
+        if not out:
+            return
+        if newline:
+            while out and out[-1] == " ":
+                out.pop()
+            if out and out[-1] != "\n":
+                out.append("\n")
+        elif out[-1] not in " \n":
+            out.append(" ")
+
+    while i < n:
+        ch = source[i]
+        if ch == "`":
+            end = _scan_template(source, i)
+            out.append(source[i:end])
+            i = end
+            if source.startswith("${", i - 2):
+                template_stack.append(depth)
+                depth += 1
+            last = "`"
+            continue
+        if ch == "}" and template_stack and depth - 1 == template_stack[-1]:
+            template_stack.pop()
+            depth -= 1
+            end = _scan_template(source, i)
+            out.append(source[i:end])
+            i = end
+            if source.startswith("${", i - 2):
+                template_stack.append(depth)
+                depth += 1
+            last = "`"
+            continue
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            block = source[i : n if end < 0 else end + 2]
+            i = n if end < 0 else end + 2
+            emit_space("\n" in block)
+            continue
+        if ch.isspace():
+            j = i
+            while j < n and source[j].isspace():
+                j += 1
+            emit_space("\n" in source[i:j])
+            i = j
+            continue
+        if ch in "\"'":
+            end = _scan_string(source, i, ch)
+            out.append(source[i:end])
+            i = end
+            last = ch
+            continue
+        if ch == "/" and _regex_allowed(out, last):
+            end = _scan_regex(source, i)
+            out.append(source[i:end])
+            i = end
+            last = "/"
+            continue
+        if out and out[-1] == " " and len(out) > 1:
+            # Keep the space only between two identifier-ish characters
+            before = out[-2][-1]
+            if not (_word_char(before) and _word_char(ch)) and not (
+                before in "+-" and ch == before
+            ):
+                out.pop()
+        if ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+        out.append(ch)
+        last = ch
+        i += 1
+    return "".join(out).strip() + "\n"
+
+
+def _regex_allowed(out, last):
+    """Whether a "/" after the emitted output starts a regex literal"""
+
+    if not last or last in _JS_REGEX_PRECEDERS:
+        return True
+    tail = "".join(out[-12:]).rstrip()
+    word = ""
+    while tail and _word_char(tail[-1]):
+        word = tail[-1] + word
+        tail = tail[:-1]
+    return word in _JS_REGEX_KEYWORDS
+
+
+def _word_char(ch):
+    return ch.isalnum() or ch in "_$" or ord(ch) > 127
+
+
+def _scan_template(source, i):
+    """Index just past the template chunk starting at source[i] (` or })
+
+    Stops after the closing backtick, or after a `${` that opens an
+    embedded expression.
+    """
+
+    i += 1
+    while i < len(source):
+        if source[i] == "\\":
+            i += 2
+            continue
+        if source[i] == "`":
+            return i + 1
+        if source.startswith("${", i):
+            return i + 2
+        i += 1
+    return i
+
+
+def _scan_regex(source, i):
+    """Index just past the regex literal (and flags) starting at source[i]"""
+
+    i += 1
+    in_class = False
+    while i < len(source) and source[i] != "\n":
+        ch = source[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            i += 1
+            while i < len(source) and _word_char(source[i]):
+                i += 1
+            return i
+        i += 1
+    return i
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def source_hash(path):
+    digest = hashlib.sha256(MINIFIER_VERSION.encode())
+    with open(path, "rb") as handle:
+        digest.update(handle.read())
+    return digest.hexdigest()
+
+
+def build_asset(source, target_dir, root=ROOT):
+    """Minify, fingerprint and precompress one asset (runs in a worker)
+
+    Returns (public URL, fingerprinted URL, original bytes, minified bytes).
+    """
+
+    with open(source, encoding="utf-8") as handle:
+        text = handle.read()
+    stem, ext = os.path.splitext(os.path.basename(source))
+    minified = MINIFIERS[ext](text).encode("utf-8")
+    fingerprint = hashlib.sha256(minified).hexdigest()[:FINGERPRINT_CHARS]
+
+    os.makedirs(target_dir, exist_ok=True)
+    target = os.path.join(target_dir, f"{stem}.{fingerprint}{ext}")
+    if not os.path.exists(target):
+        with open(target + ".tmp", "wb") as handle:
+            handle.write(minified)
+        os.replace(target + ".tmp", target)
+        webpdf.precompress(target)
+
+    public = os.path.join(root, PUBLIC_DIR)
+    url = "/" + os.path.relpath(source, public).replace(os.sep, "/")
+    dist_url = "/" + os.path.relpath(target, public).replace(os.sep, "/")
+    return url, dist_url, len(text.encode("utf-8")), len(minified)
+
+
+def load_manifest(root=ROOT):
+    try:
+        with open(os.path.join(root, DIST_DIR, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, root=ROOT):
+    path = os.path.join(root, DIST_DIR, MANIFEST_NAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def list_sources(root=ROOT):
+    public = os.path.join(root, PUBLIC_DIR)
+    paths = set()
+    for pattern in SOURCES:
+        paths.update(glob.glob(os.path.join(public, pattern)))
+    return sorted(paths)
+
+
+def build_assets(root=ROOT, jobs=None, force=False):
+    """Rebuild changed assets; returns a stats dict
+
+    The manifest keeps a `sources` section with each input's hash, which is
+    what makes unchanged files free on the next run.
+    """
+
+    started = time.perf_counter()
+    manifest = load_manifest(root)
+    assets = manifest.setdefault("assets", {})
+    hashes = manifest.setdefault("sources", {})
+    public = os.path.join(root, PUBLIC_DIR)
+
+    todo = []
+    for source in list_sources(root):
+        url = "/" + os.path.relpath(source, public).replace(os.sep, "/")
+        digest = source_hash(source)
+        target = assets.get(url)
+        fresh = target and os.path.exists(os.path.join(public, target.lstrip("/")))
+        if force or hashes.get(url) != digest or not fresh:
+            todo.append((source, digest))
+
+    original = minified = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = []
+            for source, digest in todo:
+                subdir = os.path.dirname(os.path.relpath(source, public))
+                target_dir = os.path.join(root, DIST_DIR, subdir)
+                futures.append(
+                    (digest, pool.submit(build_asset, source, target_dir, root))
+                )
+            for digest, future in futures:
+                url, dist_url, before, after = future.result()
+                assets[url] = dist_url
+                hashes[url] = digest
+                original += before
+                minified += after
+        save_manifest(manifest, root)
+
+    return {
+        "assets": len(assets),
+        "rebuilt": len(todo),
+        "original_bytes": original,
+        "minified_bytes": minified,
+        "seconds": time.perf_counter() - started,
+    }
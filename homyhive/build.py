@@ -0,0 +1,270 @@
+"""
+Incremental multi-document build
+Declares every generated artifact, its input files and the targets it depends
+on as a DAG, runs independent targets concurrently in a process pool and skips
+targets whose inputs hash the same as on the last successful build.
+
+    python -m homyhive build              # everything that changed
+    python -m homyhive build docs --force # one target, unconditionally
+"""
+
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from homyhive import ROOT, cas, webpdf
+
+STATE_PATH = os.path.join("build", "state.json")
+# Listings export appended to the documentation as a catalogue when present
+CATALOGUE_EXPORT = os.path.join("exports", "listings.jsonl")
+
+
+class Target:
+    """One buildable artifact
+
+    `inputs` are glob patterns relative to the repo root (a pattern matching
+    nothing is fine: optional inputs count once they exist), `env` names
+    environment variables the output depends on, `deps` name other targets
+    whose outputs feed this one, and `action` is a module-level function
+    taking the absolute output path followed by the output paths of `deps`
+    (so it can run in a worker). Published targets are also copied into the
+    content-addressed store.
+    """
+
+    def __init__(
+        self, name, output, inputs, action, deps=(), env=(), publish=False
+    ):
+        self.name = name
+        self.output = output
+        self.inputs = list(inputs)
+        self.action = action
+        self.deps = tuple(deps)
+        self.env = tuple(env)
+        self.publish = publish
+
+    def input_files(self, root=ROOT):
+        files = set()
+        for pattern in self.inputs:
+            files.update(glob.glob(os.path.join(root, pattern), recursive=True))
+        return sorted(files)
+
+
+def _build_docs(output_path):
+    import HomyHive_Project_Documentation as documentation
+
+    styles = documentation.build_styles()
+    story = documentation.build_story(styles, documentation.generation_date(True))
+    catalogue_path = os.path.join(ROOT, CATALOGUE_EXPORT)
+    if os.path.exists(catalogue_path):
+        story = documentation.with_catalogue(story, styles, catalogue_path)
+    documentation.render_documentation(story, output_path, deterministic=True)
+    webpdf.prepare(output_path)
+
+
+def _build_privacy(output_path):
+    import generate_privacy_pdf
+
+    generate_privacy_pdf.create_privacy_pdf(output_path, deterministic=True)
+    webpdf.prepare(output_path)
+
+
+def _build_corpus(output_path):
+    from homyhive import corpus
+
+    corpus.write_corpus(corpus.build_corpus(), output_path)
+
+
+def _build_intents(output_path, corpus_path):
+    from homyhive import corpus, intents
+
+    chunks = list(corpus.read_corpus(corpus_path))
+    intents.write_router(intents.compile_router(chunks=chunks), output_path)
+
+
+TARGETS = {
+    target.name: target
+    for target in (
+        Target(
+            "docs",
+            "HomyHive_Project_Documentation.pdf",
+            [
+                "HomyHive_Project_Documentation.py",
+                "homyhive/layout.py",
+                "homyhive/fonts.py",
+                "homyhive/webpdf.py",
+                "homyhive/mongoexport.py",
+                CATALOGUE_EXPORT,
+            ],
+            _build_docs,
+            env=["SOURCE_DATE_EPOCH"],
+            publish=True,
+        ),
+        Target(
+            "privacy",
+            "public/static/privacy.pdf",
+            ["generate_privacy_pdf.py", "homyhive/webpdf.py"],
+            _build_privacy,
+            env=["SOURCE_DATE_EPOCH"],
+            publish=True,
+        ),
+        Target(
+            "corpus",
+            "build/corpus.jsonl",
+            ["homyhive/corpus.py", "*.md", "views/static/*.ejs"],
+            _build_corpus,
+        ),
+        Target(
+            "intents",
+            "build/intents/router.json",
+            ["homyhive/intents.py"],
+            _build_intents,
+            deps=["corpus"],
+        ),
+    )
+}
+
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def input_hash(target, output_hashes, root=ROOT):
+    """Hash of everything that determines a target's output"""
+
+    digest = hashlib.sha256(target.action.__qualname__.encode())
+    for path in target.input_files(root):
+        digest.update(os.path.relpath(path, root).encode())
+        digest.update(hash_file(path).encode())
+    for name in target.env:
+        digest.update(f"{name}={os.environ.get(name, '')}".encode())
+    for dep in target.deps:
+        digest.update(f"{dep}={output_hashes.get(dep, '')}".encode())
+    return digest.hexdigest()
+
+
+def load_state(root=ROOT):
+    try:
+        with open(os.path.join(root, STATE_PATH), encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, root=ROOT):
+    path = os.path.join(root, STATE_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def select(names, targets=TARGETS):
+    """Requested targets plus everything they transitively depend on"""
+
+    selected, stack = set(), list(names or targets)
+    while stack:
+        name = stack.pop()
+        if name not in targets:
+            raise KeyError(f"unknown build target '{name}'")
+        if name not in selected:
+            selected.add(name)
+            stack.extend(targets[name].deps)
+    return selected
+
+
+def _run_target(target, root, dep_outputs=()):
+    """Worker-side entry point; returns (output hash, seconds)"""
+
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    output_path = os.path.join(root, target.output)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    started = time.perf_counter()
+    target.action(output_path, *dep_outputs)
+    return hash_file(output_path), time.perf_counter() - started
+
+
+def build(names=None, jobs=None, force=False, targets=TARGETS, root=ROOT):
+    """Build the selected targets in dependency order; returns a results dict
+
+    Each result is "built", "fresh" or "failed: <error>".
+    """
+
+    selected = select(names, targets)
+    state = load_state(root)
+    output_hashes = {name: entry.get("output") for name, entry in state.items()}
+    pending = {name: set(targets[name].deps) & selected for name in selected}
+    results, running = {}, {}
+
+    def schedule(pool):
+        # Loop because skipping a fresh target can make its dependents ready
+        ready = sorted(n for n, deps in pending.items() if not deps)
+        while ready:
+            name = ready.pop(0)
+            del pending[name]
+            target = targets[name]
+            digest = input_hash(target, output_hashes, root)
+            output_path = os.path.join(root, target.output)
+            entry = state.get(name, {})
+            if (
+                not force
+                and entry.get("input") == digest
+                and os.path.exists(output_path)
+                and hash_file(output_path) == entry.get("output")
+            ):
+                finish(name, "fresh")
+                ready = sorted(n for n, deps in pending.items() if not deps)
+                continue
+            dep_outputs = [
+                os.path.join(root, targets[dep].output) for dep in target.deps
+            ]
+            future = pool.submit(_run_target, target, root, dep_outputs)
+            running[future] = (name, digest)
+
+    def finish(name, result):
+        results[name] = result
+        for deps in pending.values():
+            deps.discard(name)
+
+    def fail(name, reason):
+        # Dependents can't be built from a missing output
+        results[name] = reason
+        for dependent in [n for n in pending if name in targets[n].deps]:
+            del pending[dependent]
+            fail(dependent, f"failed: needs {name}")
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        schedule(pool)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, digest = running.pop(future)
+                try:
+                    output_hash, seconds = future.result()
+                except Exception as err:
+                    fail(name, f"failed: {err}")
+                    continue
+                output_hashes[name] = output_hash
+                state[name] = {
+                    "input": digest,
+                    "output": output_hash,
+                    "seconds": round(seconds, 3),
+                }
+                if targets[name].publish:
+                    output_path = os.path.join(root, targets[name].output)
+                    state[name]["url"] = cas.store(output_path, root=root)
+                finish(name, "built")
+            schedule(pool)
+
+    save_state(state, root)
+    if pending:
+        raise ValueError(f"dependency cycle between {', '.join(sorted(pending))}")
+    return results
@@ -0,0 +1,70 @@
+"""
+Content-addressed storage for generated files under public/
+Each stored file lands at public/static/cas/<digest>/<name>, so its URL only
+changes when its bytes do and it can be served with an immutable long-cache
+header. manifest.json maps logical names to the current URLs.
+"""
+
+import hashlib
+import json
+import os
+
+from homyhive import ROOT, webpdf
+
+PUBLIC_DIR = "public"
+CAS_DIR = os.path.join(PUBLIC_DIR, "static", "cas")
+MANIFEST_NAME = "manifest.json"
+
+# Hex digits of the SHA-256 used in stored paths
+DIGEST_CHARS = 16
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _url(path, root):
+    relative = os.path.relpath(path, os.path.join(root, PUBLIC_DIR))
+    return "/" + relative.replace(os.sep, "/")
+
+
+def load_manifest(root=ROOT, cas_dir=CAS_DIR):
+    try:
+        with open(os.path.join(root, cas_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, root=ROOT, cas_dir=CAS_DIR):
+    path = os.path.join(root, cas_dir, MANIFEST_NAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def store(path, name=None, root=ROOT, cas_dir=CAS_DIR):
+    """Copy path into the store and record it under name; returns its URL
+
+    Storing identical bytes again is a no-op apart from the manifest entry.
+    Precompressed variants next to path are stored alongside it.
+    """
+
+    name = name or os.path.basename(path)
+    digest = file_digest(path)[:DIGEST_CHARS]
+    target = os.path.join(root, cas_dir, digest, os.path.basename(name))
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        webpdf.copy_with_variants(path, target)
+
+    url = _url(target, root)
+    manifest = load_manifest(root, cas_dir)
+    if manifest.get(name) != url:
+        manifest[name] = url
+        save_manifest(manifest, root, cas_dir)
+    return url
@@ -0,0 +1,745 @@
+"""
+Unified command line for the HomyHive document generators
+
+    python -m homyhive docs [--output PATH] [--catalogue LISTINGS] [--deterministic]
+    python -m homyhive privacy [--output PATH] [--deterministic] [--web] [--store]
+    python -m homyhive corpus [--output PATH]
+    python -m homyhive build [TARGET ...] [--force]
+    python -m homyhive images [--watch]
+    python -m homyhive phash index|query PATH|serve
+    python -m homyhive assets [--force]
+    python -m homyhive receipts EXPORT... [--output-dir DIR | --combined PDF]
+    python -m homyhive statements EXPORT_DIR [--month YYYY-MM]
+    python -m homyhive legal [--force]
+    python -m homyhive search EXPORT_DIR [--query QUERY | --serve]
+    python -m homyhive lookup compile|get KIND KEY|serve
+    python -m homyhive similar EXPORT_DIR [--full] [--show LISTING_ID]
+    python -m homyhive pricing EXPORT_DIR | --bench
+    python -m homyhive index sync|merge|stats|search QUERY|serve|pull [--primary URL]
+    python -m homyhive index answers [--log CHAT_LOG ...] [--limit N]
+    python -m homyhive intents [--check MESSAGE ...]
+    python -m homyhive bench [--runs N]
+
+Only the standard library is imported at startup. Each subcommand imports its
+own PDF stack when it runs, so `--help` and `corpus` never load reportlab or
+fpdf; `bench` checks that this stays true.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from homyhive import ROOT
+
+# Modules that must not be loaded by help or corpus-only invocations
+HEAVY_MODULES = ("reportlab", "fpdf")
+
+
+def _ensure_root_on_path():
+    # The generator scripts live at the repository root, outside the package
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def _publish(args, output_path):
+    if args.web:
+        from homyhive import webpdf
+
+        webpdf.prepare(output_path)
+        for variant in webpdf.variants(output_path):
+            print(f"🗜️  {variant} ({os.path.getsize(variant):,} bytes)")
+    if args.store:
+        from homyhive import cas
+
+        print(f"🔒 Stored as {cas.store(output_path)}")
+
+
+def cmd_docs(args):
+    _ensure_root_on_path()
+    import HomyHive_Project_Documentation as documentation
+
+    output_path = args.output or documentation.OUTPUT_PATH
+    documentation.create_homyhive_documentation(
+        output_path, args.deterministic, catalogue_path=args.catalogue
+    )
+    _publish(args, output_path)
+
+
+def cmd_privacy(args):
+    _ensure_root_on_path()
+    import generate_privacy_pdf
+
+    output_path = args.output or generate_privacy_pdf.OUTPUT_PATH
+    generate_privacy_pdf.create_privacy_pdf(output_path, args.deterministic)
+    print(f"📁 File saved as: {output_path}")
+    _publish(args, output_path)
+
+
+def cmd_corpus(args):
+    from homyhive import corpus
+
+    chunks = corpus.build_corpus()
+    output_path = args.output or corpus.OUTPUT_PATH
+    corpus.write_corpus(chunks, output_path)
+    print(f"📚 {len(chunks)} corpus chunks written to {output_path}")
+
+
+def cmd_build(args):
+    from homyhive import build
+
+    started = time.perf_counter()
+    results = build.build(args.targets, jobs=args.jobs, force=args.force)
+    for name, result in sorted(results.items()):
+        print(f"  {name:<10} {result}")
+    print(f"🏗️  Build finished in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return 1 if any(r.startswith("failed") for r in results.values()) else 0
+
+
+def _print_image_stats(stats):
+    saved = 0
+    if stats["source_bytes"]:
+        saved = 1 - stats["thumb_bytes"] / stats["source_bytes"]
+    print(
+        f"🖼️  {stats['sources']} uploads ({stats['unique']} unique),"
+        f" {stats['rendered']} rendered in {stats['seconds']:.2f} s;"
+        f" thumbnails are {saved:.0%} smaller"
+    )
+    for digest, error in stats["failed"].items():
+        print(f"  ❌ {digest}: {error}")
+
+
+def cmd_images(args):
+    from homyhive import images
+
+    if args.watch:
+        print(f"👀 Watching {images.SOURCE_DIR} every {args.interval:g} s")
+        try:
+            images.watch(
+                interval=args.interval, jobs=args.jobs, report=_print_image_stats
+            )
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    stats = images.process(images.list_sources(), jobs=args.jobs)
+    _print_image_stats(stats)
+    return 1 if stats["failed"] else 0
+
+
+def cmd_phash(args):
+    from homyhive import phash
+
+    if args.action == "query" and not args.path:
+        print("❌ Usage: phash query PATH")
+        return 2
+
+    # query and serve use the saved index; only `index` (or a missing index)
+    # hashes the uploads again
+    index_path = os.path.join(ROOT, phash.INDEX_PATH)
+    if args.action == "index" or not os.path.exists(index_path):
+        started = time.perf_counter()
+        index, hashed = phash.index_uploads(jobs=args.jobs)
+        print(
+            f"🧬 {len(index.table)} uploads indexed ({hashed} newly hashed)"
+            f" in {time.perf_counter() - started:.2f} s"
+        )
+    else:
+        index = phash.DuplicateIndex.load(index_path)
+
+    if args.action == "serve":
+        phash.serve(index, port=args.port)
+    elif args.action == "query":
+        try:
+            value = phash.hash_file(args.path)
+        except OSError as err:
+            print(f"❌ {err}")
+            return 1
+        started = time.perf_counter()
+        matches = index.check(value, radius=args.radius)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🔎 {value:016x}: {len(matches)} matches in {elapsed:.3f} ms")
+        for match in matches:
+            print(f"  {match['distance']:2d}  {match['key']}")
+
+
+def _median_ms(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1000
+
+
+def _time_command(argv, runs):
+    import subprocess
+
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "homyhive", *argv],
+            cwd=ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        samples.append(time.perf_counter() - started)
+    return _median_ms(samples)
+
+
+def _heavy_modules_loaded(argv):
+    """Run argv in a fresh interpreter and report which heavy modules it loaded"""
+
+    import json
+    import subprocess
+    import tempfile
+
+    probe = (
+        "import contextlib, io, json, sys\n"
+        "from homyhive.cli import HEAVY_MODULES, main\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        "    try:\n"
+        f"        main({argv!r})\n"
+        "    except SystemExit:\n"
+        "        pass\n"
+        "print(json.dumps([m for m in HEAVY_MODULES if m in sys.modules]))\n"
+    )
+    with tempfile.TemporaryDirectory() as scratch:
+        argv = [a.replace("{scratch}", scratch) for a in argv]
+        probe = probe.replace("{scratch}", scratch)
+        result = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def cmd_assets(args):
+    from homyhive import assets
+
+    stats = assets.build_assets(jobs=args.jobs, force=args.force)
+    if not stats["rebuilt"]:
+        print(f"✅ {stats['assets']} assets up to date")
+        return 0
+    saved = 1 - stats["minified_bytes"] / max(stats["original_bytes"], 1)
+    print(
+        f"📦 {stats['rebuilt']} of {stats['assets']} assets rebuilt"
+        f" in {stats['seconds']:.2f} s; minified {saved:.0%} smaller"
+    )
+    return 0
+
+
+def cmd_receipts(args):
+    _ensure_root_on_path()
+    from homyhive import receipts
+
+    if args.combined:
+        started = time.perf_counter()
+        titles = receipts.listing_titles(
+            args.listings or receipts.default_listings_path(args.exports)
+        )
+        count = receipts.render_combined(
+            receipts.read_export(*args.exports, titles=titles), args.combined
+        )
+        seconds = time.perf_counter() - started
+        print(f"🧾 {count} receipts in {args.combined} ({count / seconds:,.0f}/s)")
+        return 0
+
+    stats = receipts.generate(
+        args.exports,
+        args.output_dir,
+        jobs=args.jobs,
+        force=args.force,
+        listings_path=args.listings,
+    )
+    rate = stats["rendered"] / stats["seconds"] if stats["seconds"] else 0
+    print(
+        f"🧾 {stats['rendered']} of {stats['payments']} receipts rendered"
+        f" ({stats['skipped']} already present) in {stats['seconds']:.2f} s"
+        f" ({rate:,.0f}/s)"
+    )
+    return 0
+
+
+def cmd_statements(args):
+    _ensure_root_on_path()
+    from homyhive import statements
+
+    stats = statements.generate(
+        args.export_dir, args.month, args.output_dir, jobs=args.jobs, force=args.force
+    )
+    seconds = stats["render_seconds"]
+    rate = stats["rendered"] / seconds if seconds else 0
+    print(
+        f"📊 {stats['hosts']} hosts aggregated in {stats['aggregate_seconds']:.2f} s;"
+        f" {stats['rendered']} statements rendered in {seconds:.2f} s"
+        f" ({rate:,.1f}/s), {stats['skipped']} unchanged"
+    )
+    print(f"   {stats['output_dir']}")
+    return 0
+
+
+def cmd_legal(args):
+    from homyhive import legal
+
+    try:
+        stats = legal.build(jobs=args.jobs, force=args.force)
+    except ValueError as err:
+        print(f"❌ {err}; install DejaVu or Noto fonts, or add HOMYHIVE_FONT_DIRS")
+        return 1
+    print(
+        f"⚖️  {len(stats['rendered'])} of {stats['documents']} localized documents"
+        f" rendered in {stats['seconds']:.2f} s"
+    )
+    for key in stats["rendered"]:
+        print(f"  📄 {key}")
+    for key, chars in stats["missing_glyphs"].items():
+        print(f"  ⚠️  {key}: no installed font covers {chars!r}")
+    return 0
+
+
+def cmd_search(args):
+    from urllib.parse import parse_qs
+
+    from homyhive import search
+
+    started = time.perf_counter()
+    service = search.SearchService(args.export_dir)
+    print(
+        f"🔎 {len(service.index)} listings indexed"
+        f" in {time.perf_counter() - started:.2f} s"
+    )
+    if args.serve:
+        search.serve(service, port=args.port)
+    elif args.query is not None:
+        params = {key: values[0] for key, values in parse_qs(args.query).items()}
+        result = service.index.query(params)
+        print(f"   {result['total']} matches in {result['elapsed_ms']:.2f} ms")
+        for listing_id in result["ids"][: args.limit]:
+            print(f"  {listing_id}")
+        for category, count in result["facets"].items():
+            print(f"  {count:6d}  {category}")
+    return 0
+
+
+def cmd_lookup(args):
+    from homyhive import lookup
+
+    service = lookup.LookupService()
+    if args.action == "serve":
+        lookup.serve(service, port=args.port)
+    elif args.action == "get":
+        if args.kind not in lookup.KINDS or not args.key:
+            print(f"❌ Usage: lookup get {'|'.join(lookup.KINDS)} KEY")
+            return 2
+        started = time.perf_counter()
+        status, body = service.get(args.kind, args.key)
+        elapsed = (time.perf_counter() - started) * 1e6
+        print(f"📇 {status} in {elapsed:.1f} µs")
+        print(json.dumps(body, indent=2, ensure_ascii=False))
+        return 0 if status == 200 else 1
+    else:
+        for kind, table in service.tables.items():
+            count = f"{len(table):,} keys" if table else "no dump"
+            print(f"📇 {kind}: {count}")
+    return 0
+
+
+def cmd_similar(args):
+    from homyhive import similar
+
+    if not args.show:
+        stats = similar.build(
+            args.export_dir, args.output, k=args.k, full=args.full
+        )
+        print(
+            f"🧭 {stats['listings']:,} listings vectorized"
+            f" in {stats['vectorize_seconds']:.2f} s;"
+            f" {stats['modified']:,} changed,"
+            f" {stats['recomputed']:,} neighbour lists recomputed and"
+            f" {stats['merged']:,} merged in {stats['seconds']:.2f} s"
+        )
+        print(f"   {stats['output_path']}")
+        return 0
+
+    table = similar.NeighbourTable(args.output)
+    matches = table.similar(args.show)
+    if not matches:
+        print(f"❌ {args.show} isn't in the neighbour table")
+        return 1
+    for listing_id, score in matches:
+        print(f"  {score:.3f}  {listing_id}")
+    return 0
+
+
+def cmd_pricing(args):
+    from homyhive import pricing
+
+    if args.bench:
+        print(f"💹 suggest() on synthetic exports (median of {args.runs} runs)")
+        for listings, bookings, seconds in pricing.bench(runs=args.runs):
+            print(
+                f"  {listings:>9,} listings {bookings:>10,} bookings"
+                f" {seconds * 1000:9.1f} ms ({listings / seconds:,.0f} listings/s)"
+            )
+        return 0
+    if not args.export_dir:
+        print("❌ Usage: pricing EXPORT_DIR | --bench")
+        return 2
+
+    stats = pricing.generate(args.export_dir, args.output)
+    print(
+        f"💹 {stats['suggested']:,} of {stats['listings']:,} listings priced"
+        f" from {stats['bookings']:,} bookings: read in {stats['read_seconds']:.2f} s,"
+        f" suggested in {stats['suggest_seconds'] * 1000:.1f} ms"
+    )
+    print(f"   {stats['output_path']}")
+    return 0
+
+
+def cmd_index(args):
+    from homyhive import rerank, retrieval
+
+    index = retrieval.Index(args.path)
+    if args.action == "serve":
+        service = retrieval.IndexService(index, primary=args.primary)
+        retrieval.serve(service, port=args.port)
+    elif args.action == "pull":
+        if not args.primary:
+            print("❌ Usage: index pull --primary URL")
+            return 2
+        started = time.perf_counter()
+        pulled = index.pull(args.primary)
+        elapsed = (time.perf_counter() - started) * 1000
+        if pulled is None:
+            print(f"✅ Up to date with {args.primary}")
+        else:
+            print(
+                f"📥 generation {pulled['generation']} in {elapsed:.0f} ms:"
+                f" {pulled['downloaded']} segments ({pulled['bytes']:,} bytes)"
+                f" downloaded, {pulled['reused']} reused"
+            )
+    elif args.action == "sync":
+        started = time.perf_counter()
+        changed = index.sync()
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"📚 {len(changed)} sources re-ingested in {elapsed:.0f} ms")
+        for source in changed:
+            print(f"  {source}")
+    elif args.action == "answers":
+        from homyhive import answers
+
+        started = time.perf_counter()
+        questions = answers.head_questions(
+            index.snapshot, args.log or (), args.limit or answers.HEAD_SIZE
+        )
+        refreshed = answers.refresh(index, questions)
+        elapsed = time.perf_counter() - started
+        if refreshed is None:
+            print("❌ The index changed while answering; run it again")
+            return 1
+        print(
+            f"💬 {refreshed['questions']} answers precomputed for generation"
+            f" {refreshed['generation']} in {elapsed:.2f} s"
+        )
+    elif args.action == "merge":
+        started = time.perf_counter()
+        merged = index.merge(force=args.force)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"🧹 {merged} segments merged in {elapsed:.0f} ms")
+    elif args.action == "search":
+        if not args.no_rerank:
+            rerank.warm(index.snapshot)
+        started = time.perf_counter()
+        filters = {}
+        for spec in args.filter or ():
+            field, _, value = spec.partition("=")
+            if field not in retrieval.FILTER_FIELDS:
+                print(f"❌ Filters: {', '.join(retrieval.FILTER_FIELDS)}")
+                return 2
+            filters.setdefault(field, []).append(value)
+        query = args.query or ""
+        if args.no_rerank:
+            hits, reranked = index.snapshot.search(query, args.k, filters), False
+        else:
+            hits, reranked = rerank.search(index.snapshot, query, args.k, filters)
+        elapsed = (time.perf_counter() - started) * 1000
+        order = "reranked" if reranked else "first-stage order"
+        print(f"🔎 {len(hits)} hits in {elapsed:.2f} ms ({order})")
+        for score, chunk in hits:
+            print(
+                f"  {score:6.2f}  [{chunk.get('audience')}/{chunk.get('kind')}]"
+                f"  {chunk['source']} § {chunk['section']}"
+            )
+    else:
+        stats = index.stats()
+        print(
+            f"📚 {stats['live']:,} live chunks from {stats['sources']} sources,"
+            f" generation {stats['generation']}"
+        )
+        for entry in stats["segments"]:
+            print(
+                f"  {entry['id']}  tier {entry['tier']}"
+                f"  {entry['docs']:6,} chunks  {entry['deleted']:6,} deleted"
+            )
+    return 0
+
+
+def cmd_intents(args):
+    from homyhive import intents
+
+    if args.check:
+        try:
+            router = intents.load_router(args.output)
+        except OSError:
+            print("❌ No intent router yet; run `python -m homyhive intents`")
+            return 1
+        # The first route imports numpy; keep that out of the timings
+        intents.route(router, "warm up")
+        for message in args.check:
+            started = time.perf_counter()
+            intent, confidence = intents.route(router, message)
+            elapsed = (time.perf_counter() - started) * 1e6
+            target = router["intents"][intent]["href"] if intent else "retrieval"
+            print(f"  {target:<20} {confidence:4.2f} {elapsed:6.0f} µs  {message}")
+        return 0
+    started = time.perf_counter()
+    router = intents.compile_router()
+    output_path = intents.write_router(router, args.output)
+    elapsed = time.perf_counter() - started
+    print(
+        f"🧭 {len(router['intents'])} intents trained on {router['samples']}"
+        f" messages in {elapsed:.2f} s"
+    )
+    print(f"   {output_path}")
+    return 0
+
+
+def cmd_bench(args):
+    import io
+    import re
+    import warnings
+
+    print(f"⏱️  Startup (median of {args.runs} runs)")
+    for argv in (["--help"], ["corpus", "--help"], ["docs", "--help"]):
+        elapsed = _time_command(argv, args.runs)
+        print(f"  homyhive {' '.join(argv):<16} {elapsed:8.1f} ms")
+
+    print("📦 Heavy modules loaded")
+    for argv in (["--help"], ["corpus", "--output", "{scratch}/corpus.jsonl"]):
+        loaded = _heavy_modules_loaded(argv) or ["none"]
+        print(f"  homyhive {argv[0]:<16} {', '.join(loaded)}")
+
+    _ensure_root_on_path()
+    from homyhive import corpus
+
+    started = time.perf_counter()
+    import generate_privacy_pdf
+    import HomyHive_Project_Documentation as documentation
+
+    print(f"🧱 PDF stack import {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+    def docs(output, **options):
+        story = documentation.build_story(
+            documentation.build_styles(),
+            documentation.generation_date(options.get("deterministic", False)),
+        )
+        documentation.render_documentation(story, output, **options)
+
+    renders = {
+        "docs": docs,
+        "privacy": generate_privacy_pdf.create_privacy_pdf,
+    }
+    modes = {
+        "uncompressed": {"compress": False},
+        "default": {},
+        "deterministic": {"deterministic": True},
+    }
+
+    print(f"🖨️  Build (median of {args.runs} runs)")
+    print(f"  {'':<25} {'time':>11} {'size':>10} {'pages/s':>9} reproducible")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        for name, render in renders.items():
+            for mode, options in modes.items():
+                samples, outputs = [], set()
+                for _ in range(args.runs):
+                    buffer = io.BytesIO()
+                    started = time.perf_counter()
+                    render(buffer, **options)
+                    samples.append(time.perf_counter() - started)
+                    outputs.add(buffer.getvalue())
+                pdf = outputs.pop()
+                pages = len(re.findall(rb"/Type\s*/Page\b", pdf))
+                median = _median_ms(samples)
+                print(
+                    f"  {name + ' ' + mode:<25} {median:8.1f} ms {len(pdf):>10,}"
+                    f" {pages / median * 1000:9.1f} {'yes' if not outputs else 'no'}"
+                )
+
+        samples = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            corpus.build_corpus()
+            samples.append(time.perf_counter() - started)
+        print(f"  {'corpus':<25} {_median_ms(samples):8.1f} ms")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="homyhive", description="HomyHive document generators"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    docs = commands.add_parser("docs", help="build the project documentation PDF")
+    docs.add_argument("--output", help="PDF path (default: repo root)")
+    docs.add_argument("--catalogue", help="append listings from a JSONL export")
+    docs.set_defaults(handler=cmd_docs)
+
+    privacy = commands.add_parser("privacy", help="build the privacy policy PDF")
+    privacy.add_argument("--output", help="PDF path (default: public/static)")
+    privacy.set_defaults(handler=cmd_privacy)
+
+    for pdf_command in (docs, privacy):
+        pdf_command.add_argument(
+            "--deterministic",
+            action="store_true",
+            help="byte-identical output for identical content",
+        )
+        pdf_command.add_argument(
+            "--web",
+            action="store_true",
+            help="linearize and write .br/.gz variants for serving",
+        )
+        pdf_command.add_argument(
+            "--store",
+            action="store_true",
+            help="also copy the PDF into public/static/cas",
+        )
+
+    corpus = commands.add_parser("corpus", help="extract the RAG corpus as JSONL")
+    corpus.add_argument("--output", help="JSONL path (default: build/corpus.jsonl)")
+    corpus.set_defaults(handler=cmd_corpus)
+
+    build = commands.add_parser("build", help="rebuild every changed output")
+    build.add_argument("targets", nargs="*", help="targets to build (default: all)")
+    build.add_argument("--jobs", type=int, help="worker processes")
+    build.add_argument("--force", action="store_true", help="ignore input hashes")
+    build.set_defaults(handler=cmd_build)
+
+    images = commands.add_parser("images", help="thumbnail uploaded host documents")
+    images.add_argument("--watch", action="store_true", help="keep polling")
+    images.add_argument("--interval", type=float, default=2.0, help="poll seconds")
+    images.add_argument("--jobs", type=int, help="worker processes")
+    images.set_defaults(handler=cmd_images)
+
+    dupes = commands.add_parser("phash", help="near-duplicate upload detection")
+    dupes.add_argument("action", choices=["index", "query", "serve"])
+    dupes.add_argument("path", nargs="?", help="image to look up (query)")
+    dupes.add_argument("--radius", type=int, default=6, help="max Hamming distance")
+    dupes.add_argument("--port", type=int, default=8765, help="service port")
+    dupes.add_argument("--jobs", type=int, help="worker processes")
+    dupes.set_defaults(handler=cmd_phash)
+
+    assets = commands.add_parser("assets", help="minify and fingerprint public/")
+    assets.add_argument("--jobs", type=int, help="worker processes")
+    assets.add_argument("--force", action="store_true", help="ignore source hashes")
+    assets.set_defaults(handler=cmd_assets)
+
+    bill = commands.add_parser("receipts", help="render payment receipt PDFs")
+    bill.add_argument(
+        "exports", nargs="+", help="mongoexport JSON lines of bookings/promotions"
+    )
+    bill.add_argument(
+        "--listings", help="listings export for titles (default: beside the exports)"
+    )
+    bill.add_argument("--output-dir", help="receipt folder (default: build/receipts)")
+    bill.add_argument("--combined", help="write all receipts into this one PDF")
+    bill.add_argument("--jobs", type=int, help="worker processes")
+    bill.add_argument("--force", action="store_true", help="re-render existing")
+    bill.set_defaults(handler=cmd_receipts)
+
+    monthly = commands.add_parser("statements", help="render monthly host statements")
+    monthly.add_argument("export_dir", help="folder of mongoexport JSON lines")
+    monthly.add_argument("--month", help="YYYY-MM (default: last month)")
+    monthly.add_argument("--output-dir", help="default: build/statements/<month>")
+    monthly.add_argument("--jobs", type=int, help="worker processes")
+    monthly.add_argument("--force", action="store_true", help="ignore the journal")
+    monthly.set_defaults(handler=cmd_statements)
+
+    legal = commands.add_parser("legal", help="render localized privacy/terms PDFs")
+    legal.add_argument("--jobs", type=int, help="worker processes")
+    legal.add_argument("--force", action="store_true", help="ignore text hashes")
+    legal.set_defaults(handler=cmd_legal)
+
+    finder = commands.add_parser("search", help="faceted listing search service")
+    finder.add_argument("export_dir", help="folder with listings.jsonl (hosts.jsonl)")
+    finder.add_argument("--query", help='index query string, e.g. "search=goa"')
+    finder.add_argument("--limit", type=int, default=10, help="ids to print")
+    finder.add_argument("--serve", action="store_true", help="run the HTTP service")
+    finder.add_argument("--port", type=int, default=8766, help="service port")
+    finder.set_defaults(handler=cmd_search)
+
+    offline = commands.add_parser("lookup", help="offline IFSC/pincode lookup")
+    offline.add_argument("action", choices=["compile", "get", "serve"])
+    offline.add_argument("kind", nargs="?", help="ifsc or pincode (get)")
+    offline.add_argument("key", nargs="?", help="IFSC or PIN code (get)")
+    offline.add_argument("--port", type=int, default=8767, help="service port")
+    offline.set_defaults(handler=cmd_lookup)
+
+    nearby = commands.add_parser("similar", help="precompute similar listings")
+    nearby.add_argument("export_dir", help="directory with listings.jsonl")
+    nearby.add_argument("--output", help="neighbour file (default: build/similar)")
+    nearby.add_argument("--k", type=int, default=12, help="neighbours per listing")
+    nearby.add_argument("--full", action="store_true", help="recompute every list")
+    nearby.add_argument("--show", metavar="LISTING_ID", help="print its neighbours")
+    nearby.set_defaults(handler=cmd_similar)
+
+    prices = commands.add_parser("pricing", help="suggest nightly listing prices")
+    prices.add_argument("export_dir", nargs="?", help="directory with listings.jsonl")
+    prices.add_argument("--output", help="JSONL path (default: build/pricing)")
+    prices.add_argument("--bench", action="store_true", help="time 10k-1M listings")
+    prices.add_argument("--runs", type=int, default=3, help="benchmark repetitions")
+    prices.set_defaults(handler=cmd_pricing)
+
+    segments = commands.add_parser("index", help="segmented corpus search index")
+    segments.add_argument(
+        "action",
+        choices=["sync", "merge", "stats", "search", "serve", "pull", "answers"],
+    )
+    segments.add_argument("query", nargs="?", help="search text (search)")
+    segments.add_argument("--path", help="index directory (default: build/index)")
+    segments.add_argument("--k", type=int, default=5, help="results to show")
+    segments.add_argument(
+        "--filter", action="append", metavar="FIELD=VALUE", help="scope a search"
+    )
+    segments.add_argument(
+        "--no-rerank", action="store_true", help="keep the BM25 order of a search"
+    )
+    segments.add_argument("--force", action="store_true", help="merge everything")
+    segments.add_argument("--port", type=int, default=8768, help="service port")
+    segments.add_argument("--primary", help="follow the index served at this URL")
+    segments.add_argument(
+        "--log", action="append", help="chat log to mine questions from (answers)"
+    )
+    segments.add_argument("--limit", type=int, help="questions to precompute")
+    segments.set_defaults(handler=cmd_index)
+
+    router = commands.add_parser("intents", help="compile the chat intent router")
+    router.add_argument("--output", help="router JSON (default: build/intents)")
+    router.add_argument(
+        "--check", nargs="+", metavar="MESSAGE", help="route messages with it"
+    )
+    router.set_defaults(handler=cmd_intents)
+
+    bench = commands.add_parser("bench", help="measure startup and build times")
+    bench.add_argument("--runs", type=int, default=5, help="samples per timing")
+    bench.set_defaults(handler=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args) or 0
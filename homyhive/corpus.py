@@ -0,0 +1,245 @@
+"""
+RAG corpus extraction
+Turns the project markdown docs and the static EJS pages into JSONL chunks
+for the chatbot's retrieval backend. Each chunk carries audience, kind and
+locale metadata so retrieval can be scoped. Standard library only.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+from html.parser import HTMLParser
+
+from homyhive import ROOT
+
+OUTPUT_PATH = os.path.join("build", "corpus.jsonl")
+
+MARKDOWN_SOURCES = [
+    "README.md",
+    "HomyHive_RAG_System_Overview.md",
+    "HOST_REGISTRATION_SYSTEM.md",
+    "EMAIL_SETUP_GUIDE.md",
+    "OAUTH_SETUP_GUIDE.md",
+]
+EJS_SOURCES = "views/static/*.ejs"
+
+# Upper bound on words per chunk; longer sections are split on sentence ends
+CHUNK_WORDS = 180
+
+# Metadata retrieval can be scoped by, keyed by source file name without the
+# extension. Unlisted pages are for everyone; unlisted markdown is technical.
+AUDIENCES = {
+    "HOST_REGISTRATION_SYSTEM": "host",
+    "host": "host",
+    "host_new": "host",
+    "host_new_clean": "host",
+    "host-resources": "host",
+    "host-support": "host",
+    "faq": "guest",
+    "help": "guest",
+    "safety": "guest",
+    "tips": "guest",
+}
+KINDS = {
+    "privacy": "policy",
+    "terms": "policy",
+    "accessibility": "policy",
+    "faq": "help",
+    "help": "help",
+    "safety": "help",
+    "tips": "help",
+    "resource": "help",
+    "host-resources": "help",
+    "host-support": "help",
+    "host": "onboarding",
+    "host_new": "onboarding",
+    "host_new_clean": "onboarding",
+}
+DEFAULT_AUDIENCE = "all"
+DEFAULT_LOCALE = "en"
+
+_EJS_TAG = re.compile(r"<%.*?%>", re.S)
+_MD_HEADING = re.compile(r"^(#{1,4})\s+(.*)$")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class _SectionParser(HTMLParser):
+    """Collects visible text grouped under the nearest h1-h4 heading"""
+
+    SKIP = {"script", "style", "noscript"}
+    HEADINGS = {"h1", "h2", "h3", "h4"}
+    BLOCKS = {"p", "li", "div", "br", "tr", "section", "ul", "ol"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections = []
+        self._heading = ""
+        self._parts = []
+        self._in_heading = False
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip_depth += 1
+        elif tag in self.HEADINGS:
+            self._flush()
+            self._in_heading = True
+            self._heading = ""
+        elif tag in self.BLOCKS:
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.HEADINGS:
+            self._in_heading = False
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_heading:
+            self._heading += data
+        else:
+            self._parts.append(data)
+
+    def _flush(self):
+        text = _normalize("".join(self._parts))
+        if text:
+            self.sections.append((_normalize(self._heading), text))
+        self._parts = []
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def _normalize(text):
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def ejs_sections(source):
+    """Return (heading, text) pairs for an EJS template"""
+
+    parser = _SectionParser()
+    parser.feed(_EJS_TAG.sub(" ", source))
+    parser.close()
+    return parser.sections
+
+
+def markdown_sections(source):
+    """Return (heading, text) pairs for a markdown document"""
+
+    sections = []
+    heading, lines = "", []
+    in_code = False
+    for line in source.splitlines():
+        if line.startswith("```"):
+            in_code = not in_code
+        match = None if in_code else _MD_HEADING.match(line)
+        if match:
+            text = _normalize("\n".join(lines))
+            if text:
+                sections.append((heading, text))
+            heading = match.group(2).strip("*# ").replace("**", "")
+            lines = []
+        else:
+            lines.append(line)
+    text = _normalize("\n".join(lines))
+    if text:
+        sections.append((heading, text))
+    return sections
+
+
+def split_words(text, limit=CHUNK_WORDS):
+    """Split text into pieces of at most `limit` words, on sentence ends"""
+
+    pieces, current, count = [], [], 0
+    for sentence in _SENTENCE_END.split(text):
+        words = len(sentence.split())
+        if current and count + words > limit:
+            pieces.append(" ".join(current))
+            current, count = [], 0
+        current.append(sentence)
+        count += words
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_id(source, section, text):
+    digest = hashlib.sha1(f"{source}\0{section}\0{text}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def source_metadata(source):
+    """audience, kind and locale of the chunks of one source file"""
+
+    name = os.path.splitext(os.path.basename(source))[0]
+    default_kind = "technical" if source.endswith(".md") else "company"
+    return {
+        "audience": AUDIENCES.get(name, DEFAULT_AUDIENCE),
+        "kind": KINDS.get(name, default_kind),
+        "locale": DEFAULT_LOCALE,
+    }
+
+
+def source_paths(root=ROOT):
+    """Relative paths of every corpus source under root"""
+
+    paths = [p for p in MARKDOWN_SOURCES if os.path.exists(os.path.join(root, p))]
+    ejs = sorted(glob.glob(os.path.join(root, EJS_SOURCES)))
+    return paths + [os.path.relpath(p, root) for p in ejs]
+
+
+def chunk_source(root, source):
+    """Yield corpus chunks for one source file"""
+
+    with open(os.path.join(root, source), encoding="utf-8") as handle:
+        raw = handle.read()
+    if source.endswith(".md"):
+        sections = markdown_sections(raw)
+    else:
+        sections = ejs_sections(raw)
+
+    metadata = source_metadata(source)
+    for section, text in sections:
+        for piece in split_words(text):
+            yield {
+                "id": chunk_id(source, section, piece),
+                "source": source,
+                "section": section,
+                "text": piece,
+                **metadata,
+            }
+
+
+def build_corpus(root=ROOT, sources=None):
+    """Return the list of chunks for all (or the given) sources"""
+
+    chunks = []
+    for source in sources or source_paths(root):
+        chunks.extend(chunk_source(root, source))
+    return chunks
+
+
+def write_corpus(chunks, output_path=OUTPUT_PATH):
+    """Write chunks as JSON lines, creating the parent directory if needed"""
+
+    parent = os.path.dirname(output_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as handle:
+        for chunk in chunks:
+            handle.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+
+
+def read_corpus(path=OUTPUT_PATH):
+    """Yield chunks from a JSONL corpus file"""
+
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
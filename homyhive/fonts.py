@@ -0,0 +1,367 @@
+"""
+Unicode font fallback for the PDF builders
+The core PDF fonts (Helvetica/Arial) only cover Latin-1, so Hindi and Kannada
+text, the rupee sign and symbols such as ✅ come out as blank boxes. A
+FontChain holds TrueType fonts in order of preference and splits text into
+runs that each use the first font covering every character in the run.
+
+Fonts are looked up by file name in fonts/ at the repo root, the system font
+folders and any folders listed in HOMYHIVE_FONT_DIRS. Fonts that aren't
+installed are simply left out of the chain.
+
+Coverage comes from each font's cmap (needs fontTools, which fpdf2 already
+depends on). Parsing a cmap is slow, so each font's coverage is stored as a
+bitset under build/fonts/ (or HOMYHIVE_FONT_CACHE), keyed by the font's path,
+size and mtime; later runs and other workers just read the bitset, and a
+lookup is a single bit test. Results are also memoized per character.
+
+The reportlab helpers (register_reportlab, markup, apply_fallback,
+draw_text) let the canvas and platypus builders wrap the characters their
+core fonts lack in <font> runs from the chain.
+"""
+
+import functools
+import hashlib
+import os
+import re
+import unicodedata
+
+from homyhive import ROOT
+
+# (family, regular file, bold file) in order of preference
+FALLBACK_FONTS = [
+    ("DejaVuSans", "DejaVuSans.ttf", "DejaVuSans-Bold.ttf"),
+    (
+        "NotoSansDevanagari",
+        "NotoSansDevanagari-Regular.ttf",
+        "NotoSansDevanagari-Bold.ttf",
+    ),
+    ("NotoSansKannada", "NotoSansKannada-Regular.ttf", "NotoSansKannada-Bold.ttf"),
+    ("NotoSansSymbols2", "NotoSansSymbols2-Regular.ttf", None),
+    ("NotoEmoji", "NotoEmoji-Regular.ttf", None),
+]
+
+SYSTEM_FONT_DIRS = [
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    "C:\\Windows\\Fonts",
+]
+
+
+def font_dirs():
+    extra = os.environ.get("HOMYHIVE_FONT_DIRS", "")
+    dirs = [d for d in extra.split(os.pathsep) if d]
+    return tuple(dirs + [os.path.join(ROOT, "fonts")] + SYSTEM_FONT_DIRS)
+
+
+@functools.lru_cache(maxsize=None)
+def _font_files(dirs):
+    # First match wins, so earlier folders override the system fonts
+    found = {}
+    for directory in dirs:
+        for folder, _, names in os.walk(directory):
+            for name in names:
+                found.setdefault(name, os.path.join(folder, name))
+    return found
+
+
+def find_font(filename):
+    """Path of an installed font file, or None"""
+
+    return _font_files(font_dirs()).get(filename) if filename else None
+
+
+class Coverage:
+    """Bitset of the codepoints a font has glyphs for"""
+
+    def __init__(self, bits):
+        self.bits = bits
+
+    @classmethod
+    def from_codepoints(cls, codepoints):
+        codepoints = list(codepoints)
+        bits = bytearray((max(codepoints, default=0) >> 3) + 1)
+        for codepoint in codepoints:
+            bits[codepoint >> 3] |= 1 << (codepoint & 7)
+        return cls(bytes(bits))
+
+    def __contains__(self, codepoint):
+        index = codepoint >> 3
+        return index < len(self.bits) and bool(self.bits[index] >> (codepoint & 7) & 1)
+
+
+def _standard_codepoints():
+    # The core PDF fonts (Helvetica, Courier, Times) use WinAnsiEncoding
+    for byte in range(32, 256):
+        try:
+            yield ord(bytes([byte]).decode("cp1252"))
+        except UnicodeDecodeError:
+            pass
+
+
+STANDARD_COVERAGE = Coverage.from_codepoints(_standard_codepoints())
+
+
+def cache_dir():
+    return os.environ.get("HOMYHIVE_FONT_CACHE") or os.path.join(
+        ROOT, "build", "fonts"
+    )
+
+
+def _cache_path(path):
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}"
+    return os.path.join(cache_dir(), hashlib.sha1(key.encode()).hexdigest() + ".bits")
+
+
+@functools.lru_cache(maxsize=None)
+def coverage(path):
+    """Coverage bitset of a TrueType/OpenType font, cached on disk"""
+
+    cache_path = _cache_path(path)
+    try:
+        with open(cache_path, "rb") as handle:
+            return Coverage(handle.read())
+    except OSError:
+        pass
+
+    from fontTools.ttLib import TTFont
+
+    with TTFont(path, lazy=True) as font:
+        result = Coverage.from_codepoints(font.getBestCmap())
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(result.bits)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # read-only checkout: parse again next time
+    return result
+
+
+def _inherits(char):
+    # Spaces, joiners and combining marks stay in the surrounding run
+    return unicodedata.category(char)[0] in "MZC" or char in "\u200c\u200d"
+
+
+class Font:
+    def __init__(self, family, regular, bold=None):
+        self.family = family
+        self.regular = regular
+        self.bold = bold or regular
+
+    def covers(self, char):
+        return ord(char) in coverage(self.regular)
+
+
+class FontChain:
+    """Ordered fallback fonts with a memoized character-to-font lookup"""
+
+    def __init__(self, fonts):
+        self.fonts = list(fonts)
+        if not self.fonts:
+            raise ValueError("no fallback fonts are installed")
+        self._font_for = {}
+
+    @classmethod
+    def installed(cls, candidates=FALLBACK_FONTS):
+        """Chain of every candidate font present on this machine"""
+
+        fonts = []
+        for family, regular, bold in candidates:
+            path = find_font(regular)
+            if path:
+                fonts.append(Font(family, path, find_font(bold)))
+        return cls(fonts)
+
+    def font_for(self, char):
+        """First font covering char (the primary font if none does)"""
+
+        font = self._font_for.get(char)
+        if font is None:
+            font = next((f for f in self.fonts if f.covers(char)), self.fonts[0])
+            self._font_for[char] = font
+        return font
+
+    def uncovered(self, text):
+        """Characters of text that no font in the chain has a glyph for"""
+
+        return {
+            char
+            for char in set(text)
+            if not _inherits(char) and not self.font_for(char).covers(char)
+        }
+
+    def runs(self, text, base=None):
+        """Split text into [(Font, text)] runs
+
+        With a base Coverage, characters it covers are left to the caller's
+        own font and come back in runs whose font is None.
+        """
+
+        runs = []
+        current = start = _UNSET
+        for index, char in enumerate(text):
+            if _inherits(char) and current is not _UNSET:
+                continue
+            if base is not None and ord(char) in base:
+                font = None
+            else:
+                font = self.font_for(char)
+            if font is not current:
+                if current is not _UNSET:
+                    runs.append((current, text[start:index]))
+                current, start = font, index
+        if text:
+            if current is _UNSET:
+                current = None if base is not None else self.fonts[0]
+            runs.append((current, text[start:]))
+        return runs
+
+
+_UNSET = object()
+
+
+@functools.lru_cache(maxsize=None)
+def default_chain():
+    """FontChain of the installed FALLBACK_FONTS, one per process"""
+
+    return FontChain.installed()
+
+
+def register_reportlab(chain):
+    """Register the chain's fonts with reportlab as <family>[-Bold] families"""
+
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    registered = set(pdfmetrics.getRegisteredFontNames())
+    for font in chain.fonts:
+        if font.family in registered:
+            continue
+        bold = f"{font.family}-Bold"
+        pdfmetrics.registerFont(TTFont(font.family, font.regular))
+        pdfmetrics.registerFont(TTFont(bold, font.bold))
+        pdfmetrics.registerFontFamily(
+            font.family,
+            normal=font.family,
+            bold=bold,
+            italic=font.family,
+            boldItalic=bold,
+        )
+
+
+def base_coverage(font_name, chain):
+    """Coverage of a reportlab font name (core fonts or a chain family)"""
+
+    for font in chain.fonts:
+        if font_name in (font.family, f"{font.family}-Bold"):
+            return coverage(font.regular)
+    return STANDARD_COVERAGE
+
+
+def needs_fallback(text, base=STANDARD_COVERAGE):
+    """Whether text has characters that base lacks"""
+
+    return not text.isascii() and any(
+        ord(char) not in base and not _inherits(char) for char in text
+    )
+
+
+# Paragraph markup: tags and entities pass through untouched
+_MARKUP = re.compile(r"(<[^>]*>|&#?\w+;)")
+
+
+def markup(text, chain, base=STANDARD_COVERAGE, bold=False):
+    """Wrap the characters of Paragraph markup that base lacks in <font> runs"""
+
+    if text.isascii():
+        return text
+    parts = []
+    for index, piece in enumerate(_MARKUP.split(text)):
+        if index % 2:
+            parts.append(piece)
+            continue
+        for font, run in chain.runs(piece, base):
+            if font is None:
+                parts.append(run)
+            else:
+                name = f"{font.family}-Bold" if bold else font.family
+                parts.append(f'<font name="{name}">{run}</font>')
+    return "".join(parts)
+
+
+def _cell_paragraph(text, cell, chain):
+    from xml.sax.saxutils import escape
+
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import Paragraph
+
+    style = ParagraphStyle(
+        "FallbackCell",
+        fontName=cell.fontname,
+        fontSize=cell.fontsize,
+        leading=cell.leading,
+        textColor=cell.color,
+        alignment={"CENTER": TA_CENTER, "CENTRE": TA_CENTER, "RIGHT": TA_RIGHT}.get(
+            cell.alignment, TA_LEFT
+        ),
+    )
+    base = base_coverage(cell.fontname, chain)
+    text = escape(text).replace("\n", "<br/>")
+    return Paragraph(markup(text, chain, base, "Bold" in cell.fontname), style)
+
+
+def apply_fallback(flowable, chain):
+    """Return flowable with uncovered characters set in fallback fonts
+
+    Paragraphs are rebuilt with <font> runs. Plain string table cells can
+    only use one font, so those that need fallback become Paragraphs styled
+    like the cell. Register the chain with register_reportlab first.
+    """
+
+    from reportlab.platypus import Paragraph, Table
+
+    if isinstance(flowable, Paragraph):
+        style = flowable.style
+        base = base_coverage(style.fontName, chain)
+        text = markup(flowable.text, chain, base, "Bold" in style.fontName)
+        if text != flowable.text:
+            return type(flowable)(text, style, bulletText=flowable.bulletText)
+    elif isinstance(flowable, Table):
+        # Cell values and their resolved styles, set by Table/setStyle
+        for values, cells in zip(flowable._cellvalues, flowable._cellStyles):
+            for column, (value, cell) in enumerate(zip(values, cells)):
+                if isinstance(value, str):
+                    if needs_fallback(value, base_coverage(cell.fontname, chain)):
+                        values[column] = _cell_paragraph(value, cell, chain)
+                elif isinstance(value, (list, tuple)):
+                    values[column] = [apply_fallback(item, chain) for item in value]
+                elif value is not None:
+                    values[column] = apply_fallback(value, chain)
+    return flowable
+
+
+def draw_text(canvas, x, y, text, font_name, size, chain):
+    """drawString with fallback runs for characters font_name lacks
+
+    Fallback runs are set in the bold face when font_name is a bold one.
+    """
+
+    textobject = canvas.beginText(x, y)
+    base = base_coverage(font_name, chain)
+    bold = "Bold" in font_name
+    for font, run in chain.runs(text, base):
+        if font is None:
+            name = font_name
+        else:
+            name = f"{font.family}-Bold" if bold else font.family
+        textobject.setFont(name, size)
+        textobject.textOut(run)
+    canvas.drawText(textobject)
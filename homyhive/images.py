@@ -0,0 +1,225 @@
+"""
+Review-size variants for uploaded host documents
+Generates downscaled JPEG/WebP thumbnails and a WebP review copy of every
+image in public/uploads/host-documents, in a process pool. Outputs are keyed
+by the source file's SHA-256, so re-runs and repeated uploads of the same
+photo cost one hash each. Needs Pillow.
+
+    python -m homyhive images            # one batch pass
+    python -m homyhive images --watch    # keep polling for new uploads
+
+build/images/manifest.json maps each upload's public path to its variant
+URLs; utils/derivedImages.js reads it for the admin views. It lives outside
+public/ because it lists every uploaded identity document.
+
+Only files on local disk are processed. Uploads stored on ImgBB (every
+upload made through controllers/hosts.js today) have no variants, and the
+admin views show them at full size.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from homyhive import ROOT
+
+SOURCE_DIR = os.path.join("public", "uploads", "host-documents")
+OUTPUT_DIR = os.path.join("public", "uploads", "derived")
+# Kept out of public/, which the app serves as static files
+MANIFEST_PATH = os.path.join("build", "images", "manifest.json")
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+# name -> (longest edge in px, format, quality)
+VARIANTS = {
+    "thumb.jpg": (320, "JPEG", 80),
+    "thumb.webp": (320, "WEBP", 75),
+    "review.webp": (1280, "WEBP", 80),
+}
+
+DIGEST_CHARS = 16
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()[:DIGEST_CHARS]
+
+
+def _public_url(path, root):
+    relative = os.path.relpath(path, os.path.join(root, "public"))
+    return "/" + relative.replace(os.sep, "/")
+
+
+def render_variants(source, target_dir):
+    """Write every variant of source into target_dir (runs in a worker)
+
+    Orientation is baked in from EXIF and all metadata is dropped, which
+    matters for ID photos taken on phones.
+    """
+
+    from PIL import Image, ImageOps
+
+    os.makedirs(target_dir, exist_ok=True)
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    for name, (edge, fmt, quality) in VARIANTS.items():
+        variant = image.copy()
+        variant.thumbnail((edge, edge), Image.LANCZOS)
+        path = os.path.join(target_dir, name)
+        variant.save(path + ".tmp", fmt, quality=quality, optimize=fmt == "JPEG")
+        os.replace(path + ".tmp", path)
+
+
+def _complete(target_dir):
+    return all(os.path.exists(os.path.join(target_dir, name)) for name in VARIANTS)
+
+
+def load_manifest(root=ROOT, manifest_path=MANIFEST_PATH):
+    try:
+        with open(os.path.join(root, manifest_path), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, root=ROOT, manifest_path=MANIFEST_PATH):
+    path = os.path.join(root, manifest_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def list_sources(root=ROOT, source_dir=SOURCE_DIR):
+    directory = os.path.join(root, source_dir)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+    )
+
+
+def process(
+    sources,
+    root=ROOT,
+    output_dir=OUTPUT_DIR,
+    jobs=None,
+    pool=None,
+    manifest_path=MANIFEST_PATH,
+):
+    """Generate missing variants for sources; returns a stats dict
+
+    Sources are grouped by content hash first, so duplicate uploads share one
+    set of variants and only unseen content reaches the pool. "failed" maps
+    the digests that couldn't be rendered to their error, and
+    "failed_sources" lists the files behind them.
+    """
+
+    started = time.perf_counter()
+    manifest = load_manifest(root, manifest_path)
+    # Manifests used to be written next to the variants, where anyone could
+    # fetch them
+    legacy = os.path.join(root, output_dir, "manifest.json")
+    if os.path.exists(legacy):
+        manifest = {**load_manifest(root, legacy), **manifest}
+    by_digest = {}
+    for source in sources:
+        by_digest.setdefault(file_digest(source), []).append(source)
+
+    todo = {
+        digest: paths[0]
+        for digest, paths in by_digest.items()
+        if not _complete(os.path.join(root, output_dir, digest))
+    }
+
+    failed = {}
+    if todo:
+        owns_pool = pool is None
+        pool = pool or ProcessPoolExecutor(max_workers=jobs)
+        try:
+            futures = {
+                digest: pool.submit(
+                    render_variants, source, os.path.join(root, output_dir, digest)
+                )
+                for digest, source in todo.items()
+            }
+            for digest, future in futures.items():
+                try:
+                    future.result()
+                except Exception as err:
+                    failed[digest] = str(err)
+        finally:
+            if owns_pool:
+                pool.shutdown()
+
+    for digest, paths in by_digest.items():
+        if digest in failed:
+            continue
+        target_dir = os.path.join(root, output_dir, digest)
+        urls = {
+            name: _public_url(os.path.join(target_dir, name), root) for name in VARIANTS
+        }
+        for source in paths:
+            manifest[_public_url(source, root)] = {"hash": digest, "variants": urls}
+    save_manifest(manifest, root, manifest_path)
+    if os.path.exists(legacy):
+        os.unlink(legacy)
+
+    done = [
+        os.path.join(root, output_dir, digest, "thumb.webp")
+        for digest, paths in by_digest.items()
+        for _ in paths
+        if digest not in failed
+    ]
+    return {
+        "sources": len(sources),
+        "unique": len(by_digest),
+        "rendered": len(todo) - len(failed),
+        "failed": failed,
+        "failed_sources": [p for digest in failed for p in by_digest[digest]],
+        "seconds": time.perf_counter() - started,
+        "source_bytes": sum(os.path.getsize(p) for p in sources),
+        "thumb_bytes": sum(os.path.getsize(p) for p in done),
+    }
+
+
+def watch(
+    root=ROOT,
+    source_dir=SOURCE_DIR,
+    output_dir=OUTPUT_DIR,
+    interval=2.0,
+    jobs=None,
+    report=print,
+):
+    """Poll source_dir and process files that are new or changed since last pass
+
+    Files that fail to render are retried on the next poll.
+    """
+
+    seen = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            changed = []
+            for source in list_sources(root, source_dir):
+                try:
+                    stat = os.stat(source)
+                except FileNotFoundError:
+                    continue
+                signature = (stat.st_size, stat.st_mtime_ns)
+                if seen.get(source) != signature:
+                    seen[source] = signature
+                    changed.append(source)
+            if changed:
+                stats = process(changed, root, output_dir, pool=pool)
+                for source in stats["failed_sources"]:
+                    seen.pop(source, None)
+                report(stats)
+            time.sleep(interval)
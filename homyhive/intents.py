@@ -0,0 +1,436 @@
+"""
+Chat intent router
+Compiles a router for the chatbot's navigational messages ("my bookings",
+"open my wishlist", "become a host") so they are answered with a link to the
+page the app already has, without a retrieval round trip:
+
+    python -m homyhive intents                       # build/intents/router.json
+    python -m homyhive intents --check "show my wishlist"
+
+The router is two stages, both read by utils/intentRouter.js:
+
+- a keyword automaton: a token trie of each intent's KEYWORDS. A message that
+  is mostly one keyword phrase and otherwise only NAVIGATION_WORDS ("my
+  trips", "show notifications") is routed straight away; "cancel my booking"
+  has a word of its own and is left to the model.
+- a linear model over hashed unigrams, bigrams and the automaton's hits,
+  trained here (softmax regression) on each intent's EXAMPLES against open
+  questions: the question headings of the chatbot corpus plus OPEN_QUESTIONS.
+  It routes a message when one intent is at least THRESHOLD likely, so
+  "how do I cancel my booking?" still goes to retrieval.
+
+Features are hashed with 32-bit FNV-1a, which the Node side reproduces, and
+only the weights of features seen in training are written. Needs numpy.
+"""
+
+import json
+import os
+import re
+
+from homyhive import ROOT, corpus
+
+OUTPUT_PATH = os.path.join("build", "intents", "router.json")
+ROUTER_VERSION = 2
+
+# Hashed feature space of the linear model
+DIMS = 2**14
+# Least probability the model needs to route a message
+THRESHOLD = 0.7
+# Share of a message's tokens a keyword phrase must cover to route it outright
+KEYWORD_COVER = 0.5
+# Words that may surround a keyword phrase routed outright
+NAVIGATION_WORDS = frozenset(
+    "a all are can go i is me my open page please see show take the to view"
+    " where".split()
+)
+EPOCHS = 300
+LEARNING_RATE = 0.5
+L2 = 1e-4
+
+NONE = "none"
+
+INTENTS = {
+    "bookings": {
+        "href": "/user/bookings",
+        "label": "My bookings",
+        "reply": "Your upcoming and past trips are all in",
+        "keywords": [
+            "bookings",
+            "my booking",
+            "my trips",
+            "my reservations",
+            "booking history",
+            "upcoming trips",
+            "past trips",
+        ],
+        "examples": [
+            "show my bookings",
+            "where are my bookings",
+            "see my trips",
+            "view my reservations",
+            "open booking history",
+            "list my upcoming stays",
+            "take me to my bookings",
+            "trips",
+        ],
+    },
+    "wishlist": {
+        "href": "/user/wishlist",
+        "label": "Wishlist",
+        "reply": "The stays you saved are in your",
+        "keywords": [
+            "wishlist",
+            "wish list",
+            "saved stays",
+            "saved listings",
+            "saved places",
+            "my favourites",
+            "my favorites",
+        ],
+        "examples": [
+            "open my wishlist",
+            "show saved stays",
+            "where are my saved listings",
+            "go to wishlist",
+            "view favourites",
+            "places i liked",
+        ],
+    },
+    "notifications": {
+        "href": "/user/notifications",
+        "label": "Notifications",
+        "reply": "Everything we've sent you is under",
+        "keywords": ["notifications", "notification", "my alerts", "inbox"],
+        "examples": [
+            "show my notifications",
+            "open notifications",
+            "any new alerts",
+            "check my inbox",
+            "unread notifications",
+        ],
+    },
+    "profile": {
+        "href": "/user/profile",
+        "label": "Profile",
+        "reply": "You can see and edit your details on your",
+        "keywords": ["my profile", "my account", "profile page", "edit profile"],
+        "examples": [
+            "open my profile",
+            "show my account",
+            "go to profile",
+            "view my profile page",
+        ],
+    },
+    "settings": {
+        "href": "/user/settings",
+        "label": "Settings",
+        "reply": "Account preferences live in",
+        "keywords": ["settings", "account settings", "my settings", "preferences"],
+        "examples": [
+            "open settings",
+            "go to account settings",
+            "show my preferences",
+        ],
+    },
+    "dashboard": {
+        "href": "/users/dashboard",
+        "label": "Dashboard",
+        "reply": "Here's your",
+        "keywords": ["dashboard", "my dashboard"],
+        "examples": ["open my dashboard", "go to dashboard", "show dashboard"],
+    },
+    "become_host": {
+        "href": "/host",
+        "label": "Become a host",
+        "reply": "You can start your host application at",
+        "keywords": [
+            "become a host",
+            "become host",
+            "start hosting",
+            "host registration",
+            "register as host",
+            "register as a host",
+            "list my property",
+            "list my home",
+        ],
+        "examples": [
+            "i want to become a host",
+            "sign me up as a host",
+            "start hosting with homyhive",
+            "host application",
+            "i want to list my property",
+            "register my home",
+        ],
+    },
+    "new_listing": {
+        "href": "/listings/new",
+        "label": "Create a listing",
+        "reply": "Add a new stay from",
+        "keywords": [
+            "new listing",
+            "create listing",
+            "create a listing",
+            "add listing",
+            "add a listing",
+        ],
+        "examples": [
+            "create a new listing",
+            "add another listing",
+            "post a new stay",
+            "add a new property listing",
+        ],
+    },
+    "host_resources": {
+        "href": "/host-resources",
+        "label": "Host resources",
+        "reply": "Guides and tools for hosts are in",
+        "keywords": ["host resources", "hosting resources", "host guides"],
+        "examples": ["open host resources", "show hosting guides"],
+    },
+    "contact": {
+        "href": "/contact",
+        "label": "Contact us",
+        "reply": "You can reach our team from",
+        "keywords": [
+            "contact us",
+            "contact support",
+            "customer care",
+            "customer support",
+            "talk to a human",
+            "talk to someone",
+        ],
+        "examples": [
+            "i want to contact support",
+            "connect me to customer care",
+            "let me talk to a person",
+            "support phone number",
+        ],
+    },
+}
+
+# Messages that need an answer rather than a link, besides the corpus'
+# question headings
+OPEN_QUESTIONS = [
+    "how do i cancel my booking",
+    "can i get a refund for my booking",
+    "what is the cancellation policy",
+    "why was my payment declined",
+    "how do i change the dates of my booking",
+    "is my booking confirmed",
+    "cancel my booking",
+    "cancel my reservation",
+    "refund for my booking",
+    "booking refund status",
+    "my booking payment failed",
+    "payment failed for my booking",
+    "delete my account",
+    "deactivate my account",
+    "delete my profile",
+    "what documents do i need to become a host",
+    "how long does host verification take",
+    "how much does homyhive charge hosts",
+    "how are hosts paid",
+    "how do i add a listing to my wishlist",
+    "why am i not getting notifications",
+    "how do i delete my account",
+    "how do i change my password",
+    "what payment methods do you accept",
+    "is it safe to book on homyhive",
+    "what are the check in times",
+    "can i bring pets",
+    "tell me about homyhive",
+    "what is homyhive",
+    "how do reviews work",
+    "how do i contact my host",
+    "hello",
+    "thanks",
+]
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def fnv1a(text):
+    """32-bit FNV-1a of text's UTF-8 bytes (utils/intentRouter.js matches it)"""
+
+    value = 0x811C9DC5
+    for byte in text.encode("utf-8"):
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+
+def compile_keywords(intents=INTENTS):
+    """Token trie of every keyword phrase; "$" marks an intent's phrase end"""
+
+    trie = {}
+    for name, intent in intents.items():
+        for phrase in intent["keywords"]:
+            node = trie
+            for token in tokenize(phrase):
+                node = node.setdefault(token, {})
+            node["$"] = name
+    return trie
+
+
+def keyword_hits(trie, tokens):
+    """[(intent, start, tokens covered)] of every keyword phrase in tokens"""
+
+    hits = []
+    for start in range(len(tokens)):
+        node = trie
+        for position in range(start, len(tokens)):
+            node = node.get(tokens[position])
+            if node is None:
+                break
+            if "$" in node:
+                hits.append((node["$"], start, position + 1 - start))
+    return hits
+
+
+def features(tokens, hits):
+    """Hashed feature indices of a tokenized message"""
+
+    names = list(tokens)
+    names += [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    names += [f"kw:{intent}" for intent, _, _ in hits]
+    names.append(f"len:{min(len(tokens), 8)}")
+    return sorted({fnv1a(name) % DIMS for name in names})
+
+
+def training_set(intents=INTENTS, chunks=None, root=ROOT):
+    """[(message, label)]: the intents' examples and keywords, then questions
+
+    Questions come from chunks, by default the corpus built from root.
+    """
+
+    samples = []
+    for name, intent in intents.items():
+        samples += [(text, name) for text in intent["examples"] + intent["keywords"]]
+    questions = set(OPEN_QUESTIONS)
+    for chunk in corpus.build_corpus(root) if chunks is None else chunks:
+        if chunk["section"].endswith("?"):
+            questions.add(chunk["section"])
+    samples += [(text, NONE) for text in sorted(questions)]
+    return samples
+
+
+def train(samples, labels, trie):
+    """(weights {feature: [weight per label]}, bias) of a softmax regression"""
+
+    import numpy as np
+
+    rows = np.zeros((len(samples), DIMS), dtype=np.float32)
+    targets = np.zeros((len(samples), len(labels)), dtype=np.float32)
+    for row, (text, label) in enumerate(samples):
+        tokens = tokenize(text)
+        rows[row, features(tokens, keyword_hits(trie, tokens))] = 1
+        targets[row, labels.index(label)] = 1
+    # Only features that occur get weights; keep just those columns
+    used = np.flatnonzero(rows.any(axis=0))
+    x = rows[:, used]
+    weights = np.zeros((len(used), len(labels)), dtype=np.float32)
+    bias = np.zeros(len(labels), dtype=np.float32)
+    for _ in range(EPOCHS):
+        logits = x @ weights + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        error = (probabilities - targets) / len(samples)
+        weights -= LEARNING_RATE * (x.T @ error + L2 * weights)
+        bias -= LEARNING_RATE * error.sum(axis=0)
+    return (
+        {
+            int(feature): [round(float(w), 5) for w in column]
+            for feature, column in zip(used, weights)
+        },
+        [round(float(b), 5) for b in bias],
+    )
+
+
+def compile_router(intents=INTENTS, root=ROOT, chunks=None):
+    """The router as a JSON-ready dict"""
+
+    trie = compile_keywords(intents)
+    labels = [NONE, *intents]
+    samples = training_set(intents, chunks, root)
+    weights, bias = train(samples, labels, trie)
+    return {
+        "version": ROUTER_VERSION,
+        "dims": DIMS,
+        "threshold": THRESHOLD,
+        "keyword_cover": KEYWORD_COVER,
+        "navigation_words": sorted(NAVIGATION_WORDS),
+        "labels": labels,
+        "intents": {
+            name: {key: intent[key] for key in ("href", "label", "reply")}
+            for name, intent in intents.items()
+        },
+        "keywords": trie,
+        "bias": bias,
+        "weights": weights,
+        "samples": len(samples),
+    }
+
+
+def _navigational(router, tokens, hits):
+    """Whether a keyword phrase covers enough of tokens and the rest is
+    navigation words"""
+
+    covered = [False] * len(tokens)
+    for _, start, length in hits:
+        covered[start : start + length] = [True] * length
+    longest = max(length for _, _, length in hits)
+    return longest >= router["keyword_cover"] * len(tokens) and all(
+        covered[position] or token in router["navigation_words"]
+        for position, token in enumerate(tokens)
+    )
+
+
+def route(router, message):
+    """(intent name, confidence) for message, or (None, confidence)
+
+    The same decision utils/intentRouter.js makes, for checking a router.
+    """
+
+    import numpy as np
+
+    tokens = tokenize(message)
+    if not tokens:
+        return None, 0.0
+    hits = keyword_hits(router["keywords"], tokens)
+    if len({intent for intent, _, _ in hits}) == 1 and _navigational(
+        router, tokens, hits
+    ):
+        return hits[0][0], 1.0
+    logits = np.array(router["bias"], dtype=np.float64)
+    for feature in features(tokens, hits):
+        weights = router["weights"].get(feature) or router["weights"].get(str(feature))
+        if weights:
+            logits += weights
+    probabilities = np.exp(logits - logits.max())
+    probabilities /= probabilities.sum()
+    best = int(probabilities.argmax())
+    label = router["labels"][best]
+    if label == NONE or probabilities[best] < router["threshold"]:
+        return None, float(probabilities[best])
+    return label, float(probabilities[best])
+
+
+def write_router(router, output_path=None, root=ROOT):
+    """Write router as JSON; returns the path"""
+
+    output_path = output_path or os.path.join(root, OUTPUT_PATH)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(router, handle, separators=(",", ":"))
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def load_router(path=None, root=ROOT):
+    with open(path or os.path.join(root, OUTPUT_PATH), encoding="utf-8") as handle:
+        return json.load(handle)
@@ -0,0 +1,146 @@
+"""
+Paragraph layout cache for the reportlab builders
+Breaking a Paragraph into lines means measuring every word, and it is the
+biggest single cost of laying out the documentation. The same text in the
+same style at the same width always breaks the same way, so CachedParagraph
+looks its line breaks up in a LayoutCache keyed by (text, style, widths)
+before measuring anything. Rebuilds in one process (the render daemon,
+statement workers) reuse each other's layouts through an in-memory LRU.
+
+Set HOMYHIVE_LAYOUT_CACHE to a file path to keep the cache on disk as well,
+so separate builds share it too; it is saved after each render.
+"""
+
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+
+import reportlab
+from reportlab.platypus import Paragraph
+
+# Bump when the key or the cached values change shape
+CACHE_VERSION = "1"
+
+
+def style_key(style):
+    """Every attribute of a ParagraphStyle that can affect its layout"""
+
+    return tuple(
+        (name, repr(value))
+        for name, value in sorted(style.__dict__.items())
+        if name not in ("name", "parent")
+    )
+
+
+class LayoutCache:
+    """LRU map of (text, style, widths) to reportlab line breaks"""
+
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._dirty = False
+        if path:
+            self.load()
+
+    @staticmethod
+    def key(text, style, widths, bullet_text=None):
+        widths = [round(float(width), 6) for width in widths]
+        source = repr((text, bullet_text, style_key(style), widths))
+        return hashlib.sha1(source.encode()).hexdigest()
+
+    def get(self, key):
+        layout = self._entries.get(key)
+        if layout is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return layout
+
+    def put(self, key, layout):
+        self._entries[key] = layout
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _version(self):
+        # Line widths come from reportlab's font metrics
+        return f"{CACHE_VERSION}/{reportlab.Version}"
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as handle:
+                saved = pickle.load(handle)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+            return
+        if saved.get("version") == self._version():
+            self._entries.update(saved["entries"])
+
+    def save(self):
+        """Write the cache to its path, if it has one and anything changed"""
+
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            saved = {"version": self._version(), "entries": dict(self._entries)}
+            pickle.dump(saved, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+_CACHE = None
+
+
+def default_cache():
+    """The process-wide LayoutCache, on disk if HOMYHIVE_LAYOUT_CACHE is set"""
+
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = LayoutCache(path=os.environ.get("HOMYHIVE_LAYOUT_CACHE") or None)
+    return _CACHE
+
+
+# Attributes breakLines sets on the paragraph besides its return value;
+# _width_max is what tables size their columns by
+_LAYOUT_STATE = ("height", "_width_max", "_hyphenations", "_splitLongWordCount")
+
+
+class CachedParagraph(Paragraph):
+    """Paragraph whose line breaks come from the default LayoutCache
+
+    Paragraphs produced by splitting (text is None) are laid out as usual.
+    """
+
+    def breakLines(self, width):
+        if self.text is None:
+            return super().breakLines(width)
+        cache = default_cache()
+        key = cache.key(self.text, self.style, width, self.bulletText)
+        layout = cache.get(key)
+        if layout is None:
+            frags = self.frags
+            lines = super().breakLines(width)
+            state = {
+                name: getattr(self, name)
+                for name in _LAYOUT_STATE
+                if hasattr(self, name)
+            }
+            # Some line breaking modes rebuild the fragments as well
+            if self.frags is not frags:
+                state["frags"] = self.frags
+            layout = (lines, state)
+            cache.put(key, layout)
+        lines, state = layout
+        self.__dict__.update(state)
+        return lines
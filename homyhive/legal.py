@@ -0,0 +1,286 @@
+"""
+Localized privacy policy and terms PDFs
+Extracts the policy text from views/static/privacy.ejs and terms.ejs, so the
+PDFs always match the pages, and renders it for every locale under locales/
+in a process pool:
+
+    python -m homyhive legal              # changed documents only
+    python -m homyhive legal --force
+
+Output goes to public/static/legal/<locale>/<document>.pdf. A locale
+translates strings through an optional locales/<locale>/legal.json map of
+English source text to translation; anything it doesn't cover stays in
+English. Text is set with homyhive.fonts fallback, so Devanagari and Kannada
+render when Noto fonts are installed, and shaped with HarfBuzz so their vowel
+signs and conjuncts are placed correctly (needs uharfbuzz; without it the
+text is drawn unshaped, with a warning). Documents whose localized text and
+chosen font files haven't changed since the last build are skipped, so
+installing a font re-renders the documents that now use it. Needs fpdf2.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+
+from homyhive import ROOT
+
+DOCUMENTS = {
+    "privacy": os.path.join("views", "static", "privacy.ejs"),
+    "terms": os.path.join("views", "static", "terms.ejs"),
+}
+LOCALES_DIR = "locales"
+CATALOG_NAME = "legal.json"
+OUTPUT_DIR = os.path.join("public", "static", "legal")
+STATE_PATH = os.path.join("build", "legal.json")
+
+# Bump when the layout changes so every document is re-rendered
+LAYOUT_VERSION = "2"
+
+_EJS_TAG = re.compile(r"<%.*?%>", re.S)
+
+
+class _LegalParser(HTMLParser):
+    """Collects (kind, text) blocks: title, updated, heading, item, para"""
+
+    SKIP_TAGS = {"script", "style", "form", "button", "label", "noscript"}
+    SKIP_CLASSES = {"privacy-toc", "privacy-toggle", "privacy-download"}
+    BLOCKS = {
+        "h1": "title",
+        "h3": "heading",
+        "h4": "heading",
+        "li": "item",
+        "p": "para",
+    }
+    VOID = {"br", "img", "input", "hr", "meta", "link"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self._stack = []  # (tag, skipped, block kind)
+        self._kind = None
+        self._text = []
+
+    def _skipping(self):
+        return any(skipped for _, skipped, _ in self._stack)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID:
+            return
+        classes = set((dict(attrs).get("class") or "").split())
+        skipped = tag in self.SKIP_TAGS or bool(classes & self.SKIP_CLASSES)
+        kind = self.BLOCKS.get(tag)
+        if "privacy-updated" in classes:
+            kind = "updated"
+        elif "privacy-callout" in classes:
+            kind = "para"
+        if kind and not self._skipping() and self._kind is None:
+            self._kind, self._text = kind, []
+        else:
+            kind = None
+        self._stack.append((tag, skipped, kind))
+
+    def handle_endtag(self, tag):
+        while self._stack:
+            open_tag, _, kind = self._stack.pop()
+            if kind:
+                text = " ".join("".join(self._text).split())
+                if text:
+                    self.blocks.append((kind, text))
+                self._kind = None
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._kind and not self._skipping():
+            self._text.append(data)
+
+
+def extract(path):
+    """(kind, text) blocks of an EJS page"""
+
+    with open(path, encoding="utf-8") as handle:
+        source = _EJS_TAG.sub(" ", handle.read())
+    parser = _LegalParser()
+    parser.feed(source)
+    parser.close()
+    return parser.blocks
+
+
+def locales(root=ROOT):
+    pattern = os.path.join(root, LOCALES_DIR, "*", "translation.json")
+    return sorted(os.path.basename(os.path.dirname(p)) for p in glob.glob(pattern))
+
+
+def load_catalog(locale, root=ROOT):
+    try:
+        path = os.path.join(root, LOCALES_DIR, locale, CATALOG_NAME)
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def localize(blocks, catalog):
+    """Translate blocks through catalog, keeping English where it has no entry"""
+
+    localized = []
+    for kind, text in blocks:
+        if kind == "updated" and ":" in text:
+            # "Last updated: <date>" is translated label by label
+            label, date = text.split(":", 1)
+            text = f"{catalog.get(label, label)}:{date}"
+        else:
+            text = catalog.get(text, text)
+        localized.append((kind, text))
+    return localized
+
+
+def font_files(blocks, chain):
+    """(path, size, mtime) of every font file the blocks' text is set in"""
+
+    files = set()
+    for _, text in blocks:
+        for font, _ in chain.runs(text):
+            for path in (font.regular, font.bold):
+                stat = os.stat(path)
+                files.add((path, stat.st_size, stat.st_mtime_ns))
+    return sorted(files)
+
+
+def text_hash(blocks, files=()):
+    digest = hashlib.sha256(LAYOUT_VERSION.encode())
+    digest.update(json.dumps(blocks, ensure_ascii=False).encode())
+    digest.update(json.dumps(list(files)).encode())
+    return digest.hexdigest()
+
+
+# kind -> (size, bold, (r, g, b), line height, space before)
+LAYOUT = {
+    "title": (18, True, (254, 66, 77), 9, 0),
+    "updated": (9, False, (108, 117, 125), 5, 2),
+    "heading": (13, True, (254, 66, 77), 7, 6),
+    "item": (11, False, (51, 51, 51), 6, 1),
+    "para": (11, False, (51, 51, 51), 6, 2),
+}
+
+
+def _write(pdf, chain, text, size, bold, height):
+    for font, run in chain.runs(text):
+        pdf.set_font(font.family, "B" if bold else "", size)
+        pdf.write(height, run)
+
+
+def render(blocks, output_path, deterministic=True):
+    """Write blocks to a PDF at output_path (atomically)"""
+
+    from fpdf import FPDF
+    from fpdf.errors import FPDFException
+
+    from homyhive.fonts import default_chain
+
+    chain = default_chain()
+    pdf = FPDF()
+    try:
+        pdf.set_text_shaping(True)
+    except FPDFException:
+        warnings.warn("uharfbuzz is not installed; Indic text will be unshaped")
+    if deterministic:
+        epoch = int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+        pdf.set_creation_date(datetime.fromtimestamp(epoch, timezone.utc))
+    for font in chain.fonts:
+        pdf.add_font(font.family, "", font.regular)
+        pdf.add_font(font.family, "B", font.bold)
+    pdf.add_page()
+
+    margin = pdf.l_margin
+    for kind, text in blocks:
+        size, bold, color, height, before = LAYOUT[kind]
+        pdf.ln(before)
+        pdf.set_text_color(*color)
+        if kind == "item":
+            pdf.set_left_margin(margin + 6)
+            pdf.set_x(margin + 2)
+            _write(pdf, chain, "• ", size, bold, height)
+        _write(pdf, chain, text, size, bold, height)
+        pdf.set_left_margin(margin)
+        pdf.ln(height)
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    pdf.output(output_path + ".tmp")
+    os.replace(output_path + ".tmp", output_path)
+    return sorted(set().union(*(chain.uncovered(text) for _, text in blocks)))
+
+
+def _render_job(blocks, output_path):
+    return output_path, render(blocks, output_path)
+
+
+def load_state(root=ROOT):
+    try:
+        with open(os.path.join(root, STATE_PATH), encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, root=ROOT):
+    path = os.path.join(root, STATE_PATH)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as handle:
+        json.dump(state, handle, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def build(root=ROOT, jobs=None, force=False):
+    """Render every (document, locale) whose text or fonts changed; returns stats
+
+    Raises ValueError when no fallback font is installed at all.
+    """
+
+    from homyhive.fonts import default_chain
+
+    started = time.perf_counter()
+    chain = default_chain()
+    state = load_state(root)
+    sources = {
+        name: extract(os.path.join(root, path)) for name, path in DOCUMENTS.items()
+    }
+
+    todo = {}
+    for locale in locales(root):
+        catalog = load_catalog(locale, root)
+        for name, blocks in sources.items():
+            localized = localize(blocks, catalog)
+            key = f"{locale}/{name}"
+            output_path = os.path.join(root, OUTPUT_DIR, locale, f"{name}.pdf")
+            digest = text_hash(localized, font_files(localized, chain))
+            if force or state.get(key) != digest or not os.path.exists(output_path):
+                todo[key] = (localized, output_path, digest)
+
+    missing = {}
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                key: pool.submit(_render_job, blocks, output_path)
+                for key, (blocks, output_path, _) in todo.items()
+            }
+            for key, future in futures.items():
+                _, uncovered = future.result()
+                state[key] = todo[key][2]
+                if uncovered:
+                    missing[key] = "".join(uncovered)
+        save_state(state, root)
+
+    return {
+        "documents": len(sources) * len(locales(root)),
+        "rendered": sorted(todo),
+        "missing_glyphs": missing,
+        "seconds": time.perf_counter() - started,
+    }
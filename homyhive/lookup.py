@@ -0,0 +1,352 @@
+"""
+Offline IFSC and pincode lookup
+Compiles the public IFSC and pincode CSV dumps into compact lookup files and
+serves them locally, so host onboarding can check a bank branch or PIN code
+without a third-party API call per keystroke:
+
+    python -m homyhive lookup compile     # data/lookup/*.csv -> build/lookup/
+    python -m homyhive lookup get ifsc HDFC0001234
+    python -m homyhive lookup serve       # HTTP lookup for the app
+
+Dumps go in data/lookup/ as ifsc.csv (the Razorpay IFSC release) and
+pincode.csv (the data.gov.in All India Pincode Directory), optionally
+gzipped. A compiled file is a header, the keys as fixed-width sorted records,
+an offset table and a blob of values. It is memory-mapped and searched with a
+binary search, so a lookup reads a few pages and takes microseconds however
+large the dump is.
+
+The service answers GET /ifsc/<code> and GET /pincode/<pin>. It watches
+data/lookup/, recompiles a dump that changes and swaps the new file in
+without a restart. controllers/hosts.js uses it when LOOKUP_SERVICE_URL is
+set.
+"""
+
+import csv
+import gzip
+import io
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from homyhive import ROOT
+
+DUMP_DIR = os.path.join("data", "lookup")
+OUTPUT_DIR = os.path.join("build", "lookup")
+
+# Seconds between checks of the dump folder while serving
+POLL_SECONDS = 2
+
+MAGIC = b"HHLOOKUP"
+FORMAT_VERSION = 1
+# magic, format version, record count, key width, metadata length
+_HEADER = struct.Struct("<8sIIII")
+_OFFSET = struct.Struct("<I")
+
+# Separators inside the value blob: rows of one key, fields of one row
+ROW_SEPARATOR = "\x1e"
+FIELD_SEPARATOR = "\x1f"
+
+# kind -> key column, key format and {field: candidate CSV columns}
+KINDS = {
+    "ifsc": {
+        "key": ("ifsc",),
+        "pattern": re.compile(r"[A-Z]{4}0[A-Z0-9]{6}"),
+        "fields": {
+            "bank": ("bank",),
+            "branch": ("branch",),
+            "address": ("address",),
+            "city": ("city", "centre"),
+            "district": ("district",),
+            "state": ("state",),
+            "micr": ("micr",),
+        },
+    },
+    "pincode": {
+        "key": ("pincode",),
+        "pattern": re.compile(r"[1-9][0-9]{5}"),
+        "fields": {
+            "office": ("officename", "office"),
+            "district": ("district", "districtname"),
+            "state": ("statename", "state"),
+        },
+    },
+}
+
+
+def normalize_key(kind, key):
+    """Canonical form of an IFSC code or PIN code, or None if malformed"""
+
+    key = re.sub(r"\s+", "", str(key or "")).upper()
+    return key if KINDS[kind]["pattern"].fullmatch(key) else None
+
+
+def _column(name):
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+def dump_path(kind, root=ROOT):
+    """The dump file for kind in the dump folder, or None"""
+
+    for name in (f"{kind}.csv", f"{kind}.csv.gz"):
+        path = os.path.join(root, DUMP_DIR, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def index_path(kind, root=ROOT):
+    return os.path.join(root, OUTPUT_DIR, f"{kind}.idx")
+
+
+def _read_rows(kind, source):
+    spec = KINDS[kind]
+    opener = gzip.open if source.endswith(".gz") else open
+    with opener(source, "rt", encoding="utf-8-sig", newline="") as handle:
+        reader = csv.reader(handle)
+        header = [_column(name) for name in next(reader)]
+
+        def find(candidates):
+            for candidate in candidates:
+                if candidate in header:
+                    return header.index(candidate)
+            return None
+
+        key_column = find(spec["key"])
+        if key_column is None:
+            raise ValueError(f"{source}: no {'/'.join(spec['key'])} column")
+        columns = [find(candidates) for candidates in spec["fields"].values()]
+        for row in reader:
+            if len(row) <= key_column:
+                continue
+            key = normalize_key(kind, row[key_column])
+            if key is None:
+                continue
+            values = [
+                row[column].strip() if column is not None and column < len(row) else ""
+                for column in columns
+            ]
+            # The separators can't appear inside a value
+            yield key, FIELD_SEPARATOR.join(
+                re.sub(r"[\x1e\x1f]", " ", value) for value in values
+            )
+
+
+def compile_dump(kind, source, output_path, dump=None):
+    """Write the lookup file for a dump (atomically); returns the key count
+
+    dump identifies the source file version and is kept in the metadata.
+    """
+
+    grouped = {}
+    for key, row in _read_rows(kind, source):
+        rows = grouped.setdefault(key, [])
+        if row not in rows:
+            rows.append(row)
+    keys = sorted(grouped)
+    width = len(keys[0]) if keys else 0
+    meta = json.dumps(
+        {
+            "kind": kind,
+            "fields": list(KINDS[kind]["fields"]),
+            "dump": dump,
+        }
+    ).encode()
+
+    blob = io.BytesIO()
+    offsets = [0]
+    for key in keys:
+        blob.write(ROW_SEPARATOR.join(grouped[key]).encode())
+        offsets.append(blob.tell())
+    if offsets[-1] >= 2**32:
+        raise ValueError(f"{source}: too large for a lookup file")
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(keys), width, len(meta)))
+        handle.write(meta)
+        handle.write(b"\0" * (-handle.tell() % 8))
+        handle.write(b"".join(key.encode("ascii") for key in keys))
+        handle.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+        handle.write(blob.getvalue())
+    os.replace(tmp_path, output_path)
+    return len(keys)
+
+
+class LookupFile:
+    """A compiled lookup file, memory-mapped and binary searched"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, width, meta_length = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a lookup file (version {FORMAT_VERSION})")
+        start = _HEADER.size
+        self.meta = json.loads(self._map[start : start + meta_length])
+        self.fields = self.meta["fields"]
+        self.count = count
+        self.width = width
+        self._keys = start + meta_length + (-(start + meta_length) % 8)
+        self._offsets = self._keys + count * width
+        self._blob = self._offsets + (count + 1) * _OFFSET.size
+
+    def __len__(self):
+        return self.count
+
+    def _key(self, index):
+        start = self._keys + index * self.width
+        return self._map[start : start + self.width]
+
+    def get(self, key):
+        """[{field: value}] rows stored under key, or None"""
+
+        key = key.encode("ascii")
+        if len(key) != self.width:
+            return None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count or self._key(low) != key:
+            return None
+        start, end = struct.unpack_from("<II", self._map, self._offsets + low * 4)
+        rows = self._map[self._blob + start : self._blob + end].decode()
+        return [
+            dict(zip(self.fields, row.split(FIELD_SEPARATOR)))
+            for row in rows.split(ROW_SEPARATOR)
+        ]
+
+
+def describe(kind, rows):
+    """The response body for a found key"""
+
+    if kind == "pincode":
+        # One row per post office; the city is the district most of them share
+        return {
+            "city": Counter(row["district"] for row in rows).most_common(1)[0][0],
+            "state": Counter(row["state"] for row in rows).most_common(1)[0][0],
+            "offices": [row["office"] for row in rows if row["office"]],
+        }
+    return rows[0]
+
+
+class LookupService:
+    """Lookup files for every kind, recompiled and reopened as dumps change"""
+
+    def __init__(self, root=ROOT):
+        self.root = root
+        self.tables = {}
+        self._stamps = {}
+        self.refresh()
+
+    def _stamp(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _open(self, kind):
+        path = index_path(kind, self.root)
+        stamp = self._stamp(path)
+        if stamp != self._stamps.get(kind):
+            # Readers holding the old map keep it alive until they finish
+            self.tables[kind] = LookupFile(path) if stamp else None
+            self._stamps[kind] = stamp
+        return self.tables.get(kind)
+
+    def refresh(self):
+        """Compile new or changed dumps and (re)open changed lookup files"""
+
+        for kind in KINDS:
+            table = self._open(kind)
+            source = dump_path(kind, self.root)
+            if not source:
+                continue
+            stat = os.stat(source)
+            dump = [os.path.basename(source), stat.st_mtime_ns, stat.st_size]
+            if table is not None and table.meta.get("dump") == dump:
+                continue
+            started = time.perf_counter()
+            try:
+                count = compile_dump(kind, source, index_path(kind, self.root), dump)
+            except (OSError, ValueError, UnicodeDecodeError) as err:
+                # Most likely a dump still being copied; retried on the next poll
+                print(f"⚠️  {kind}: {err}")
+                continue
+            print(
+                f"📇 {kind}: {count:,} keys compiled"
+                f" in {time.perf_counter() - started:.2f} s"
+            )
+            self._open(kind)
+
+    def watch(self, interval=POLL_SECONDS):
+        def poll():
+            while True:
+                time.sleep(interval)
+                self.refresh()
+
+        threading.Thread(target=poll, daemon=True).start()
+
+    def get(self, kind, key):
+        """(status, body) for a lookup"""
+
+        table = self.tables.get(kind)
+        if table is None:
+            return 503, {"success": False, "message": f"No {kind} data loaded"}
+        key = normalize_key(kind, key)
+        if key is None:
+            return 400, {"success": False, "message": f"Invalid {kind}"}
+        rows = table.get(key)
+        if rows is None:
+            return 404, {"success": False, "message": f"Unknown {kind}"}
+        return 200, {"success": True, "key": key, "data": describe(kind, rows)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        parts = urlparse(self.path).path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] not in KINDS:
+            return self._reply(404, {"success": False, "message": "Not found"})
+        self._reply(*self.service.get(parts[0], unquote(parts[1])))
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service, host="127.0.0.1", port=8767):
+    handler = type("Handler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    service.watch()
+    loaded = ", ".join(
+        f"{len(table):,} {kind}" for kind, table in service.tables.items() if table
+    )
+    print(f"📇 Offline lookup on http://{host}:{port} ({loaded or 'no data'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
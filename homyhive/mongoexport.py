@@ -0,0 +1,45 @@
+"""
+Readers for mongoexport output
+Collections are exported as JSON lines (or a JSON array with --jsonArray) in
+MongoDB extended JSON, where ObjectIds, dates and 64-bit numbers are wrapped
+in {"$oid": ...}, {"$date": ...} and {"$numberLong": ...} objects.
+"""
+
+import json
+from datetime import datetime, timezone
+
+
+def value(field):
+    """Unwrap an extended JSON value ({"$oid": ...}, {"$date": ...})"""
+
+    if isinstance(field, dict):
+        if "$oid" in field:
+            return field["$oid"]
+        if "$date" in field:
+            date = field["$date"]
+            if isinstance(date, dict):
+                date = int(date["$numberLong"])
+            if isinstance(date, (int, float)):
+                return datetime.fromtimestamp(date / 1000, timezone.utc)
+            return datetime.fromisoformat(date.replace("Z", "+00:00"))
+        if "$numberLong" in field:
+            return int(field["$numberLong"])
+        if "$numberDouble" in field:
+            return float(field["$numberDouble"])
+        if "$numberDecimal" in field:
+            return float(field["$numberDecimal"])
+    return field
+
+
+def read_records(path):
+    """Yield the raw documents of a JSON-lines or JSON-array export"""
+
+    with open(path, encoding="utf-8") as handle:
+        first = handle.read(1)
+        handle.seek(0)
+        if first == "[":
+            yield from json.load(handle)
+            return
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,288 @@
+"""
+Near-duplicate detection for uploaded host documents
+Every upload gets a 64-bit difference hash (dHash) which survives re-encoding,
+resizing and small crops. Hashes live in a multi-index hash table keyed on
+Hamming distance, so "is this a resubmission?" is a sub-millisecond lookup
+instead of a comparison against every stored image. Needs Pillow.
+
+    python -m homyhive phash index            # hash public/uploads/host-documents
+    python -m homyhive phash query photo.jpg  # list near-duplicates
+    python -m homyhive phash serve            # HTTP lookup for the app
+
+query and serve use the index saved by the last `phash index` run (building
+it first if there is none); the service adds new uploads as they are checked.
+
+The service answers POST /check with the raw image as the body
+(?key=<id>&add=1 also records it) and is used by verifyGovernmentId when
+PHASH_SERVICE_URL is set. Keys name one upload, not a document slot: the app
+uses <host id>:<field>:<uploaded URL>, so a replaced document stays on file
+and a resubmission matches every earlier upload, the host's own included.
+"""
+
+import io
+import json
+import os
+import threading
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from homyhive import ROOT
+from homyhive.images import SOURCE_DIR, file_digest, list_sources
+
+INDEX_PATH = os.path.join("build", "phash.json")
+
+# Hamming distance at or below which two uploads count as the same document
+DUPLICATE_DISTANCE = 6
+
+
+def dhash(image):
+    """64-bit difference hash of a PIL image"""
+
+    from PIL import Image, ImageOps
+
+    gray = ImageOps.exif_transpose(image).convert("L").resize((9, 8), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left < right)
+    return value
+
+
+def hash_bytes(data):
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        return dhash(image)
+
+
+def hash_file(path):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return dhash(image)
+
+
+def distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def _neighbours(segment, radius, bits):
+    """Every `bits`-wide value within Hamming distance radius of segment"""
+
+    found = [segment]
+    for flips in range(1, radius + 1):
+        for positions in combinations(range(bits), flips):
+            value = segment
+            for position in positions:
+                value ^= 1 << position
+            found.append(value)
+    return found
+
+
+class MultiIndexHash:
+    """Multi-index hash table over 64-bit hashes with Hamming distance
+
+    Each hash is split into SEGMENTS 16-bit pieces with one table per piece.
+    Two hashes within distance r must agree to within r // SEGMENTS bits on at
+    least one piece (pigeonhole), so a lookup probes a few dozen buckets and
+    only verifies the candidates found there.
+    """
+
+    SEGMENTS = 4
+    BITS = 16
+
+    def __init__(self):
+        self.tables = [{} for _ in range(self.SEGMENTS)]
+        self.keys = {}  # hash -> keys stored under it
+
+    def __len__(self):
+        return sum(len(keys) for keys in self.keys.values())
+
+    def _segments(self, value):
+        mask = (1 << self.BITS) - 1
+        return [(value >> (i * self.BITS)) & mask for i in range(self.SEGMENTS)]
+
+    def add(self, value, key):
+        if value not in self.keys:
+            self.keys[value] = []
+            for table, segment in zip(self.tables, self._segments(value)):
+                table.setdefault(segment, set()).add(value)
+        self.keys[value].append(key)
+
+    def remove(self, value, key):
+        keys = self.keys.get(value)
+        if not keys or key not in keys:
+            return
+        keys.remove(key)
+        if not keys:
+            del self.keys[value]
+            for table, segment in zip(self.tables, self._segments(value)):
+                table[segment].discard(value)
+                if not table[segment]:
+                    del table[segment]
+
+    def search(self, value, radius=DUPLICATE_DISTANCE):
+        """Return [(distance, hash, keys)] within radius, nearest first"""
+
+        per_segment = radius // self.SEGMENTS
+        candidates = set()
+        for table, segment in zip(self.tables, self._segments(value)):
+            for probe in _neighbours(segment, per_segment, self.BITS):
+                candidates.update(table.get(probe, ()))
+
+        found = []
+        for stored in candidates:
+            d = distance(value, stored)
+            if d <= radius:
+                found.append((d, stored, list(self.keys[stored])))
+        return sorted(found)
+
+
+class DuplicateIndex:
+    """Hash table plus the bookkeeping needed to persist and refresh it"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.table = MultiIndexHash()
+        self.entries = {}  # key -> hash
+        self.digests = {}  # file SHA-256 prefix -> hash, to skip rehashing
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path=os.path.join(ROOT, INDEX_PATH)):
+        index = cls(path)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return index
+        index.digests = {d: int(h, 16) for d, h in data.get("digests", {}).items()}
+        for key, value in data.get("entries", {}).items():
+            index._add(key, int(value, 16))
+        return index
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self.lock:
+            data = {
+                "entries": {k: f"{v:016x}" for k, v in self.entries.items()},
+                "digests": {d: f"{v:016x}" for d, v in self.digests.items()},
+            }
+        with open(self.path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump(data, handle, sort_keys=True)
+        os.replace(self.path + ".tmp", self.path)
+
+    def _add(self, key, value):
+        previous = self.entries.get(key)
+        if previous == value:
+            return
+        if previous is not None:
+            self.table.remove(previous, key)
+        self.entries[key] = value
+        self.table.add(value, key)
+
+    def add(self, key, value):
+        with self.lock:
+            self._add(key, value)
+
+    def check(self, value, radius=DUPLICATE_DISTANCE, exclude=None):
+        """Keys of stored uploads within radius of value, nearest first
+
+        exclude leaves out the entry of the upload being checked, for retries.
+        """
+
+        with self.lock:
+            matches = self.table.search(value, radius)
+        return [
+            {"key": key, "distance": d}
+            for d, _, keys in matches
+            for key in keys
+            if key != exclude
+        ]
+
+    def index_files(self, paths, root=ROOT, jobs=None):
+        """Hash paths (in parallel, skipping known content) and add them
+
+        Files are keyed by their public URL. Returns the number hashed.
+        """
+
+        digests = {path: file_digest(path) for path in paths}
+        unseen = {d: p for p, d in digests.items() if d not in self.digests}
+        todo = sorted(unseen.items())
+        if todo:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                hashes = pool.map(hash_file, [p for _, p in todo], chunksize=16)
+                for (digest, _), value in zip(todo, hashes):
+                    self.digests[digest] = value
+        for path, digest in digests.items():
+            key = "/" + os.path.relpath(path, os.path.join(root, "public"))
+            self.add(key.replace(os.sep, "/"), self.digests[digest])
+        return len(todo)
+
+
+def index_uploads(root=ROOT, source_dir=SOURCE_DIR, jobs=None):
+    index = DuplicateIndex.load(os.path.join(root, INDEX_PATH))
+    hashed = index.index_files(list_sources(root, source_dir), root, jobs)
+    index.save()
+    return index, hashed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    index = None
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/check":
+            return self._reply(404, {"success": False, "message": "Not found"})
+        params = parse_qs(url.query)
+        key = params.get("key", [None])[0]
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            value = hash_bytes(self.rfile.read(length))
+        except Exception:
+            return self._reply(400, {"success": False, "message": "Not an image"})
+
+        matches = self.index.check(value, exclude=key)
+        if key and params.get("add", ["0"])[0] == "1":
+            self.index.add(key, value)
+            self.index.save()
+        self._reply(
+            200,
+            {
+                "success": True,
+                "hash": f"{value:016x}",
+                "duplicate": bool(matches),
+                "matches": matches,
+            },
+        )
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(index, host="127.0.0.1", port=8765):
+    handler = type("Handler", (_Handler,), {"index": index})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(
+        f"🔎 Duplicate lookup on http://{host}:{port}/check"
+        f" ({len(index.table)} hashes)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
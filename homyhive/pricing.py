@@ -0,0 +1,357 @@
+"""
+Nightly price suggestions
+Suggests a nightly price for every listing from comparable listings, in one
+vectorized pass over the listings and bookings exports:
+
+    python -m homyhive pricing exports/
+    python -m homyhive pricing --bench        # 10k, 100k and 1M listings
+
+Comparable listings are those in the same category and area (the geocoded
+~50 km cell, else the last part of the address, with the country). A listing
+whose group has fewer than MIN_COMPARABLES priced listings is compared at the
+next coarser level in LEVELS instead, down to every listing. The suggestion
+is the group's median price, nudged by how the listing's occupancy over the
+last WINDOW_DAYS compares with its group's (at most MAX_ADJUST either way)
+and kept inside the group's interquartile range.
+
+Every statistic is a bincount or a sort over integer group codes, so the
+whole run is a handful of numpy passes whatever the number of listings.
+Suggestions go to build/pricing/suggestions.jsonl. Needs numpy.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+from homyhive import ROOT, mongoexport, search
+
+OUTPUT_PATH = os.path.join("build", "pricing", "suggestions.jsonl")
+
+WINDOW_DAYS = 90
+MIN_COMPARABLES = 5
+MAX_ADJUST = 0.15
+# Suggestions are rounded to this many rupees, unless that leaves the range
+ROUND_TO = 50
+# Grouping columns from finest to coarsest; () compares with every listing
+LEVELS = (
+    ("category", "area"),
+    ("area",),
+    ("category", "country"),
+    ("category",),
+    (),
+)
+LEVEL_NAMES = ["+".join(level) or "all" for level in LEVELS]
+BENCH_SIZES = (10_000, 100_000, 1_000_000)
+
+DAY_SECONDS = 86400
+
+
+def _timestamp(field):
+    when = mongoexport.value(field)
+    return when.timestamp() if isinstance(when, datetime) else 0.0
+
+
+def area_of(listing):
+    """A listing's area: its ~50 km grid cell if geocoded, else its town"""
+
+    coordinates = (listing.get("geometry") or {}).get("coordinates") or []
+    try:
+        longitude, latitude = (float(mongoexport.value(c)) for c in coordinates)
+        return f"{latitude // 0.5:g}:{longitude // 0.5:g}"
+    except (TypeError, ValueError):
+        pass
+    # "12 Beach Road, Calangute, Goa" -> "goa"
+    location = search.text_field(listing.get("location"))
+    return location.rsplit(",", 1)[-1].strip().lower() or None
+
+
+class _Codes:
+    """Dense integer codes for string values; None is -1"""
+
+    def __init__(self):
+        self.values = {}
+
+    def __call__(self, value):
+        if value is None:
+            return -1
+        return self.values.setdefault(value, len(self.values))
+
+
+def read_exports(export_dir):
+    """(listing ids, listing columns, booking columns) of an export"""
+
+    import numpy as np
+
+    categories = {name: code for code, name in enumerate(search.CATEGORIES)}
+    areas, countries = _Codes(), _Codes()
+    ids, listing_index = [], {}
+    listings = {"category": [], "area": [], "country": [], "price": []}
+    path = os.path.join(export_dir, "listings.jsonl")
+    for listing in mongoexport.read_records(path):
+        listing_id = str(mongoexport.value(listing.get("_id")))
+        listing_index[listing_id] = len(ids)
+        ids.append(listing_id)
+        country = search.text_field(listing.get("country")).strip().lower() or None
+        listings["category"].append(categories.get(listing.get("category"), -1))
+        # An area name only means something within its country
+        area = area_of(listing)
+        listings["area"].append(areas(area and f"{country}/{area}"))
+        listings["country"].append(countries(country))
+        try:
+            price = float(mongoexport.value(listing.get("price")) or 0)
+        except (TypeError, ValueError):
+            price = 0.0
+        listings["price"].append(price)
+    listings = {
+        name: np.array(values, dtype=np.float64 if name == "price" else np.int32)
+        for name, values in listings.items()
+    }
+
+    bookings = {
+        "listing": [],
+        "check_in": [],
+        "check_out": [],
+        "total": [],
+        "confirmed": [],
+    }
+    path = os.path.join(export_dir, "bookings.jsonl")
+    for booking in mongoexport.read_records(path) if os.path.exists(path) else ():
+        listing = listing_index.get(str(mongoexport.value(booking.get("listing"))))
+        if listing is None:
+            continue
+        try:
+            total = float(mongoexport.value(booking.get("totalAmount")) or 0)
+        except (TypeError, ValueError):
+            total = 0.0
+        bookings["listing"].append(listing)
+        bookings["check_in"].append(_timestamp(booking.get("checkIn")))
+        bookings["check_out"].append(_timestamp(booking.get("checkOut")))
+        bookings["total"].append(total)
+        bookings["confirmed"].append(booking.get("bookingStatus") != "cancelled")
+    bookings = {
+        name: np.array(
+            values,
+            dtype={"listing": np.int32, "confirmed": np.bool_}.get(name, np.float64),
+        )
+        for name, values in bookings.items()
+    }
+    return ids, listings, bookings
+
+
+def _group_codes(listings, level):
+    """Group code per listing at a level (-1 where a column is unknown)"""
+
+    import numpy as np
+
+    count = len(listings["price"])
+    if not level:
+        return np.zeros(count, dtype=np.int64), 1
+    known = np.ones(count, dtype=bool)
+    key = np.zeros(count, dtype=np.int64)
+    for column in level:
+        values = listings[column].astype(np.int64)
+        known &= values >= 0
+        key = key * (int(values.max(initial=0)) + 1) + np.maximum(values, 0)
+    codes = np.full(count, -1, dtype=np.int64)
+    unique, codes[known] = np.unique(key[known], return_inverse=True)
+    return codes, len(unique)
+
+
+def _group_quantiles(codes, groups, values, quantiles, order=None):
+    """Linear-interpolated quantiles of values per group code
+
+    order, an argsort of values, is shared between calls: a stable sort of the
+    codes in that order sorts by (code, value) faster than a lexsort.
+    """
+
+    import numpy as np
+
+    if order is None:
+        order = np.argsort(values, kind="stable")
+    codes = codes[order]
+    order = order[codes >= 0]
+    codes = codes[codes >= 0]
+    by_group = np.argsort(codes, kind="stable")
+    ordered = values[order[by_group]]
+    sizes = np.bincount(codes, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    result = {}
+    for q in quantiles:
+        position = starts + q * np.maximum(sizes - 1, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.ceil(position).astype(np.int64)
+        low_values = ordered[np.minimum(low, len(ordered) - 1)]
+        high_values = ordered[np.minimum(high, len(ordered) - 1)]
+        value = low_values + (high_values - low_values) * (position - low)
+        result[q] = np.where(sizes > 0, value, np.nan)
+    return result
+
+
+def suggest(listings, bookings, now=None, window_days=WINDOW_DAYS):
+    """Suggested prices and their basis, as arrays parallel to the listings"""
+
+    import numpy as np
+
+    now = now if now is not None else time.time()
+    count = len(listings["price"])
+    price = listings["price"]
+    priced = price > 0
+
+    # Booked nights in the window, from confirmed bookings overlapping it
+    start = now - window_days * DAY_SECONDS
+    overlap = np.minimum(bookings["check_out"], now) - np.maximum(
+        bookings["check_in"], start
+    )
+    nights = np.where(bookings["confirmed"], np.maximum(overlap, 0) / DAY_SECONDS, 0)
+    booked = np.bincount(bookings["listing"], weights=nights, minlength=count)
+    occupancy = np.minimum(booked / window_days, 1.0)
+    # What guests actually paid per night in the window, for comparison
+    stay = np.maximum(bookings["check_out"] - bookings["check_in"], DAY_SECONDS)
+    rate = bookings["total"] / (stay / DAY_SECONDS)
+    paid = np.bincount(bookings["listing"], weights=rate * nights, minlength=count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        booked_rate = np.where(booked > 0, paid / booked, np.nan)
+
+    price_order = np.argsort(price, kind="stable")
+    level = np.full(count, -1, dtype=np.int8)
+    median, low, high, comparables, group_occupancy = (
+        np.full(count, np.nan) for _ in range(5)
+    )
+    for index, columns in enumerate(LEVELS):
+        codes, groups = _group_codes(listings, columns)
+        # Only priced listings are comparables, but every listing gets a group
+        priced_codes = np.where(priced, codes, -1)
+        sizes = np.bincount(priced_codes[priced_codes >= 0], minlength=groups)
+        take = (level < 0) & (codes >= 0)
+        take[take] = sizes[codes[take]] >= (MIN_COMPARABLES if columns else 1)
+        if not take.any():
+            continue
+        stats = _group_quantiles(
+            priced_codes, groups, price, (0.25, 0.5, 0.75), price_order
+        )
+        member = priced_codes >= 0
+        occupied = np.bincount(
+            priced_codes[member], weights=occupancy[member], minlength=groups
+        )
+        group = codes[take]
+        level[take] = index
+        low[take] = stats[0.25][group]
+        median[take] = stats[0.5][group]
+        high[take] = stats[0.75][group]
+        comparables[take] = sizes[group]
+        group_occupancy[take] = occupied[group] / sizes[group]
+
+    demand = np.clip(
+        (1 + occupancy) / (1 + np.nan_to_num(group_occupancy)),
+        1 - MAX_ADJUST,
+        1 + MAX_ADJUST,
+    )
+    # Round first so the range always holds; a bound wins over a round figure
+    suggested = np.round(median * demand / ROUND_TO) * ROUND_TO
+    suggested = np.clip(suggested, low, high)
+    return {
+        "suggested": suggested,
+        "low": low,
+        "median": median,
+        "high": high,
+        "comparables": comparables,
+        "level": level,
+        "occupancy": occupancy,
+        "group_occupancy": group_occupancy,
+        "booked_rate": booked_rate,
+    }
+
+
+def write_suggestions(ids, listings, result, path):
+    """Write one JSON line per listing with a suggestion (atomically)"""
+
+    import numpy as np
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    written = 0
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        for row in np.flatnonzero(~np.isnan(result["suggested"])):
+            record = {
+                "listing": ids[row],
+                "price": float(listings["price"][row]),
+                "suggested": float(result["suggested"][row]),
+                "range": [float(result["low"][row]), float(result["high"][row])],
+                "comparables": int(result["comparables"][row]),
+                "basis": LEVEL_NAMES[result["level"][row]],
+                "occupancy": round(float(result["occupancy"][row]), 3),
+                "groupOccupancy": round(float(result["group_occupancy"][row]), 3),
+                "bookedRate": None,
+            }
+            if not np.isnan(result["booked_rate"][row]):
+                record["bookedRate"] = round(float(result["booked_rate"][row]), 2)
+            handle.write(json.dumps(record) + "\n")
+            written += 1
+    os.replace(tmp_path, path)
+    return written
+
+
+def generate(export_dir, output_path=None, now=None, root=ROOT):
+    """Suggest prices for an export and write them; returns stats"""
+
+    started = time.perf_counter()
+    ids, listings, bookings = read_exports(export_dir)
+    loaded = time.perf_counter()
+    result = suggest(listings, bookings, now=now)
+    computed = time.perf_counter()
+    output_path = output_path or os.path.join(root, OUTPUT_PATH)
+    written = write_suggestions(ids, listings, result, output_path)
+    return {
+        "listings": len(ids),
+        "bookings": len(bookings["listing"]),
+        "suggested": written,
+        "read_seconds": loaded - started,
+        "suggest_seconds": computed - loaded,
+        "seconds": time.perf_counter() - started,
+        "output_path": output_path,
+    }
+
+
+def synthetic(count, seed=0, now=None):
+    """Random listing and booking columns shaped like an export, for benchmarks"""
+
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    now = now if now is not None else time.time()
+    areas = max(count // 200, 1)
+    listings = {
+        "category": rng.integers(-1, len(search.CATEGORIES), count, dtype=np.int32),
+        "area": rng.integers(-1, areas, count, dtype=np.int32),
+        "country": rng.integers(0, 5, count, dtype=np.int32),
+        "price": np.round(rng.lognormal(8, 0.6, count)),
+    }
+    # About three bookings per listing over the last half year
+    booking_count = count * 3
+    check_in = now - rng.uniform(0, 180, booking_count) * DAY_SECONDS
+    stay = rng.integers(1, 8, booking_count) * DAY_SECONDS
+    bookings = {
+        "listing": rng.integers(0, count, booking_count, dtype=np.int32),
+        "check_in": check_in,
+        "check_out": check_in + stay,
+        "total": rng.uniform(1_000, 50_000, booking_count),
+        "confirmed": rng.random(booking_count) > 0.1,
+    }
+    return listings, bookings
+
+
+def bench(sizes=BENCH_SIZES, runs=3):
+    """[(listings, bookings, median seconds)] of suggest() on synthetic data"""
+
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()
+    results = []
+    for size in sizes:
+        listings, bookings = synthetic(size, now=now)
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            suggest(listings, bookings, now=now)
+            samples.append(time.perf_counter() - started)
+        results.append((size, len(bookings["listing"]), sorted(samples)[runs // 2]))
+    return results
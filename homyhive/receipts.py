@@ -0,0 +1,343 @@
+"""
+Payment receipts for bookings and listing promotions
+Renders one PDF receipt per completed payment from mongoexports of the
+bookings and promotions collections (JSON lines; promotions are the listing
+promotions recorded by verifyPromotionPayment). Receipts are spread over a
+process pool, and the static page furniture (brand band, labels, table header,
+footer) is drawn once per document as a form XObject, so each page only adds
+its own text.
+
+    python -m homyhive receipts bookings.jsonl promotions.jsonl
+    python -m homyhive receipts bookings.jsonl --combined build/receipts.pdf
+
+Payments only store their listing's id, so titles come from the listings
+export: listings.jsonl beside the first export, or --listings PATH. Without
+one, receipts show the listing id.
+
+Receipts that already exist are skipped unless --force is given. Needs
+reportlab; the palette comes from HomyHive_Project_Documentation.py. Text the
+core fonts can't show, like Hindi or Kannada listing titles, is drawn with
+the homyhive.fonts fallback chain.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from homyhive import ROOT, fonts, mongoexport
+
+OUTPUT_DIR = os.path.join("build", "receipts")
+
+# Mirrors controllers/payment.js and controllers/host_payment.js; only used
+# for exports that predate the stored platformFee and promotion amount
+BOOKING_MARKUP = 1.12
+PROMOTION_FEE = 500
+PROMOTION_DAYS = 7
+
+# Receipts handed to a worker at a time
+CHUNK_SIZE = 64
+
+PAGE_MARGIN = 56
+
+# (label, record field) in drawing order; labels live in the form XObject
+FIELDS = {
+    "booking": [
+        ("Receipt no.", "receipt"),
+        ("Payment ID", "paymentId"),
+        ("Order ID", "orderId"),
+        ("Paid on", "paidOn"),
+        ("Listing", "listing"),
+        ("Check-in", "checkIn"),
+        ("Check-out", "checkOut"),
+        ("Guests", "guests"),
+    ],
+    "promotion": [
+        ("Receipt no.", "receipt"),
+        ("Payment ID", "paymentId"),
+        ("Order ID", "orderId"),
+        ("Paid on", "paidOn"),
+        ("Listing", "listing"),
+        ("Featured for", "duration"),
+    ],
+}
+
+TITLES = {"booking": "Booking receipt", "promotion": "Promotion receipt"}
+
+
+def _date(field):
+    value = mongoexport.value(field)
+    if isinstance(value, datetime):
+        return value.strftime("%d %b %Y")
+    return str(value or "")
+
+
+def _money(amount):
+    return f"INR {amount:,.2f}"
+
+
+def listing_titles(path):
+    """{listing id: title} from a listings export, or {} without one"""
+
+    if not path or not os.path.exists(path):
+        return {}
+    return {
+        str(mongoexport.value(listing.get("_id"))): listing.get("title") or ""
+        for listing in mongoexport.read_records(path)
+    }
+
+
+def default_listings_path(export_paths):
+    return os.path.join(os.path.dirname(export_paths[0]), "listings.jsonl")
+
+
+def normalize(record, titles=None):
+    """Turn one exported document into the fields printed on its receipt
+
+    titles maps listing ids to their titles (see listing_titles).
+    """
+
+    kind = "booking" if "checkIn" in record else "promotion"
+    listing_id = str(mongoexport.value(record.get("listing")) or "")
+    payment_id = str(mongoexport.value(record.get("paymentId")) or "")
+    # Receipt numbers name the files, so records without a payment id fall
+    # back to their document id
+    number = payment_id.removeprefix("pay_") or "doc-" + str(
+        mongoexport.value(record.get("_id")) or ""
+    )
+    receipt = {
+        "kind": kind,
+        "receipt": f"HH-{number}",
+        "paymentId": payment_id,
+        "orderId": str(mongoexport.value(record.get("orderId")) or ""),
+        "paidOn": _date(record.get("createdAt")),
+        "listing": (titles or {}).get(listing_id) or listing_id,
+    }
+    if kind == "booking":
+        total = float(mongoexport.value(record.get("totalAmount")) or 0)
+        fee = mongoexport.value(record.get("platformFee"))
+        if fee is None:
+            fee = total - round(total / BOOKING_MARKUP, 2)
+        fee = round(float(fee), 2)
+        check_in = mongoexport.value(record.get("checkIn"))
+        check_out = mongoexport.value(record.get("checkOut"))
+        stay = "Stay"
+        if isinstance(check_in, datetime) and isinstance(check_out, datetime):
+            nights = round(abs((check_out - check_in).total_seconds()) / 86400)
+            stay = f"Stay ({nights} night{'s' if nights != 1 else ''})"
+        receipt.update(
+            checkIn=_date(check_in),
+            checkOut=_date(check_out),
+            guests=str(mongoexport.value(record.get("guests")) or ""),
+            lines=[(stay, total - fee), ("HomyHive service fee", fee)],
+            total=total,
+        )
+    else:
+        total = float(mongoexport.value(record.get("amount")) or PROMOTION_FEE)
+        days = int(mongoexport.value(record.get("days")) or PROMOTION_DAYS)
+        receipt.update(
+            duration=f"{days} days",
+            lines=[(f"Featured listing promotion ({days} days)", total)],
+            total=total,
+        )
+    return receipt
+
+
+def read_export(*paths, titles=None):
+    """Yield normalized receipts for the completed payments in the exports"""
+
+    for path in paths:
+        for record in mongoexport.read_records(path):
+            if mongoexport.value(record.get("paymentStatus")) == "completed":
+                yield normalize(record, titles)
+
+
+def _filename(receipt):
+    return f"{receipt['receipt']}.pdf"
+
+
+def _furniture(canvas, kind, width, height):
+    """Define the static parts of a receipt page as a form XObject"""
+
+    from HomyHive_Project_Documentation import (
+        BRAND_BORDER,
+        BRAND_RED,
+        BRAND_SHADE,
+        BRAND_TEXT,
+    )
+    from reportlab.lib import colors
+
+    canvas.beginForm(kind)
+    canvas.setFillColor(BRAND_RED)
+    canvas.rect(0, height - 96, width, 96, stroke=0, fill=1)
+    canvas.setFillColor(colors.white)
+    canvas.setFont("Helvetica-Bold", 26)
+    canvas.drawString(PAGE_MARGIN, height - 58, "HomyHive")
+    canvas.setFont("Helvetica", 13)
+    canvas.drawRightString(width - PAGE_MARGIN, height - 56, TITLES[kind])
+
+    canvas.setFillColor(BRAND_TEXT)
+    canvas.setFont("Helvetica-Bold", 10)
+    y = height - 140
+    for label, _ in FIELDS[kind]:
+        canvas.drawString(PAGE_MARGIN, y, label)
+        y -= 20
+
+    y -= 20
+    canvas.setFillColor(BRAND_SHADE)
+    canvas.setStrokeColor(BRAND_BORDER)
+    canvas.rect(PAGE_MARGIN, y - 8, width - 2 * PAGE_MARGIN, 26, stroke=1, fill=1)
+    canvas.setFillColor(BRAND_TEXT)
+    canvas.drawString(PAGE_MARGIN + 10, y, "Description")
+    canvas.drawRightString(width - PAGE_MARGIN - 10, y, "Amount")
+
+    canvas.setStrokeColor(BRAND_BORDER)
+    canvas.line(PAGE_MARGIN, 72, width - PAGE_MARGIN, 72)
+    canvas.setFont("Helvetica", 8)
+    canvas.drawString(
+        PAGE_MARGIN, 58, "This is a computer-generated receipt and needs no signature."
+    )
+    canvas.drawRightString(width - PAGE_MARGIN, 58, "HomyHive")
+    canvas.endForm()
+
+
+_CHAIN = None
+
+
+def _font_chain():
+    # Registered with reportlab once per worker; False when none is installed
+    global _CHAIN
+    if _CHAIN is None:
+        try:
+            _CHAIN = fonts.default_chain()
+            fonts.register_reportlab(_CHAIN)
+        except ValueError:
+            _CHAIN = False
+    return _CHAIN
+
+
+def _draw_receipt(canvas, receipt, width, height):
+    """Draw the variable text of one receipt over its furniture"""
+
+    from HomyHive_Project_Documentation import BRAND_RED, BRAND_TEXT
+
+    kind = receipt["kind"]
+    canvas.doForm(kind)
+    canvas.setFillColor(BRAND_TEXT)
+    canvas.setFont("Helvetica", 10)
+    chain = _font_chain()
+    y = height - 140
+    for _, field in FIELDS[kind]:
+        text = receipt[field][:70]
+        if chain and fonts.needs_fallback(text):
+            # Listing titles may be in Hindi or Kannada
+            fonts.draw_text(canvas, PAGE_MARGIN + 110, y, text, "Helvetica", 10, chain)
+        else:
+            canvas.drawString(PAGE_MARGIN + 110, y, text)
+        y -= 20
+
+    y -= 50
+    for description, amount in receipt["lines"]:
+        canvas.drawString(PAGE_MARGIN + 10, y, description)
+        canvas.drawRightString(width - PAGE_MARGIN - 10, y, _money(amount))
+        y -= 20
+
+    canvas.setFillColor(BRAND_RED)
+    canvas.setFont("Helvetica-Bold", 12)
+    canvas.drawString(PAGE_MARGIN + 10, y - 8, "Total paid")
+    canvas.drawRightString(width - PAGE_MARGIN - 10, y - 8, _money(receipt["total"]))
+    canvas.showPage()
+
+
+def _new_canvas(path):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen.canvas import Canvas
+
+    canvas = Canvas(path, pagesize=A4, invariant=1, pageCompression=1)
+    canvas.setAuthor("HomyHive")
+    return canvas, A4
+
+
+def render_receipt(receipt, path):
+    """Write a single receipt PDF (atomically)"""
+
+    canvas, (width, height) = _new_canvas(path + ".tmp")
+    canvas.setTitle(f"{TITLES[receipt['kind']]} {receipt['receipt']}")
+    _furniture(canvas, receipt["kind"], width, height)
+    _draw_receipt(canvas, receipt, width, height)
+    canvas.save()
+    os.replace(path + ".tmp", path)
+
+
+def render_chunk(receipts, output_dir):
+    """Render a batch of receipts in a worker; returns how many were written"""
+
+    for receipt in receipts:
+        render_receipt(receipt, os.path.join(output_dir, _filename(receipt)))
+    return len(receipts)
+
+
+def render_combined(receipts, path):
+    """Write every receipt as a page of one PDF, sharing a form per kind"""
+
+    canvas, (width, height) = _new_canvas(path + ".tmp")
+    canvas.setTitle("HomyHive receipts")
+    defined = set()
+    count = 0
+    for receipt in receipts:
+        if receipt["kind"] not in defined:
+            _furniture(canvas, receipt["kind"], width, height)
+            defined.add(receipt["kind"])
+        _draw_receipt(canvas, receipt, width, height)
+        count += 1
+    canvas.save()
+    os.replace(path + ".tmp", path)
+    return count
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate(
+    export_paths, output_dir=None, jobs=None, force=False, listings_path=None
+):
+    """Render a receipt for every payment in export_paths; returns a stats dict"""
+
+    output_dir = output_dir or os.path.join(ROOT, OUTPUT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+
+    total = skipped = rendered = 0
+    todo = []
+    if isinstance(export_paths, str):
+        export_paths = [export_paths]
+    titles = listing_titles(listings_path or default_listings_path(export_paths))
+    for receipt in read_export(*export_paths, titles=titles):
+        total += 1
+        if not force and os.path.exists(os.path.join(output_dir, _filename(receipt))):
+            skipped += 1
+        else:
+            todo.append(receipt)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(render_chunk, chunk, output_dir)
+                for chunk in _chunks(todo, CHUNK_SIZE)
+            ]
+            rendered = sum(future.result() for future in futures)
+
+    return {
+        "payments": total,
+        "rendered": rendered,
+        "skipped": skipped,
+        "seconds": time.perf_counter() - started,
+    }
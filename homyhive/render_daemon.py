@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Warm render daemon for the HomyHive PDF generators
+
+Keeps a pool of worker processes that have already imported the PDF stacks,
+built the documentation stylesheet and laid out one throwaway document, and
+serves build jobs sent over a Unix socket.
+
+    python -m homyhive.render_daemon serve --workers 2
+    python -m homyhive.render_daemon submit docs --output build/render/docs.pdf
+    python -m homyhive.render_daemon submit privacy
+
+Each request is one JSON line ({"job": "docs", "output": "/abs/path.pdf"}) and
+gets one JSON line back ({"ok": true, "output": ..., "elapsed_ms": ...}).
+
+The socket is only accessible to the user running the daemon (mode 0600, in
+$XDG_RUNTIME_DIR or a private directory under /tmp), and outputs are limited
+to each job's default path and the directories in OUTPUT_DIRS (--allow-dir
+adds more), so a client can't have the daemon overwrite arbitrary files.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import pickle
+import signal
+import socket
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from homyhive import ROOT
+
+
+def _default_socket_path():
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"homyhive-{os.getuid()}")
+    return os.path.join(runtime_dir, "homyhive-render.sock")
+
+
+SOCKET_PATH = os.environ.get("HOMYHIVE_RENDER_SOCKET") or _default_socket_path()
+# Directories jobs may write to besides their default output
+OUTPUT_DIRS = (os.path.join(ROOT, "build"),)
+
+# Per-worker warm state, filled in by _warm_worker()
+_state = {}
+
+
+def _warm_worker():
+    """Import the generators and prime styles, fonts and the section cache"""
+
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    import generate_privacy_pdf
+    import HomyHive_Project_Documentation as documentation
+
+    _state["documentation"] = documentation
+    _state["privacy"] = generate_privacy_pdf
+    _state["styles"] = documentation.build_styles()
+    _state["sections"] = {}
+
+    # One throwaway render loads the font metrics and reportlab's glyph caches
+    documentation.render_documentation(_cached_story(), io.BytesIO())
+    generate_privacy_pdf.create_privacy_pdf(io.BytesIO())
+
+
+def _cached_story():
+    """Return a fresh copy of the documentation story for today's date
+
+    Flowables are mutated while they are laid out, so the cache holds a pickled
+    snapshot which is much cheaper to load than rebuilding every Paragraph.
+    """
+
+    generated_on = _state["documentation"].generation_date()
+    sections = _state["sections"]
+    if generated_on not in sections:
+        sections.clear()
+        story = _state["documentation"].build_story(_state["styles"], generated_on)
+        sections[generated_on] = pickle.dumps(story, pickle.HIGHEST_PROTOCOL)
+    return pickle.loads(sections[generated_on])
+
+
+def _render_docs(output_path):
+    _state["documentation"].render_documentation(_cached_story(), output_path)
+
+
+def _render_privacy(output_path):
+    _state["privacy"].create_privacy_pdf(output_path)
+
+
+JOBS = {
+    "docs": (_render_docs, os.path.join(ROOT, "HomyHive_Project_Documentation.pdf")),
+    "privacy": (_render_privacy, os.path.join(ROOT, "public", "static", "privacy.pdf")),
+}
+
+
+def allowed_output(output_path, output_dirs=OUTPUT_DIRS):
+    """True if output_path is a job default or lies inside one of output_dirs"""
+
+    real = os.path.realpath(output_path)
+    if real in {os.path.realpath(default) for _, default in JOBS.values()}:
+        return True
+    for directory in output_dirs:
+        directory = os.path.realpath(directory)
+        if os.path.commonpath([real, directory]) == directory and real != directory:
+            return True
+    return False
+
+
+def _run_job(job, output_path):
+    """Worker-side entry point; returns the render time in milliseconds
+
+    Renders next to output_path and renames the result into place, so readers
+    never see a half-written PDF and a failed job leaves the old one intact.
+    """
+
+    render, _ = JOBS[job]
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    started = time.perf_counter()
+    try:
+        render(tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return (time.perf_counter() - started) * 1000
+
+
+class RenderDaemon:
+    """Unix socket server feeding a bounded job queue into warm workers"""
+
+    def __init__(
+        self, socket_path=SOCKET_PATH, workers=2, queue_size=64, output_dirs=()
+    ):
+        self.socket_path = socket_path
+        self.output_dirs = (*OUTPUT_DIRS, *output_dirs)
+        self.workers = workers
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.pool = None
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_warm_worker
+        )
+        # Start every worker process now so the first job doesn't pay warm-up
+        await asyncio.gather(
+            *(loop.run_in_executor(self.pool, time.sleep, 0) for _ in range(self.workers))
+        )
+
+        socket_dir = os.path.dirname(self.socket_path) or "."
+        os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+        info = os.stat(socket_dir)
+        if info.st_uid != os.getuid() or info.st_mode & 0o022:
+            raise PermissionError(f"{socket_dir} is writable by other users")
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        # Bind under a umask so the socket is never reachable by other users
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(
+                self._handle_client, self.socket_path
+            )
+        finally:
+            os.umask(umask)
+        os.chmod(self.socket_path, 0o600)
+        consumers = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, asyncio.current_task().cancel)
+        print(f"🖨️  Render daemon listening on {self.socket_path} ({self.workers} workers)")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+            self.pool.shutdown(cancel_futures=True)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, output_path, future = await self.queue.get()
+            try:
+                elapsed = await loop.run_in_executor(
+                    self.pool, _run_job, job, output_path
+                )
+                future.set_result(elapsed)
+            except Exception as err:
+                future.set_exception(err)
+            finally:
+                self.queue.task_done()
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._handle_request(line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(self, line):
+        received = time.perf_counter()
+        try:
+            request = json.loads(line)
+            job = request["job"]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": "expected a JSON object with a 'job' key"}
+
+        if not isinstance(job, str) or job not in JOBS:
+            return {"ok": False, "error": f"unknown job '{job}'"}
+
+        output_path = request.get("output") or JOBS[job][1]
+        if not isinstance(output_path, str) or not os.path.isabs(output_path):
+            return {"ok": False, "error": "output must be an absolute path"}
+        if not allowed_output(output_path, self.output_dirs):
+            return {"ok": False, "error": "output is outside the allowed directories"}
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((job, output_path, future))
+        except asyncio.QueueFull:
+            return {"ok": False, "error": "render queue is full"}
+
+        try:
+            render_ms = await future
+        except Exception as err:
+            return {"ok": False, "error": str(err)}
+
+        return {
+            "ok": True,
+            "job": job,
+            "output": output_path,
+            "render_ms": round(render_ms, 1),
+            "elapsed_ms": round((time.perf_counter() - received) * 1000, 1),
+        }
+
+
+def submit(job, output_path=None, socket_path=SOCKET_PATH):
+    """Send one job to a running daemon and return its JSON response"""
+
+    request = {"job": job}
+    if output_path:
+        request["output"] = os.path.abspath(output_path)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        conn.sendall(json.dumps(request).encode() + b"\n")
+        with conn.makefile("rb") as stream:
+            return json.loads(stream.readline())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Unix socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="run the render daemon")
+    serve_cmd.add_argument("--workers", type=int, default=2, help="concurrent renders")
+    serve_cmd.add_argument("--queue-size", type=int, default=64, help="max queued jobs")
+    serve_cmd.add_argument(
+        "--allow-dir", action="append", default=[], help="another output directory"
+    )
+
+    submit_cmd = commands.add_parser("submit", help="send a job to the daemon")
+    submit_cmd.add_argument("job", choices=sorted(JOBS))
+    submit_cmd.add_argument("--output", help="where to write the PDF")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        daemon = RenderDaemon(
+            args.socket, args.workers, args.queue_size, args.allow_dir
+        )
+        try:
+            asyncio.run(daemon.serve())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        return 0
+
+    response = submit(args.job, args.output, args.socket)
+    if not response.get("ok"):
+        print(f"❌ {response.get('error')}", file=sys.stderr)
+        return 1
+    print(f"📄 {response['output']} rendered in {response['elapsed_ms']} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Second-stage reranking for corpus searches
+BM25 finds the RERANK_DEPTH best chunks; this reorders them with a few cheap
+features, each scaled to 0..1 and combined with WEIGHTS:
+
+    bm25       the first-stage score, relative to the best hit
+    proximity  query terms found next to each other (within PROXIMITY_WINDOW
+               tokens) rather than scattered through the chunk
+    heading    share of the query terms in the chunk's section heading
+    prior      how useful the chunk's kind usually is to a chat user
+               (KIND_PRIORS: help and policy pages over technical docs)
+    freshness  how recently the chunk's source changed, halving every
+               FRESHNESS_HALF_LIFE days
+
+Features are computed for all candidates at once over their concatenated
+tokens. A query has a latency budget (BUDGET_MS, first stage included); the
+reranker checks it between steps and, once it is spent, returns the first-stage
+order unchanged, so a slow query never gets slower because of it. The budget
+assumes warm code paths: callers run warm() once after loading the index, so
+the numpy import and first-call setup aren't charged to a query.
+Needs numpy.
+"""
+
+import time
+
+from homyhive.retrieval import tokenize
+
+# First-stage hits the reranker reorders
+RERANK_DEPTH = 30
+# Wall-clock budget of a whole query, first stage included
+BUDGET_MS = 10.0
+
+WEIGHTS = {
+    "bm25": 1.0,
+    "proximity": 0.4,
+    "heading": 0.4,
+    "prior": 0.2,
+    "freshness": 0.1,
+}
+FEATURES = tuple(WEIGHTS)
+KIND_PRIORS = {
+    "help": 1.0,
+    "policy": 0.9,
+    "onboarding": 0.8,
+    "company": 0.5,
+    "general": 0.5,
+    "technical": 0.2,
+}
+DEFAULT_PRIOR = 0.5
+PROXIMITY_WINDOW = 3
+FRESHNESS_HALF_LIFE = 180
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def _term_ids(terms, hits, deadline):
+    """(term ids, hit of each token) over the hits' text, in order
+
+    Tokens that aren't query terms get -1.
+    """
+
+    import numpy as np
+
+    ids, owners = [], []
+    for position, (_, chunk) in enumerate(hits):
+        if time.perf_counter() > deadline:
+            raise BudgetExceeded
+        tokens = tokenize(chunk["text"])
+        ids.extend(terms.get(token, -1) for token in tokens)
+        owners.extend([position] * len(tokens))
+    return np.array(ids, dtype=np.int32), np.array(owners, dtype=np.int32)
+
+
+def features(query, hits, updated=None, now=None, deadline=None):
+    """(len(hits), len(FEATURES)) array of the features of each hit
+
+    updated maps sources to the time they last changed. Raises
+    BudgetExceeded once deadline (a time.perf_counter() value) has passed.
+    """
+
+    import numpy as np
+
+    deadline = deadline or float("inf")
+    now = now or time.time()
+    terms = {term: i for i, term in enumerate(dict.fromkeys(tokenize(query)))}
+    matrix = np.zeros((len(hits), len(FEATURES)), dtype=np.float32)
+    if not hits or not terms:
+        return matrix
+
+    scores = np.array([score for score, _ in hits], dtype=np.float32)
+    matrix[:, FEATURES.index("bm25")] = scores / max(scores.max(), 1e-9)
+
+    ids, owners = _term_ids(terms, hits, deadline)
+    if len(terms) > 1:
+        # Pairs of distinct query terms close together, per hit
+        pairs = np.zeros(len(hits), dtype=np.float32)
+        for offset in range(1, PROXIMITY_WINDOW + 1):
+            left, right = ids[:-offset], ids[offset:]
+            near = (
+                (left >= 0)
+                & (right >= 0)
+                & (left != right)
+                & (owners[:-offset] == owners[offset:])
+            )
+            pairs += np.bincount(owners[:-offset][near], minlength=len(hits))
+        proximity = np.minimum(pairs / (len(terms) - 1), 1)
+        matrix[:, FEATURES.index("proximity")] = proximity
+    if time.perf_counter() > deadline:
+        raise BudgetExceeded
+
+    heading, prior, freshness = (
+        FEATURES.index(name) for name in ("heading", "prior", "freshness")
+    )
+    for row, (_, chunk) in enumerate(hits):
+        section = set(tokenize(chunk.get("section") or ""))
+        matrix[row, heading] = len(section & terms.keys()) / len(terms)
+        matrix[row, prior] = KIND_PRIORS.get(chunk.get("kind"), DEFAULT_PRIOR)
+        changed = (updated or {}).get(chunk.get("source"))
+        if changed:
+            age_days = max(now - changed, 0) / 86400
+            matrix[row, freshness] = 0.5 ** (age_days / FRESHNESS_HALF_LIFE)
+    return matrix
+
+
+def rerank(query, hits, k, updated=None, deadline=None):
+    """([(score, chunk)], reranked) of the k best of the first-stage hits
+
+    Falls back to the first-stage order (reranked False) when the deadline
+    passes before the new order is ready.
+    """
+
+    import numpy as np
+
+    if len(hits) < 2:
+        return hits[:k], False
+    try:
+        matrix = features(query, hits, updated, deadline=deadline)
+    except BudgetExceeded:
+        return hits[:k], False
+    if deadline and time.perf_counter() > deadline:
+        return hits[:k], False
+    weights = np.array([WEIGHTS[name] for name in FEATURES], dtype=np.float32)
+    scores = matrix @ weights
+    # Stable, so ties keep their first-stage order
+    order = np.argsort(-scores, kind="stable")[:k]
+    return [(float(scores[row]), hits[row][1]) for row in order], True
+
+
+def warm(snapshot):
+    """Import numpy and run one throwaway rerank of snapshot"""
+
+    import numpy
+
+    hits = snapshot.search("booking", RERANK_DEPTH)
+    rerank("booking", hits, 1, snapshot.manifest.get("updated"))
+
+
+def search(snapshot, query, k=5, filters=None, budget_ms=BUDGET_MS):
+    """(hits, reranked): a first-stage search of snapshot, reranked in budget"""
+
+    deadline = time.perf_counter() + budget_ms / 1000
+    hits = snapshot.search(query, max(k, RERANK_DEPTH), filters)
+    return rerank(query, hits, k, snapshot.manifest.get("updated"), deadline)
@@ -0,0 +1,942 @@
+"""
+Segmented retrieval index for the RAG corpus
+Keeps the corpus chunks searchable (BM25 over their text) in an index that
+takes updates without a rebuild, LSM-style:
+
+    python -m homyhive index sync          # ingest changed corpus sources
+    python -m homyhive index search "cancellation refund"
+    python -m homyhive index merge [--force]
+    python -m homyhive index serve         # HTTP search and ingest
+
+The index is a set of immutable segments plus a manifest, in build/index/.
+Each write (a changed source, an ingestor's documents) becomes a new small
+segment named by the hash of its contents; the chunks it replaces are not
+rewritten but tombstoned in the manifest, and deletes are tombstones too.
+Committing is an atomic swap of the manifest, so a searcher always sees one
+consistent set of segments and new content is searchable as soon as its
+segment is written.
+
+Segments are merged in the background by size tier: MERGE_FACTOR segments of
+one tier become one segment of the next, and a segment that is mostly
+tombstones is rewritten alone. Merging drops tombstoned chunks and never
+blocks searches or writes; deletes that land while a merge runs are carried
+over to the merged segment.
+
+Searches can be scoped by chunk metadata (FILTER_FIELDS: audience, kind,
+locale, section, source). Every segment keeps a packed bitmap per metadata
+value; a filter is the AND across fields of the OR of its values, and it
+masks the postings before anything is scored. A filtered query scores fewer
+chunks than an unfiltered one and skips segments with no match at all.
+
+The service answers GET /search?q=...&k=... (plus filters such as
+&audience=host&kind=policy&kind=help), reranking the first-stage hits within
+a latency budget (homyhive.rerank; &rerank=0 skips it). It accepts
+documents from ingestors at POST /documents ({"source": ..., "chunks":
+[{"section": ..., "text": ...}]}, optionally with audience/kind/locale, or
+{"source": ..., "delete": true}).
+
+It also publishes the index to chat workers as deltas. A worker started with
+`index serve --primary URL` polls GET /manifest, downloads only the segments
+it doesn't have yet from GET /segments/<id>.seg (checking each against the
+content hash in its name), then switches to the new manifest atomically.
+Segments it already holds are reused in memory, so bandwidth, reload time
+and memory all scale with the change rather than the corpus.
+
+The manifest can also name a file of precomputed answers for frequent
+questions (homyhive.answers), published and pulled like a segment. Each
+snapshot serves only the answers whose query terms' chunks haven't changed
+since they were computed, while the index as a whole hasn't grown or shrunk
+by more than ANSWER_DRIFT. Needs numpy.
+"""
+
+import contextlib
+import fcntl
+import gzip
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from urllib.request import urlopen
+
+from homyhive import ROOT, corpus
+
+INDEX_DIR = os.path.join("build", "index")
+SEGMENT_DIR = "segments"
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "LOCK"
+# Bump when segments change shape; an index in an older format is rebuilt
+FORMAT_VERSION = 2
+
+# Segments of one tier merged together; a tier holds segments of up to
+# MERGE_FACTOR ** tier chunk batches
+MERGE_FACTOR = 4
+# A segment with at least this share of its chunks deleted is rewritten
+TOMBSTONE_RATIO = 0.3
+POLL_SECONDS = 2
+PULL_TIMEOUT = 30
+# Seconds an unreferenced segment file is kept before it is deleted
+COLLECT_AFTER = 60
+
+# Chunk metadata searches can be filtered on
+FILTER_FIELDS = ("audience", "kind", "locale", "section", "source")
+# Values that match any filter on their field: "all" chunks are for hosts
+# and guests alike
+MATCH_ANY = {"audience": "all"}
+# Relative change in the live chunk count or average length after which
+# precomputed answers are all dropped (their BM25 scores have drifted)
+ANSWER_DRIFT = 0.1
+# Chunk metadata a precomputed answer depends on besides the chunk itself
+FINGERPRINT_FIELDS = ("kind", "audience", "locale")
+# Filter masks a snapshot keeps before starting over
+MASK_CACHE_SIZE = 256
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+")
+_SEGMENT_NAME = re.compile(r"[0-9a-f]{16}\.(seg|ans)")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have how i if in is it its me"
+    " my of on or our so than that the their there this to was we what when"
+    " where which who will with you your".split()
+)
+
+
+def tokenize(text):
+    return [
+        token
+        for token in _TOKEN.findall(text.lower())
+        if token not in STOPWORDS and not token.startswith("_")
+    ]
+
+
+def query_key(query):
+    """The normalized form cached answers are looked up by"""
+
+    return " ".join(tokenize(query))
+
+
+def segment_id_of(payload):
+    """A segment's id: the hash of its uncompressed contents"""
+
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class Segment:
+    """An immutable batch of chunks with its own postings"""
+
+    def __init__(self, segment_id, chunks, postings, lengths):
+        import numpy as np
+
+        self.id = segment_id
+        self.chunks = chunks
+        self.postings = {
+            term: (np.array(docs, dtype=np.int32), np.array(tfs, dtype=np.float32))
+            for term, (docs, tfs) in postings.items()
+        }
+        self.lengths = np.array(lengths, dtype=np.float32)
+
+        # Packed (8 chunks a byte) bitmap per metadata value
+        docs = {}
+        for doc, chunk in enumerate(chunks):
+            for field in FILTER_FIELDS:
+                docs.setdefault((field, chunk.get(field)), []).append(doc)
+        self.bitmaps = {field: {} for field in FILTER_FIELDS}
+        for (field, value), members in docs.items():
+            bits = np.zeros(len(chunks), dtype=bool)
+            bits[members] = True
+            self.bitmaps[field][value] = np.packbits(bits)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def matching(self, filters):
+        """Bool mask of the chunks matching every filter ({field: values})"""
+
+        import numpy as np
+
+        result = None
+        for field, values in filters.items():
+            bitmaps = self.bitmaps[field]
+            values = set(values)
+            if field in MATCH_ANY:
+                values.add(MATCH_ANY[field])
+            union = np.zeros((len(self.chunks) + 7) // 8, dtype=np.uint8)
+            for value in values & bitmaps.keys():
+                union |= bitmaps[value]
+            result = union if result is None else result & union
+            if not result.any():
+                break
+        return np.unpackbits(result, count=len(self.chunks)).astype(bool)
+
+    @staticmethod
+    def encode(chunks):
+        """(segment id, file bytes) of a segment holding chunks"""
+
+        postings, lengths = {}, []
+        for doc, chunk in enumerate(chunks):
+            tokens = tokenize(chunk["text"])
+            lengths.append(len(tokens))
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                docs, tfs = postings.setdefault(token, ([], []))
+                docs.append(doc)
+                tfs.append(count)
+        payload = json.dumps(
+            {
+                "version": FORMAT_VERSION,
+                "chunks": chunks,
+                "postings": postings,
+                "lengths": lengths,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        ).encode()
+        # mtime=0 keeps the file bytes a function of the contents
+        return segment_id_of(payload), gzip.compress(payload, mtime=0)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as handle:
+            data = json.loads(gzip.decompress(handle.read()))
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: segment format {data.get('version')}")
+        segment_id = os.path.basename(path).split(".")[0]
+        return cls(segment_id, data["chunks"], data["postings"], data["lengths"])
+
+
+def _empty_manifest():
+    return {
+        "version": FORMAT_VERSION,
+        "generation": 0,
+        "segments": [],
+        "tombstones": {},
+        "sources": {},
+        "updated": {},
+        "answers": None,
+    }
+
+
+class Snapshot:
+    """A consistent, read-only view of the index at one manifest generation"""
+
+    def __init__(self, manifest, segments, answers=None):
+        import numpy as np
+
+        self.manifest = manifest
+        self.generation = manifest["generation"]
+        self.segments = [segments[entry["id"]] for entry in manifest["segments"]]
+        self.deleted = {}
+        live_docs = live_length = 0
+        for segment in self.segments:
+            deleted = np.zeros(len(segment), dtype=bool)
+            deleted[manifest["tombstones"].get(segment.id, [])] = True
+            self.deleted[segment.id] = deleted
+            live_docs += int((~deleted).sum())
+            live_length += float(segment.lengths[~deleted].sum())
+        self.live_docs = live_docs
+        self.average_length = live_length / live_docs if live_docs else 1.0
+        self._masks = {}
+        # Precomputed answers (homyhive.answers), minus the ones gone stale
+        self.answer_cache = answers
+        self.answers = self._valid_answers(answers) if answers else {}
+
+    def __len__(self):
+        return self.live_docs
+
+    def fingerprints(self, terms):
+        """{term: hash of the live chunks containing it}
+
+        Each chunk counts with its id (a hash of its source, section and
+        text), the metadata results are filtered and reranked on, and when its
+        source last changed, so a cached answer goes stale with any of them.
+        """
+
+        updated = self.manifest.get("updated", {})
+        chunks = {term: [] for term in terms}
+        for segment in self.segments:
+            deleted = self.deleted[segment.id]
+            for term in chunks.keys() & segment.postings.keys():
+                docs = segment.postings[term][0]
+                for doc in docs[~deleted[docs]]:
+                    chunk = segment.chunks[doc]
+                    fields = [chunk["id"], updated.get(chunk["source"], 0)]
+                    fields += [chunk.get(name) for name in FINGERPRINT_FIELDS]
+                    chunks[term].append(json.dumps(fields))
+        return {
+            term: hashlib.sha256("\n".join(sorted(lines)).encode()).hexdigest()[:16]
+            for term, lines in chunks.items()
+        }
+
+    def stats(self):
+        """The collection statistics every BM25 score depends on"""
+
+        return {"docs": self.live_docs, "average_length": self.average_length}
+
+    def _valid_answers(self, answers):
+        """The cached answers none of whose terms' chunks changed since
+
+        Scores also depend on the chunk count and average length of the whole
+        index, which almost every change moves a little; an answer is kept
+        until either has drifted by ANSWER_DRIFT since it was computed.
+        """
+
+        stats = self.stats()
+
+        def close(computed):
+            return computed is not None and all(
+                abs(value - computed[name]) <= ANSWER_DRIFT * computed[name]
+                for name, value in stats.items()
+            )
+
+        fingerprints = answers["fingerprints"]
+        current = self.fingerprints(fingerprints)
+        return {
+            key: entry
+            for key, entry in answers["answers"].items()
+            if close(entry.get("stats"))
+            and all(current.get(term) == fingerprints.get(term) for term in key.split())
+        }
+
+    def answer(self, query, k):
+        """Cached results for query, or None when it has to be searched"""
+
+        entry = self.answers.get(query_key(query))
+        if entry is None or k > self.answer_cache["k"]:
+            return None
+        return entry
+
+    def chunks(self):
+        """Every live chunk"""
+
+        for segment in self.segments:
+            deleted = self.deleted[segment.id]
+            for doc, chunk in enumerate(segment.chunks):
+                if not deleted[doc]:
+                    yield chunk
+
+    def _allowed(self, segment, filters):
+        """Live chunks of segment matching filters, cached per filter set"""
+
+        fields = tuple(sorted((f, tuple(sorted(v))) for f, v in filters.items()))
+        key = (segment.id, fields)
+        if key not in self._masks:
+            if len(self._masks) >= MASK_CACHE_SIZE:
+                self._masks.clear()
+            self._masks[key] = segment.matching(filters) & ~self.deleted[segment.id]
+        return self._masks[key]
+
+    def search(self, query, k=5, filters=None):
+        """[(score, chunk)] of the k best BM25 matches, best first
+
+        filters ({field: [values]}) restricts the chunks considered. Document
+        frequencies are those of the whole index and, like the chunk count and
+        average length, leave out tombstoned chunks, so scores don't depend on
+        when the last merge ran.
+        """
+
+        import numpy as np
+
+        terms = set(tokenize(query))
+        if not terms or not self.live_docs:
+            return []
+        idf = {}
+        for term in terms:
+            frequency = sum(
+                int((~self.deleted[segment.id][segment.postings[term][0]]).sum())
+                for segment in self.segments
+                if term in segment.postings
+            )
+            if frequency:
+                idf[term] = math.log(
+                    1 + (self.live_docs - frequency + 0.5) / (frequency + 0.5)
+                )
+
+        best = []
+        for segment in self.segments:
+            allowed = self._allowed(segment, filters) if filters else None
+            if allowed is not None and not allowed.any():
+                continue
+            scores = np.zeros(len(segment), dtype=np.float32)
+            matched = []
+            for term, weight in idf.items():
+                if term not in segment.postings:
+                    continue
+                docs, tfs = segment.postings[term]
+                if allowed is not None:
+                    keep = allowed[docs]
+                    docs, tfs = docs[keep], tfs[keep]
+                norm = 1 - BM25_B + BM25_B * segment.lengths[docs] / self.average_length
+                scores[docs] += weight * tfs * (BM25_K1 + 1) / (tfs + BM25_K1 * norm)
+                matched.append(docs)
+            if not matched:
+                continue
+            if sum(map(len, matched)) * 8 < len(segment):
+                # Few postings: collect their docs rather than scan the segment
+                hits = np.unique(np.concatenate(matched))
+                if allowed is None:
+                    hits = hits[~self.deleted[segment.id][hits]]
+            else:
+                if allowed is None:
+                    scores[self.deleted[segment.id]] = 0
+                hits = np.flatnonzero(scores)
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+            best.extend((float(scores[doc]), segment.chunks[doc]) for doc in hits)
+        return heapq.nlargest(k, best, key=lambda hit: hit[0])
+
+
+class Index:
+    """Reads, writes and merges the segmented index in one directory
+
+    Writes from several processes are serialized by a lock file; each one
+    re-reads the manifest under the lock, so a CLI sync and a running service
+    can share the index.
+    """
+
+    def __init__(self, path=None, root=ROOT):
+        self.root = root
+        self.path = path or os.path.join(root, INDEX_DIR)
+        self.segment_dir = os.path.join(self.path, SEGMENT_DIR)
+        self._segments = {}
+        self._answers_file = (None, None)
+        self._lock = threading.Lock()
+        self._merging = threading.Lock()
+        self._reloading = threading.Lock()
+        self.snapshot = None
+        self.reload()
+
+    def _manifest_path(self):
+        return os.path.join(self.path, MANIFEST_NAME)
+
+    def _segment_path(self, segment_id, suffix="seg"):
+        return os.path.join(self.segment_dir, f"{segment_id}.{suffix}")
+
+    @staticmethod
+    def _live_files(manifest):
+        """Names of the files in the segment directory manifest refers to"""
+
+        names = {f"{entry['id']}.seg" for entry in manifest["segments"]}
+        if manifest.get("answers"):
+            names.add(f"{manifest['answers']}.ans")
+        return names
+
+    def read_manifest(self):
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return _empty_manifest()
+        if manifest.get("version") != FORMAT_VERSION:
+            return _empty_manifest()
+        return manifest
+
+    def _write_manifest(self, manifest):
+        path = self._manifest_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    @contextlib.contextmanager
+    def _writing(self):
+        os.makedirs(self.segment_dir, exist_ok=True)
+        with self._lock, open(os.path.join(self.path, LOCK_NAME), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield self.read_manifest()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _store_segment(self, segment_id, data, suffix="seg"):
+        path = self._segment_path(segment_id, suffix)
+        if not os.path.exists(path):
+            os.makedirs(self.segment_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as handle:
+                handle.write(data)
+            os.replace(tmp_path, path)
+
+    def _write_segment(self, chunks):
+        segment_id, data = Segment.encode(chunks)
+        self._store_segment(segment_id, data)
+        return segment_id
+
+    def segment_bytes(self, name):
+        """A segment or answers file of the current manifest, or None"""
+
+        if not _SEGMENT_NAME.fullmatch(name):
+            return None
+        if name not in self._live_files(self.read_manifest()):
+            return None
+        try:
+            with open(os.path.join(self.segment_dir, name), "rb") as handle:
+                return handle.read()
+        except OSError:
+            return None
+
+    def pull(self, url, timeout=PULL_TIMEOUT):
+        """Catch up with the index published at url; returns stats or None
+
+        Only segments missing here are downloaded. The manifest is switched
+        once all of them are in place, so searches see the old or the new
+        index and never a mix.
+        """
+
+        with urlopen(f"{url}/manifest", timeout=timeout) as response:
+            manifest = json.load(response)
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{url}: index format {manifest.get('version')}")
+        if manifest == self.read_manifest():
+            return None
+        missing = [
+            name
+            for name in sorted(self._live_files(manifest))
+            if not os.path.exists(os.path.join(self.segment_dir, name))
+        ]
+        downloaded = 0
+        for name in missing:
+            with urlopen(f"{url}/segments/{name}", timeout=timeout) as response:
+                data = response.read()
+            segment_id, suffix = name.split(".")
+            if segment_id_of(gzip.decompress(data)) != segment_id:
+                raise ValueError(f"{url}: {name} doesn't match its hash")
+            self._store_segment(segment_id, data, suffix)
+            downloaded += len(data)
+        with self._writing():
+            self._write_manifest(manifest)
+        self.reload()
+        self._collect()
+        return {
+            "generation": manifest["generation"],
+            "downloaded": len(missing),
+            "reused": len(self._live_files(manifest)) - len(missing),
+            "bytes": downloaded,
+        }
+
+    def _segment(self, segment_id):
+        segment = self._segments.get(segment_id)
+        if segment is None:
+            segment = Segment.load(self._segment_path(segment_id))
+            self._segments[segment_id] = segment
+        return segment
+
+    def reload(self):
+        """Switch to the current manifest; True if it changed"""
+
+        with self._reloading:
+            manifest = self.read_manifest()
+            if self.snapshot and self.snapshot.manifest == manifest:
+                return False
+            wanted = {entry["id"] for entry in manifest["segments"]}
+            segments = {segment_id: self._segment(segment_id) for segment_id in wanted}
+            # Segments merged away stay alive as long as a search still uses them
+            self._segments = segments
+            answers = self._answers(manifest.get("answers"))
+            self.snapshot = Snapshot(manifest, segments, answers)
+            return True
+
+    def _answers(self, answers_id):
+        if not answers_id:
+            return None
+        if self._answers_file[0] != answers_id:
+            path = self._segment_path(answers_id, "ans")
+            try:
+                with open(path, "rb") as handle:
+                    answers = json.loads(gzip.decompress(handle.read()))
+            except (OSError, ValueError) as err:
+                print(f"⚠️  answers {answers_id}: {err}")
+                return None
+            self._answers_file = (answers_id, answers)
+        return self._answers_file[1]
+
+    def write_answers(self, answers):
+        """Publish precomputed answers with the manifest they were built on
+
+        Returns the answers file's id, or None when the index has moved past
+        answers["generation"] meanwhile (they would be stale on arrival).
+        """
+
+        payload = json.dumps(answers, ensure_ascii=False, sort_keys=True).encode()
+        answers_id = segment_id_of(payload)
+        self._store_segment(answers_id, gzip.compress(payload, mtime=0), "ans")
+        with self._writing() as manifest:
+            if manifest["generation"] != answers["generation"]:
+                return None
+            # Not a new generation: the chunks are the same
+            manifest["answers"] = answers_id
+            self._write_manifest(manifest)
+        self.reload()
+        return answers_id
+
+    def _commit(self, manifest):
+        manifest["generation"] += 1
+        self._write_manifest(manifest)
+        self.reload()
+
+    def _tombstone(self, manifest, sources):
+        """Tombstone every live chunk of the given sources"""
+
+        for entry in manifest["segments"]:
+            segment = self._segment(entry["id"])
+            dead = set(manifest["tombstones"].get(segment.id, []))
+            hits = [
+                doc
+                for doc, chunk in enumerate(segment.chunks)
+                if chunk["source"] in sources and doc not in dead
+            ]
+            if hits:
+                manifest["tombstones"][segment.id] = sorted(dead.union(hits))
+
+    def update(self, documents, digests=None):
+        """Replace the chunks of each source in documents ({source: chunks})
+
+        A source mapped to None (or no chunks) is deleted. digests records the
+        source file hashes sync compares against.
+        """
+
+        chunks = [chunk for batch in documents.values() for chunk in batch or ()]
+        segment_id = self._write_segment(chunks) if chunks else None
+        with self._writing() as manifest:
+            self._tombstone(manifest, set(documents))
+            if segment_id in {entry["id"] for entry in manifest["segments"]}:
+                # The same chunks were written before (a source changed back):
+                # that segment holds exactly them, so it comes back to life
+                manifest["tombstones"].pop(segment_id, None)
+            elif segment_id:
+                manifest["segments"].append(
+                    {"id": segment_id, "tier": 0, "docs": len(chunks)}
+                )
+            # When each source last changed, for rerank's freshness feature
+            updated = manifest.setdefault("updated", {})
+            for source, batch in documents.items():
+                if batch:
+                    updated[source] = int(time.time())
+                else:
+                    updated.pop(source, None)
+            for source, digest in (digests or {}).items():
+                if digest is None:
+                    manifest["sources"].pop(source, None)
+                else:
+                    manifest["sources"][source] = digest
+            self._commit(manifest)
+        return len(chunks)
+
+    def sync(self):
+        """Re-ingest corpus sources whose files changed; returns their names"""
+
+        digests = {}
+        for source in corpus.source_paths(self.root):
+            with open(os.path.join(self.root, source), "rb") as handle:
+                digests[source] = hashlib.sha256(handle.read()).hexdigest()
+        known = self.read_manifest()["sources"]
+        changed = {
+            source for source, digest in digests.items() if known.get(source) != digest
+        }
+        removed = set(known) - set(digests)
+        if not changed and not removed:
+            return []
+        documents = {
+            source: list(corpus.chunk_source(self.root, source)) for source in changed
+        }
+        documents.update({source: None for source in removed})
+        self.update(
+            documents,
+            {**{s: digests[s] for s in changed}, **{s: None for s in removed}},
+        )
+        return sorted(changed | removed)
+
+    def _merge_plan(self, manifest, force=False):
+        """Lists of segment ids to merge, with the tier of each result"""
+
+        entries = manifest["segments"]
+        if force:
+            if len(entries) < 2:
+                return []
+            top = max(entry["tier"] for entry in entries)
+            return [([entry["id"] for entry in entries], top + 1)]
+        plans = []
+        tiers = {}
+        for entry in entries:
+            tiers.setdefault(entry["tier"], []).append(entry["id"])
+        for tier, ids in sorted(tiers.items()):
+            for start in range(0, len(ids) - MERGE_FACTOR + 1, MERGE_FACTOR):
+                plans.append((ids[start : start + MERGE_FACTOR], tier + 1))
+        planned = {segment_id for ids, _ in plans for segment_id in ids}
+        for entry in entries:
+            dead = len(manifest["tombstones"].get(entry["id"], []))
+            if entry["id"] not in planned and dead >= TOMBSTONE_RATIO * entry["docs"]:
+                plans.append(([entry["id"]], entry["tier"]))
+        return plans
+
+    def merge(self, force=False):
+        """Run one round of merges; returns the number of segments merged"""
+
+        if not self._merging.acquire(blocking=False):
+            return 0
+        try:
+            return self._merge(force)
+        finally:
+            self._merging.release()
+
+    def _merge(self, force):
+        manifest = self.read_manifest()
+        merged = 0
+        for ids, tier in self._merge_plan(manifest, force):
+            chunks, origin = [], {}
+            for segment_id in ids:
+                dead = set(manifest["tombstones"].get(segment_id, []))
+                for doc, chunk in enumerate(self._segment(segment_id).chunks):
+                    if doc not in dead:
+                        origin[(segment_id, doc)] = len(chunks)
+                        chunks.append(chunk)
+            segment_id = self._write_segment(chunks) if chunks else None
+
+            with self._writing() as current:
+                present = [e for e in current["segments"] if e["id"] in ids]
+                if len(present) != len(ids):
+                    continue  # merged by another process meanwhile
+                # Deletes committed while this merge ran apply to the new segment
+                late = []
+                for old_id in ids:
+                    for doc in current["tombstones"].pop(old_id, []):
+                        if (old_id, doc) in origin:
+                            late.append(origin[(old_id, doc)])
+                position = current["segments"].index(present[0])
+                current["segments"] = [
+                    e for e in current["segments"] if e["id"] not in ids
+                ]
+                if segment_id:
+                    current["segments"].insert(
+                        position, {"id": segment_id, "tier": tier, "docs": len(chunks)}
+                    )
+                    if late:
+                        current["tombstones"][segment_id] = sorted(late)
+                self._commit(current)
+            merged += len(ids)
+        self._collect()
+        return merged
+
+    def _collect(self):
+        """Delete segment files the manifest no longer refers to
+
+        Files younger than COLLECT_AFTER are kept: another writer may have
+        written one and not committed it yet.
+        """
+
+        live = self._live_files(self.read_manifest())
+        cutoff = time.time() - COLLECT_AFTER
+        for name in os.listdir(self.segment_dir):
+            path = os.path.join(self.segment_dir, name)
+            with contextlib.suppress(OSError):
+                if name not in live and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+
+    def stats(self):
+        manifest = self.read_manifest()
+        return {
+            "generation": manifest["generation"],
+            "segments": [
+                {
+                    **entry,
+                    "deleted": len(manifest["tombstones"].get(entry["id"], [])),
+                }
+                for entry in manifest["segments"]
+            ],
+            "live": len(self.snapshot),
+            "sources": len(manifest["sources"]),
+        }
+
+
+class IndexService:
+    """An Index kept current by a background thread
+
+    The thread ingests changed corpus sources, runs merges and picks up
+    commits made by other processes; with a primary URL it follows that
+    service's index instead and is read-only. Searches use whichever snapshot
+    is current when they start and never wait for it.
+    """
+
+    def __init__(self, index, sync_sources=True, primary=None):
+        self.index = index
+        self.sync_sources = sync_sources and not primary
+        self.primary = primary
+
+    def _poll(self):
+        if self.primary:
+            pulled = self.index.pull(self.primary)
+            if pulled:
+                print(
+                    f"📥 generation {pulled['generation']}:"
+                    f" {pulled['downloaded']} segments ({pulled['bytes']:,} bytes)"
+                    f" downloaded, {pulled['reused']} reused"
+                )
+            return
+        if self.sync_sources:
+            self.index.sync()
+        self.index.merge()
+        self.index.reload()
+        cache = self.index.snapshot.answer_cache
+        if cache and cache["generation"] != self.index.snapshot.generation:
+            from homyhive import answers
+
+            refreshed = answers.refresh(self.index)
+            if refreshed:
+                print(
+                    f"💬 answers for generation {refreshed['generation']}:"
+                    f" {refreshed['computed']} recomputed, {refreshed['kept']} kept"
+                )
+
+    def watch(self, interval=POLL_SECONDS):
+        def poll():
+            while True:
+                time.sleep(interval)
+                try:
+                    self._poll()
+                except (OSError, ValueError) as err:
+                    print(f"⚠️  index: {err}")
+
+        threading.Thread(target=poll, daemon=True).start()
+
+    def search(self, query, k=5, filters=None, rerank=True):
+        from homyhive import rerank as reranker
+
+        started = time.perf_counter()
+        snapshot = self.index.snapshot
+        cached = snapshot.answer(query, k) if rerank and not filters else None
+        if cached:
+            results, reranked = cached["results"][:k], cached["reranked"]
+        else:
+            if rerank:
+                hits, reranked = reranker.search(snapshot, query, k, filters)
+            else:
+                hits, reranked = snapshot.search(query, k, filters), False
+            results = [dict(chunk, score=round(score, 4)) for score, chunk in hits]
+        return {
+            "success": True,
+            "generation": snapshot.generation,
+            "reranked": reranked,
+            "cached": cached is not None,
+            "results": results,
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    def ingest(self, body):
+        """(status, body) for a POST /documents request"""
+
+        if self.primary:
+            return 409, {"success": False, "message": "Read-only replica"}
+        source = body.get("source")
+        if not isinstance(source, str) or not source:
+            return 400, {"success": False, "message": "source is required"}
+        if body.get("delete"):
+            self.index.update({source: None})
+            return 200, {"success": True, "chunks": 0}
+        defaults = {
+            "audience": corpus.DEFAULT_AUDIENCE,
+            "kind": "general",
+            "locale": corpus.DEFAULT_LOCALE,
+        }
+        chunks = []
+        for chunk in body.get("chunks") or ():
+            section, text = chunk.get("section") or "", chunk.get("text") or ""
+            metadata = {
+                field: str(chunk.get(field) or body.get(field) or default)
+                for field, default in defaults.items()
+            }
+            for piece in corpus.split_words(text):
+                chunks.append(
+                    {
+                        "id": corpus.chunk_id(source, section, piece),
+                        "source": source,
+                        "section": section,
+                        "text": piece,
+                        **metadata,
+                    }
+                )
+        count = self.index.update({source: chunks})
+        return 200, {"success": True, "chunks": count}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        params = {key: values[0] for key, values in query.items()}
+        if url.path == "/search":
+            try:
+                k = min(max(int(params.get("k", 5)), 1), 50)
+            except ValueError:
+                k = 5
+            filters = {
+                field: values
+                for field, values in query.items()
+                if field in FILTER_FIELDS
+            }
+            rerank = params.get("rerank") != "0"
+            hits = self.service.search(params.get("q", ""), k, filters, rerank)
+            return self._reply(200, hits)
+        if url.path == "/stats":
+            return self._reply(200, self.service.index.stats())
+        if url.path == "/manifest":
+            return self._reply(200, self.service.index.read_manifest())
+        if url.path.startswith("/segments/"):
+            data = self.service.index.segment_bytes(url.path[len("/segments/") :])
+            if data is not None:
+                return self._send(200, "application/gzip", data)
+        self._reply(404, {"success": False, "message": "Not found"})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/documents":
+            return self._reply(404, {"success": False, "message": "Not found"})
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._reply(400, {"success": False, "message": "Invalid JSON"})
+        self._reply(*self.service.ingest(body))
+
+    def _reply(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode()
+        self._send(status, "application/json", payload)
+
+    def _send(self, status, content_type, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service, host="127.0.0.1", port=8768):
+    from homyhive import rerank
+
+    handler = type("Handler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    # So the first request's rerank budget isn't spent importing numpy
+    rerank.warm(service.index.snapshot)
+    service.watch()
+    following = f", following {service.primary}" if service.primary else ""
+    print(
+        f"📚 Corpus index on http://{host}:{port}"
+        f" ({len(service.index.snapshot):,} chunks{following})"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
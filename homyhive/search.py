@@ -0,0 +1,475 @@
+"""
+Faceted listing search
+Answers the query listings.index accepts (search, category, minPrice,
+maxPrice, guests, sortBy) from an in-memory index of a listings export, so
+the app doesn't scan the collection with a $regex per request:
+
+    python -m homyhive search exports/ --query "search=goa&sortBy=price-low"
+    python -m homyhive search exports/ --serve     # HTTP lookup for the app
+
+exports/ holds mongoexport JSON lines (listings.jsonl and, optionally,
+hosts.jsonl; listings of hosts that aren't approved are hidden, as in the
+index aggregation). The index is
+
+- a trigram inverted index over title, description, location and country;
+  search stays a case-insensitive substring (or regex) match, the trigrams
+  only narrow down which listings need checking
+- one bitmap per category, which also gives the facet counts
+- price and guest columns sorted once, so ranges are two binary searches
+- a precomputed order for every sortBy
+
+The service answers GET /search with the ids in display order, the category
+facet counts of the other filters, and the collection-wide category counts,
+price stats and popular locations the index page shows. Changed export files
+are re-indexed in the background while the old index keeps answering. Used by
+listings.index when LISTING_SEARCH_URL is set. Needs numpy.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from homyhive import mongoexport
+
+# Mirrors validCategories in controllers/listings.js
+CATEGORIES = [
+    "trending",
+    "rooms",
+    "iconic-cities",
+    "mountains",
+    "beaches",
+    "castles",
+    "pools",
+    "lakefront",
+    "countryside",
+    "camping",
+    "cabins",
+    "farms",
+    "tiny-homes",
+    "treehouses",
+    "boats",
+    "windmills",
+    "caves",
+    "domes",
+    "luxe",
+    "design",
+    "vineyards",
+    "golfing",
+    "skiing",
+    "surfing",
+    "national-parks",
+    "desert",
+    "arctic",
+    "tropical",
+    "historical",
+]
+
+SORTS = ("price-low", "price-high", "newest", "rating")
+DEFAULT_SORT = "newest"
+TEXT_FIELDS = ("title", "description", "location", "country")
+# Joins a listing's text fields; never part of a search, so nothing matches
+# across two fields
+FIELD_SEPARATOR = "\x00"
+
+# Characters that make search a real regex rather than a plain substring
+_REGEX_CHARS = re.compile(r"[\\^$.|?*+()\[\]{}]")
+# parseInt(): leading integer of a string
+_LEADING_INT = re.compile(r"\s*([+-]?\d+)")
+
+
+def _trigrams(text):
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def _fields_match(pattern, text):
+    # A regex is matched field by field, as MongoDB does
+    return any(pattern.search(field) for field in text.split(FIELD_SEPARATOR))
+
+
+def text_field(field):
+    """A listing text field as a string ("" if missing)"""
+
+    # Seeded listings store location as text, geocoded ones as an object
+    if isinstance(field, dict):
+        field = field.get("address")
+    return field if isinstance(field, str) else ""
+
+
+def _number(field):
+    # guests is a String in the schema; missing or unparsable becomes NaN
+    try:
+        return float(mongoexport.value(field))
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _created(listing):
+    created = mongoexport.value(listing.get("createdAt"))
+    if isinstance(created, datetime):
+        return created.timestamp()
+    # Listings without timestamps: the ObjectId carries the creation time
+    try:
+        return int(str(mongoexport.value(listing.get("_id")))[:8], 16)
+    except ValueError:
+        return 0
+
+
+def js_int(value):
+    """A query parameter as the controller reads it (isNaN, then parseInt)"""
+
+    if not value:
+        return None
+    try:
+        float(value)
+    except ValueError:
+        return None
+    match = _LEADING_INT.match(value)
+    return int(match.group(1)) if match else None
+
+
+def host_statuses(path):
+    """{host id: applicationStatus} from a hosts export, or None without one"""
+
+    if not os.path.exists(path):
+        return None
+    statuses = {}
+    for host in mongoexport.read_records(path):
+        statuses[str(mongoexport.value(host.get("_id")))] = host.get(
+            "applicationStatus"
+        )
+    return statuses
+
+
+class ListingIndex:
+    """Search and facet structures for one listings export"""
+
+    def __init__(self, listings, host_statuses=None):
+        import numpy as np
+
+        host_statuses = host_statuses or {}
+        self.ids = []
+        texts = []
+        prices, guests, created, ratings, categories = [], [], [], [], []
+        visible = []
+        locations = Counter()
+        for listing in listings:
+            self.ids.append(str(mongoexport.value(listing.get("_id"))))
+            texts.append(
+                FIELD_SEPARATOR.join(
+                    text_field(listing.get(field)).lower() for field in TEXT_FIELDS
+                )
+            )
+            prices.append(_number(listing.get("price") or 0))
+            guests.append(_number(listing.get("guests")))
+            created.append(_created(listing))
+            ratings.append(_number(listing.get("averageRating")))
+            category = listing.get("category")
+            categories.append(
+                CATEGORIES.index(category) if category in CATEGORIES else -1
+            )
+            # The $lookup/$unwind keeps listings without a (known) host
+            host = str(mongoexport.value(listing.get("host")) or "")
+            status = host_statuses.get(host, "approved")
+            visible.append(status == "approved")
+            if isinstance(listing.get("location"), str):
+                locations[listing["location"]] += 1
+        self.texts = texts
+
+        postings = defaultdict(list)
+        for doc, text in enumerate(texts):
+            for gram in _trigrams(text):
+                postings[gram].append(doc)
+        self.postings = {
+            gram: np.array(docs, dtype=np.int32) for gram, docs in postings.items()
+        }
+
+        self.id_array = np.array(self.ids, dtype=object)
+        self.visible = np.array(visible, dtype=bool)
+        self.price = np.array(prices, dtype=np.float64)
+        self.guests = np.array(guests, dtype=np.float64)
+        self.category = np.array(categories, dtype=np.int16)
+        self.category_bitmaps = [
+            self.category == code for code in range(len(CATEGORIES))
+        ]
+
+        # Sorted columns for range filters; NaNs sort last and are cut off
+        self.price_order = np.argsort(self.price, kind="stable")
+        self.price_sorted = self.price[self.price_order]
+        self.price_valid = int(np.count_nonzero(~np.isnan(self.price)))
+        self.guest_order = np.argsort(self.guests, kind="stable")
+        self.guests_sorted = self.guests[self.guest_order]
+        self.guests_valid = int(np.count_nonzero(~np.isnan(self.guests)))
+
+        created = np.array(created, dtype=np.float64)
+        ratings = np.array(ratings, dtype=np.float64)
+        # Missing ratings sort last, as nulls do in a descending Mongo sort
+        self.orders = {
+            "price-low": self.price_order,
+            "price-high": np.argsort(-self.price, kind="stable"),
+            "newest": np.argsort(-created, kind="stable"),
+            "rating": np.argsort(-ratings, kind="stable"),
+        }
+
+        self.summary = self._summary(locations)
+
+    @classmethod
+    def from_exports(cls, export_dir):
+        hosts = host_statuses(os.path.join(export_dir, "hosts.jsonl"))
+        listings = mongoexport.read_records(os.path.join(export_dir, "listings.jsonl"))
+        return cls(listings, hosts)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _summary(self, locations):
+        import numpy as np
+
+        # Collection-wide figures listings.index shows next to the results
+        counts = np.bincount(self.category + 1, minlength=len(CATEGORIES) + 1)
+        category_counts = [
+            {"_id": CATEGORIES[code - 1] if code else None, "count": int(count)}
+            for code, count in enumerate(counts)
+            if count
+        ]
+        category_counts.sort(key=lambda entry: -entry["count"])
+        prices = self.price[~np.isnan(self.price)]
+        price_stats = None
+        if len(prices):
+            price_stats = {
+                "minPrice": float(prices.min()),
+                "maxPrice": float(prices.max()),
+                "avgPrice": float(prices.mean()),
+            }
+        return {
+            "listings": len(self.ids),
+            "categoryCounts": category_counts,
+            "priceStats": price_stats,
+            "popularLocations": [
+                {"_id": location, "count": count}
+                for location, count in locations.most_common(10)
+            ],
+        }
+
+    def _range(self, order, column, valid, low=None, high=None):
+        import numpy as np
+
+        column = column[:valid]
+        start = 0 if low is None else int(np.searchsorted(column, low, "left"))
+        end = valid if high is None else int(np.searchsorted(column, high, "right"))
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[order[start:end]] = True
+        return mask
+
+    def _text_matches(self, search, allowed):
+        """Narrow the allowed mask to listings whose text matches search
+
+        Matching ignores case, like $regex with the "i" option, and only the
+        listings the other filters left are ever checked.
+        """
+
+        import numpy as np
+
+        candidates = np.flatnonzero(allowed)
+        needle = search.lower()
+        if _REGEX_CHARS.search(search):
+            pattern = re.compile(search, re.IGNORECASE)
+            texts = self.texts
+            found = np.fromiter(
+                (_fields_match(pattern, texts[doc]) for doc in candidates.tolist()),
+                dtype=bool,
+                count=len(candidates),
+            )
+            return self._mask(candidates[found])
+
+        if len(needle) >= 3:
+            lists = []
+            for gram in _trigrams(needle):
+                docs = self.postings.get(gram)
+                if docs is None:
+                    return np.zeros(len(self.ids), dtype=bool)
+                lists.append(docs)
+            # Rarest trigram first; the rest only ever shrink the candidates
+            lists.sort(key=len)
+            candidates = lists[0][allowed[lists[0]]]
+            present = np.zeros(len(self.ids), dtype=bool)
+            for docs in lists[1:]:
+                if not len(candidates):
+                    break
+                present[:] = False
+                present[docs] = True
+                candidates = candidates[present[candidates]]
+            if len(needle) == 3:
+                return self._mask(candidates)
+
+        # Having every trigram doesn't mean having them in a row
+        texts = self.texts
+        found = np.fromiter(
+            (needle in texts[doc] for doc in candidates.tolist()),
+            dtype=bool,
+            count=len(candidates),
+        )
+        return self._mask(candidates[found])
+
+    def _mask(self, docs):
+        import numpy as np
+
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[docs] = True
+        return mask
+
+    def query(self, params):
+        """Run listings.index's query parameters; returns a result dict
+
+        re.error propagates for a search that isn't a valid regex, as it would
+        from MongoDB.
+        """
+
+        import numpy as np
+
+        started = time.perf_counter()
+        search = params.get("search") or ""
+        category = params.get("category")
+        if category not in CATEGORIES:
+            category = None
+        min_price = js_int(params.get("minPrice"))
+        max_price = js_int(params.get("maxPrice"))
+        guests = js_int(params.get("guests"))
+        sort = params.get("sortBy")
+        if sort not in SORTS:
+            sort = DEFAULT_SORT
+
+        mask = self.visible.copy()
+        if min_price is not None or max_price is not None:
+            mask &= self._range(
+                self.price_order,
+                self.price_sorted,
+                self.price_valid,
+                min_price,
+                max_price,
+            )
+        if guests is not None:
+            mask &= self._range(
+                self.guest_order, self.guests_sorted, self.guests_valid, guests
+            )
+        if search:
+            mask = self._text_matches(search, mask)
+
+        # Facets count every filter except the category itself
+        counts = np.bincount(self.category[mask] + 1, minlength=len(CATEGORIES) + 1)
+        facets = {
+            name: int(counts[code + 1])
+            for code, name in enumerate(CATEGORIES)
+            if counts[code + 1]
+        }
+        if category is not None:
+            mask &= self.category_bitmaps[CATEGORIES.index(category)]
+
+        order = self.orders[sort]
+        hits = order[mask[order]]
+        return {
+            "ids": self.id_array[hits].tolist(),
+            "total": int(len(hits)),
+            "facets": facets,
+            "filters": {
+                "search": search,
+                "category": category,
+                "minPrice": min_price,
+                "maxPrice": max_price,
+                "guests": guests,
+                "sortBy": sort,
+            },
+            **self.summary,
+            "elapsed_ms": (time.perf_counter() - started) * 1000,
+        }
+
+
+class SearchService:
+    """ListingIndex of an export directory, rebuilt when the exports change"""
+
+    def __init__(self, export_dir):
+        self.export_dir = export_dir
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._stamp = self._files_stamp()
+        self.index = ListingIndex.from_exports(export_dir)
+
+    def _files_stamp(self):
+        stamp = []
+        for name in ("listings.jsonl", "hosts.jsonl"):
+            try:
+                stat = os.stat(os.path.join(self.export_dir, name))
+                stamp.append((name, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append((name, None, None))
+        return stamp
+
+    def current(self):
+        """The latest index; changed exports are re-indexed in the background"""
+
+        stamp = self._files_stamp()
+        if stamp != self._stamp:
+            with self._lock:
+                if stamp != self._stamp and not self._rebuilding:
+                    self._rebuilding = True
+                    threading.Thread(
+                        target=self._rebuild, args=(stamp,), daemon=True
+                    ).start()
+        return self.index
+
+    def _rebuild(self, stamp):
+        try:
+            # Requests keep using the old index until the new one is ready
+            self.index = ListingIndex.from_exports(self.export_dir)
+            self._stamp = stamp
+        except (OSError, ValueError) as err:
+            # Most likely an export still being written; retried next request
+            print(f"⚠️  Listing search reload failed: {err}")
+        finally:
+            self._rebuilding = False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/search":
+            return self._reply(404, {"success": False, "message": "Not found"})
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            result = self.service.current().query(params)
+        except re.error as err:
+            return self._reply(400, {"success": False, "message": str(err)})
+        self._reply(200, {"success": True, **result})
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(service, host="127.0.0.1", port=8766):
+    handler = type("Handler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(
+        f"🔎 Listing search on http://{host}:{port}/search"
+        f" ({len(service.index)} listings)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,389 @@
+"""
+Similar listings
+Precomputes every listing's nearest neighbours from a listings export, so the
+show page can recommend similar stays without scoring anything per request:
+
+    python -m homyhive similar exports/             # changed listings only
+    python -m homyhive similar exports/ --full
+    python -m homyhive similar exports/ --show 64f1c2...
+
+A listing is a vector of four blocks, each normalized and weighted by WEIGHTS:
+its category, its price band (on a log scale, with the neighbouring bands
+switched on at half strength), hashed location tokens (address, country and a
+coarse grid cell from the geocoded point) and hashed title and description
+words. Neighbours are the top-k by cosine similarity, found with blocked
+matrix products so memory stays bounded however many listings there are.
+Listings of hosts that aren't approved are left out, as on the index page.
+
+The table goes to build/similar/neighbours.bin: a header, the listing ids as
+fixed 24-byte records, a digest of each listing's features, then k neighbour
+rows and k scores per listing. utils/similarListings.js reads it directly.
+A rerun compares digests and recomputes only listings that changed, plus the
+unchanged ones that had a changed or deleted listing among their neighbours;
+every other list is just merged with the scores against the changed listings.
+Needs numpy.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import struct
+import time
+import zlib
+
+from homyhive import ROOT, mongoexport, search
+
+OUTPUT_PATH = os.path.join("build", "similar", "neighbours.bin")
+DEFAULT_K = 12
+
+MAGIC = b"HHNEIGHB"
+# Bump when the features change so the next run recomputes everything
+FEATURE_VERSION = 1
+# magic, feature version, listing count, k
+_HEADER = struct.Struct("<8sIII")
+_HEADER_SIZE = 24
+ID_WIDTH = 24
+
+PRICE_BANDS = 40
+LOCATION_DIMS = 64
+TEXT_DIMS = 256
+# Share of the cosine each block contributes when both listings have it
+WEIGHTS = {"category": 0.3, "price": 0.2, "location": 0.3, "text": 0.2}
+# Size of the similarity block held in memory at once
+BLOCK_BYTES = 128 * 2**20
+
+_WORD = re.compile(r"[^\W\d_]{3,}")
+STOPWORDS = frozenset(
+    "the and for with from this that you your our are has have its into near"
+    " stay room home house place".split()
+)
+
+_CATEGORY = 0
+_PRICE = _CATEGORY + len(search.CATEGORIES)
+_LOCATION = _PRICE + PRICE_BANDS
+_TEXT = _LOCATION + LOCATION_DIMS
+DIMS = _TEXT + TEXT_DIMS
+
+
+def _hashed(tokens, offset, dims):
+    # crc32 rather than hash(), which is salted per process; a second bit of
+    # the hash signs the value so collisions cancel out instead of adding up
+    counts = {}
+    for token in tokens:
+        code = zlib.crc32(token.encode())
+        column = offset + code % dims
+        sign = 1.0 if code >> 31 else -1.0
+        counts[column] = counts.get(column, 0.0) + sign
+    # Sublinear term frequency, so a repeated word doesn't dominate
+    return [
+        (column, math.copysign(1 + math.log(abs(count)), count))
+        for column, count in counts.items()
+        if count
+    ]
+
+
+def features(listing):
+    """The inputs a listing's vector is built from"""
+
+    coordinates = (listing.get("geometry") or {}).get("coordinates") or []
+    return {
+        "category": listing.get("category"),
+        "price": mongoexport.value(listing.get("price") or 0),
+        "location": search.text_field(listing.get("location")),
+        "country": search.text_field(listing.get("country")),
+        "point": [mongoexport.value(c) for c in coordinates[:2]],
+        "title": search.text_field(listing.get("title")),
+        "description": search.text_field(listing.get("description")),
+    }
+
+
+def digest(feature):
+    source = json.dumps([FEATURE_VERSION, feature], sort_keys=True, default=str)
+    value = hashlib.blake2b(source.encode(), digest_size=8).digest()
+    return int.from_bytes(value, "little")
+
+
+def _entries(feature):
+    """{block: [(column, value)]} of one listing, before normalization"""
+
+    entries = {block: [] for block in WEIGHTS}
+    if feature["category"] in search.CATEGORIES:
+        entries["category"].append(
+            (_CATEGORY + search.CATEGORIES.index(feature["category"]), 1.0)
+        )
+
+    try:
+        price = float(feature["price"])
+    except (TypeError, ValueError):
+        price = 0.0
+    if price > 0:
+        # Half-octave bands: 1,000 and 1,400 share a band, 1,000 and 2,000 are
+        # two apart
+        band = min(max(int(2 * math.log2(price)), 0), PRICE_BANDS - 1)
+        entries["price"].append((_PRICE + band, 1.0))
+        for near in (band - 1, band + 1):
+            if 0 <= near < PRICE_BANDS:
+                entries["price"].append((_PRICE + near, 0.5))
+
+    tokens = [
+        f"loc:{word}" for word in _WORD.findall(feature["location"].lower())
+    ]
+    if feature["country"]:
+        tokens.append(f"country:{feature['country'].strip().lower()}")
+    if len(feature["point"]) == 2:
+        try:
+            longitude, latitude = (float(c) for c in feature["point"])
+            # Roughly 50 km cells
+            tokens.append(f"cell:{latitude // 0.5:g}:{longitude // 0.5:g}")
+        except (TypeError, ValueError):
+            pass
+    entries["location"] = _hashed(tokens, _LOCATION, LOCATION_DIMS)
+
+    words = _WORD.findall(f"{feature['title']} {feature['description']}".lower())
+    entries["text"] = _hashed(
+        (word for word in words if word not in STOPWORDS), _TEXT, TEXT_DIMS
+    )
+    return entries
+
+
+def vectorize(feature_list):
+    """Unit feature vectors (float32, one row per listing)"""
+
+    import numpy as np
+
+    matrix = np.zeros((len(feature_list), DIMS), dtype=np.float32)
+    for row, feature in enumerate(feature_list):
+        for block, entries in _entries(feature).items():
+            if not entries:
+                continue
+            columns, values = zip(*entries)
+            values = np.array(values, dtype=np.float32)
+            values *= math.sqrt(WEIGHTS[block]) / np.linalg.norm(values)
+            matrix[row, list(columns)] = values
+    # Listings missing a block are compared on the blocks they have
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _top_k(scores, k, columns=None):
+    """Best k (columns, scores) per row, descending, padded with -1"""
+
+    import numpy as np
+
+    rows, count = scores.shape
+    if columns is None:
+        columns = np.broadcast_to(np.arange(count, dtype=np.int32), scores.shape)
+    if count > k:
+        best = np.argpartition(scores, count - k, axis=1)[:, count - k :]
+        scores = np.take_along_axis(scores, best, axis=1)
+        columns = np.take_along_axis(columns, best, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    scores = np.take_along_axis(scores, order, axis=1)
+    columns = np.take_along_axis(columns, order, axis=1)
+    if count < k:
+        pad = ((0, 0), (0, k - count))
+        scores = np.pad(scores, pad, constant_values=-np.inf)
+        columns = np.pad(columns, pad, constant_values=-1)
+    columns = np.where(np.isfinite(scores), columns, -1).astype(np.int32)
+    return columns, scores.astype(np.float32)
+
+
+def _block_rows(count):
+    return max(1, min(4096, BLOCK_BYTES // (4 * max(count, 1))))
+
+
+def neighbours(vectors, rows, k):
+    """Top-k neighbours of the given rows among all of vectors"""
+
+    import numpy as np
+
+    columns = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+    step = _block_rows(len(vectors))
+    for start in range(0, len(rows), step):
+        block = rows[start : start + step]
+        similarity = vectors[block] @ vectors.T
+        # A listing isn't its own neighbour
+        similarity[np.arange(len(block)), block] = -np.inf
+        columns[start : start + step], scores[start : start + step] = _top_k(
+            similarity, k
+        )
+    return columns, scores
+
+
+def merge(columns, scores, vectors, rows, candidates, k):
+    """Merge existing lists of rows with their scores against candidates"""
+
+    import numpy as np
+
+    step = _block_rows(len(candidates))
+    for start in range(0, len(rows), step):
+        block = rows[start : start + step]
+        similarity = vectors[block] @ vectors[candidates].T
+        similarity[block[:, None] == candidates[None, :]] = -np.inf
+        joined_scores = np.concatenate([scores[block], similarity], axis=1)
+        joined_columns = np.concatenate(
+            [columns[block], np.broadcast_to(candidates, similarity.shape)], axis=1
+        )
+        columns[block], scores[block] = _top_k(joined_scores, k, joined_columns)
+
+
+def read_table(path):
+    """{ids, digests, columns, scores, k} of a neighbour file, or None"""
+
+    import numpy as np
+
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except OSError:
+        return None
+    if len(data) < _HEADER_SIZE:
+        return None
+    magic, version, count, k = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != FEATURE_VERSION:
+        return None
+    offset = _HEADER_SIZE
+    ids = np.frombuffer(data, f"S{ID_WIDTH}", count, offset)
+    offset += count * ID_WIDTH
+    digests = np.frombuffer(data, "<u8", count, offset)
+    offset += count * 8
+    columns = np.frombuffer(data, "<i4", count * k, offset).reshape(count, k)
+    offset += count * k * 4
+    scores = np.frombuffer(data, "<f4", count * k, offset).reshape(count, k)
+    return {
+        "ids": [value.decode() for value in ids],
+        "digests": digests.tolist(),
+        "columns": columns,
+        "scores": scores,
+        "k": k,
+    }
+
+
+def write_table(path, ids, digests, columns, scores):
+    import numpy as np
+
+    count, k = columns.shape
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        header = _HEADER.pack(MAGIC, FEATURE_VERSION, count, k)
+        handle.write(header.ljust(_HEADER_SIZE, b"\0"))
+        handle.write(np.array(ids, dtype=f"S{ID_WIDTH}").tobytes())
+        handle.write(np.array(digests, dtype="<u8").tobytes())
+        handle.write(columns.astype("<i4").tobytes())
+        # Padding slots are stored as score 0 with neighbour -1
+        handle.write(np.where(columns >= 0, scores, 0).astype("<f4").tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_listings(export_dir):
+    """(ids, features) of the listings the index page shows"""
+
+    hosts = search.host_statuses(os.path.join(export_dir, "hosts.jsonl")) or {}
+    ids, feature_list = [], []
+    path = os.path.join(export_dir, "listings.jsonl")
+    for listing in mongoexport.read_records(path):
+        host = str(mongoexport.value(listing.get("host")) or "")
+        if hosts.get(host, "approved") != "approved":
+            continue
+        ids.append(str(mongoexport.value(listing.get("_id"))))
+        feature_list.append(features(listing))
+    return ids, feature_list
+
+
+def build(export_dir, output_path=None, k=DEFAULT_K, full=False, root=ROOT):
+    """Write the neighbour table for an export; returns stats"""
+
+    import numpy as np
+
+    started = time.perf_counter()
+    output_path = output_path or os.path.join(root, OUTPUT_PATH)
+    ids, feature_list = load_listings(export_dir)
+    digests = [digest(feature) for feature in feature_list]
+    vectors = vectorize(feature_list)
+    vectorized = time.perf_counter()
+
+    count = len(ids)
+    columns = np.full((count, k), -1, dtype=np.int32)
+    scores = np.full((count, k), -np.inf, dtype=np.float32)
+    previous = None if full else read_table(output_path)
+    if previous is not None and previous["k"] != k:
+        previous = None
+
+    # Listings that are new or whose features changed
+    modified = np.ones(count, dtype=bool)
+    recompute = modified.copy()
+    if previous is not None:
+        old_rows = {listing_id: row for row, listing_id in enumerate(previous["ids"])}
+        # Old row -> new row of listings still there unchanged; the extra -1
+        # at the end keeps padding slots (-1) pointing at nothing
+        moved = np.full(len(previous["ids"]) + 1, -1, dtype=np.int32)
+        old_kept = []
+        for row, (listing_id, value) in enumerate(zip(ids, digests)):
+            old = old_rows.get(listing_id)
+            if old is not None and previous["digests"][old] == value:
+                moved[old] = row
+                modified[row] = False
+                old_kept.append(old)
+        kept = np.flatnonzero(~modified)
+        if len(kept):
+            old_columns = previous["columns"][old_kept]
+            kept_columns = moved[old_columns]
+            columns[kept] = kept_columns
+            scores[kept] = np.where(
+                kept_columns >= 0, previous["scores"][old_kept], -np.inf
+            )
+            # A list that lost a neighbour may now have a better one anywhere,
+            # so it is recomputed; the others can only gain from modified rows
+            lost = ((old_columns >= 0) & (kept_columns < 0)).any(axis=1)
+            recompute[kept] = lost
+
+    rows = np.flatnonzero(recompute)
+    if len(rows):
+        columns[rows], scores[rows] = neighbours(vectors, rows, k)
+    merged = np.flatnonzero(~recompute)
+    candidates = np.flatnonzero(modified)
+    if len(merged) and len(candidates):
+        merge(columns, scores, vectors, merged, candidates, k)
+    write_table(output_path, ids, digests, columns, scores)
+    return {
+        "listings": count,
+        "modified": len(candidates),
+        "recomputed": len(rows),
+        "merged": len(merged) if len(candidates) else 0,
+        "vectorize_seconds": vectorized - started,
+        "seconds": time.perf_counter() - started,
+        "output_path": output_path,
+    }
+
+
+class NeighbourTable:
+    """A neighbour file, with O(1) lookups by listing id"""
+
+    def __init__(self, path=None, root=ROOT):
+        table = read_table(path or os.path.join(root, OUTPUT_PATH))
+        if table is None:
+            raise FileNotFoundError(path or OUTPUT_PATH)
+        self.ids = table["ids"]
+        self.columns = table["columns"]
+        self.scores = table["scores"]
+        self.rows = {listing_id: row for row, listing_id in enumerate(self.ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def similar(self, listing_id, limit=None):
+        """[(listing id, score)] most similar first"""
+
+        row = self.rows.get(listing_id)
+        if row is None:
+            return []
+        return [
+            (self.ids[column], float(score))
+            for column, score in zip(self.columns[row], self.scores[row])
+            if column >= 0
+        ][:limit]
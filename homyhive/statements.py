@@ -0,0 +1,456 @@
+"""
+Monthly host statements
+Groups an export of the listings, bookings, reviews and (optionally) users
+and promotions collections per host with vectorized numpy aggregation, then
+renders one PDF statement per host across a process pool.
+
+    python -m homyhive statements exports/ --month 2025-03
+
+exports/ holds mongoexport JSON lines named after the collections
+(listings.jsonl, bookings.jsonl, reviews.jsonl, users.jsonl, promotions.jsonl).
+Promotion spend comes from the promotions collection, where
+verifyPromotionPayment records every paid listing promotion. Statements land
+in build/statements/<month>/<host id>.pdf. Every finished statement is
+appended to a progress journal with a hash of its figures, so an interrupted
+run resumes where it stopped and unchanged hosts are skipped on the next
+night's run. Needs numpy and reportlab.
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape
+
+from homyhive import ROOT, mongoexport
+
+OUTPUT_DIR = os.path.join("build", "statements")
+JOURNAL_NAME = "progress.jsonl"
+
+# Statements handed to a worker at a time
+CHUNK_SIZE = 16
+
+DAY_SECONDS = 86400
+
+
+def _timestamp(field):
+    """Epoch seconds of an exported date (0 when missing)"""
+
+    when = mongoexport.value(field)
+    return int(when.timestamp()) if isinstance(when, datetime) else 0
+
+
+def _path(export_dir, collection):
+    return os.path.join(export_dir, f"{collection}.jsonl")
+
+
+def _records(export_dir, collection):
+    path = _path(export_dir, collection)
+    return mongoexport.read_records(path) if os.path.exists(path) else ()
+
+
+def month_bounds(month):
+    """(start, end) epoch seconds of a "YYYY-MM" month"""
+
+    start = datetime.strptime(month, "%Y-%m").replace(tzinfo=timezone.utc)
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def previous_month(now=None):
+    now = now or datetime.now(timezone.utc)
+    year, month = (now.year, now.month - 1) if now.month > 1 else (now.year - 1, 12)
+    return f"{year:04d}-{month:02d}"
+
+
+class Exports:
+    """Collections encoded as integer-indexed numpy columns
+
+    Listings and hosts get dense indices; bookings, reviews and promotions are
+    stored as parallel arrays pointing at listing indices, which is what lets
+    the per-host grouping be a handful of bincounts.
+    """
+
+    def __init__(self, export_dir):
+        import numpy as np
+
+        self.hosts = []  # index -> host (owner user) id
+        self.host_names = {}
+        self.listings = []  # index -> (id, title)
+        host_index = {}
+        listing_index = {}
+        listing_host = []
+        review_listing = {}
+
+        for user in _records(export_dir, "users"):
+            name = user.get("username") or user.get("email")
+            if name:
+                self.host_names[str(mongoexport.value(user.get("_id")))] = name
+
+        for listing in _records(export_dir, "listings"):
+            owner = str(mongoexport.value(listing.get("owner")) or "")
+            if not owner:
+                continue
+            if owner not in host_index:
+                host_index[owner] = len(self.hosts)
+                self.hosts.append(owner)
+            listing_id = str(mongoexport.value(listing.get("_id")))
+            listing_index[listing_id] = len(self.listings)
+            self.listings.append((listing_id, listing.get("title") or listing_id))
+            listing_host.append(host_index[owner])
+            for review in listing.get("reviews") or ():
+                review_listing[str(mongoexport.value(review))] = listing_index[
+                    listing_id
+                ]
+        self.listing_host = np.array(listing_host, dtype=np.int32)
+
+        columns = {
+            "listing": [],
+            "created": [],
+            "nights": [],
+            "total": [],
+            "fee": [],
+            "payout": [],
+            "confirmed": [],
+        }
+        promotions = {"listing": [], "created": [], "amount": []}
+        for booking in _records(export_dir, "bookings"):
+            listing = listing_index.get(
+                str(mongoexport.value(booking.get("listing")))
+            )
+            if listing is None:
+                continue
+            stay = _timestamp(booking.get("checkOut")) - _timestamp(
+                booking.get("checkIn")
+            )
+            columns["listing"].append(listing)
+            columns["created"].append(_timestamp(booking.get("createdAt")))
+            columns["nights"].append(round(abs(stay) / DAY_SECONDS))
+            columns["total"].append(
+                float(mongoexport.value(booking.get("totalAmount")) or 0)
+            )
+            columns["fee"].append(
+                float(mongoexport.value(booking.get("platformFee")) or 0)
+            )
+            columns["payout"].append(
+                float(mongoexport.value(booking.get("hostAmount")) or 0)
+            )
+            columns["confirmed"].append(booking.get("bookingStatus") != "cancelled")
+        self.bookings = {
+            name: np.array(values, dtype=np.bool_ if name == "confirmed" else None)
+            for name, values in columns.items()
+        }
+        self.bookings["listing"] = self.bookings["listing"].astype(np.int32)
+
+        # Written by verifyPromotionPayment (models/promotion.js)
+        for promotion in _records(export_dir, "promotions"):
+            listing = listing_index.get(
+                str(mongoexport.value(promotion.get("listing")))
+            )
+            if listing is None or promotion.get("paymentStatus") != "completed":
+                continue
+            promotions["listing"].append(listing)
+            promotions["created"].append(_timestamp(promotion.get("createdAt")))
+            promotions["amount"].append(
+                float(mongoexport.value(promotion.get("amount")) or 0)
+            )
+        self.promotions = {
+            name: np.array(values) for name, values in promotions.items()
+        }
+        self.promotions["listing"] = self.promotions["listing"].astype(np.int32)
+
+        reviews = {"listing": [], "created": [], "rating": []}
+        for review in _records(export_dir, "reviews"):
+            listing = review_listing.get(str(mongoexport.value(review.get("_id"))))
+            if listing is None:
+                continue
+            reviews["listing"].append(listing)
+            reviews["created"].append(_timestamp(review.get("createdAt")))
+            reviews["rating"].append(
+                float(mongoexport.value(review.get("rating")) or 0)
+            )
+        self.reviews = {name: np.array(values) for name, values in reviews.items()}
+        self.reviews["listing"] = self.reviews["listing"].astype(np.int32)
+
+
+def _per_listing(columns, start, end, weights, count):
+    """Sum each weight column per listing over rows created in [start, end)"""
+
+    import numpy as np
+
+    created = columns["created"]
+    mask = (created >= start) & (created < end)
+    if "confirmed" in columns:
+        mask &= columns["confirmed"]
+    listing = columns["listing"][mask]
+    sums = {
+        name: np.bincount(listing, weights=columns[name][mask], minlength=count)
+        for name in weights
+    }
+    sums["count"] = np.bincount(listing, minlength=count)
+    return sums
+
+
+def aggregate(exports, month):
+    """Per-host statement dicts for month, built with vectorized grouping"""
+
+    import numpy as np
+
+    start, end = month_bounds(month)
+    count = len(exports.listings)
+    bookings = _per_listing(
+        exports.bookings, start, end, ("nights", "total", "fee", "payout"), count
+    )
+    promotions = _per_listing(exports.promotions, start, end, ("amount",), count)
+    reviews = _per_listing(exports.reviews, start, end, ("rating",), count)
+
+    # Listings ordered by host, so each host's rows are one contiguous slice
+    order = np.argsort(exports.listing_host, kind="stable")
+    bounds = np.searchsorted(
+        exports.listing_host[order], np.arange(len(exports.hosts) + 1)
+    )
+
+    def host_totals(column):
+        return np.bincount(
+            exports.listing_host, weights=column, minlength=len(exports.hosts)
+        )
+
+    totals = {
+        "bookings": host_totals(bookings["count"]),
+        "nights": host_totals(bookings["nights"]),
+        "gross": host_totals(bookings["total"]),
+        "fees": host_totals(bookings["fee"]),
+        "payout": host_totals(bookings["payout"]),
+        "promotions": host_totals(promotions["amount"]),
+        "reviews": host_totals(reviews["count"]),
+        "rating_sum": host_totals(reviews["rating"]),
+    }
+
+    statements = []
+    for host, host_id in enumerate(exports.hosts):
+        rows = []
+        for listing in order[bounds[host] : bounds[host + 1]]:
+            review_count = int(reviews["count"][listing])
+            rows.append(
+                {
+                    "title": exports.listings[listing][1],
+                    "bookings": int(bookings["count"][listing]),
+                    "nights": int(bookings["nights"][listing]),
+                    "payout": round(float(bookings["payout"][listing]), 2),
+                    "reviews": review_count,
+                    "rating": round(
+                        float(reviews["rating"][listing]) / review_count, 2
+                    )
+                    if review_count
+                    else None,
+                }
+            )
+        review_count = int(totals["reviews"][host])
+        statements.append(
+            {
+                "host": host_id,
+                "name": exports.host_names.get(host_id, host_id),
+                "month": month,
+                "bookings": int(totals["bookings"][host]),
+                "nights": int(totals["nights"][host]),
+                "gross": round(float(totals["gross"][host]), 2),
+                "fees": round(float(totals["fees"][host]), 2),
+                "payout": round(float(totals["payout"][host]), 2),
+                "promotions": round(float(totals["promotions"][host]), 2),
+                "reviews": review_count,
+                "rating": round(float(totals["rating_sum"][host]) / review_count, 2)
+                if review_count
+                else None,
+                "listings": rows,
+            }
+        )
+    return statements
+
+
+def statement_hash(statement):
+    encoded = json.dumps(statement, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _money(amount):
+    return f"INR {amount:,.2f}"
+
+
+_STYLES = None
+
+
+def _styles():
+    # Built once per worker process and reused for every statement it renders
+    global _STYLES
+    if _STYLES is None:
+        from HomyHive_Project_Documentation import build_styles
+
+        _STYLES = build_styles()
+    return _STYLES
+
+
+def _table(data, widths):
+    from HomyHive_Project_Documentation import BRAND_RED, BRAND_SHADE
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table(data, colWidths=widths, repeatRows=1)
+    table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), BRAND_RED),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, -1), 9),
+                ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+                ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, BRAND_SHADE]),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+            ]
+        )
+    )
+    return table
+
+
+def render_statement(statement, path):
+    """Write one host's statement PDF (atomically)"""
+
+    from HomyHive_Project_Documentation import with_font_fallback
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Spacer
+
+    from homyhive.layout import CachedParagraph as Paragraph
+
+    styles = _styles()
+    month = datetime.strptime(statement["month"], "%Y-%m").strftime("%B %Y")
+    rating = statement["rating"]
+    summary = [
+        ["Summary", month],
+        ["Bookings", str(statement["bookings"])],
+        ["Nights booked", str(statement["nights"])],
+        ["Gross bookings", _money(statement["gross"])],
+        ["Platform fee", _money(statement["fees"])],
+        ["Your payout", _money(statement["payout"])],
+        ["Promotion spend", _money(statement["promotions"])],
+        ["New reviews", str(statement["reviews"])],
+        ["Average rating", f"{rating:.2f}" if rating is not None else "-"],
+    ]
+    listings = [["Listing", "Bookings", "Nights", "Payout", "Reviews", "Rating"]]
+    for row in statement["listings"]:
+        listings.append(
+            [
+                Paragraph(escape(row["title"]), styles["Normal"]),
+                str(row["bookings"]),
+                str(row["nights"]),
+                _money(row["payout"]),
+                str(row["reviews"]),
+                f"{row['rating']:.2f}" if row["rating"] is not None else "-",
+            ]
+        )
+
+    story = [
+        Paragraph("HomyHive monthly statement", styles["CustomTitle"]),
+        Paragraph(
+            f"{escape(statement['name'])} - {month}", styles["CustomSubHeading"]
+        ),
+        Spacer(1, 12),
+        _table(summary, [2.5 * inch, 2.5 * inch]),
+        Paragraph("Listings", styles["CustomHeading"]),
+        _table(
+            listings,
+            [2.4 * inch, 0.8 * inch, 0.7 * inch, 1.2 * inch, 0.7 * inch, 0.7 * inch],
+        ),
+    ]
+    doc = SimpleDocTemplate(
+        path + ".tmp",
+        pagesize=A4,
+        title=f"HomyHive statement {statement['month']}",
+        author="HomyHive",
+        invariant=1,
+    )
+    # Host names and listing titles may be in Hindi or Kannada
+    doc.build(list(with_font_fallback(story)))
+    os.replace(path + ".tmp", path)
+
+
+def render_chunk(statements, output_dir):
+    """Render a batch of statements in a worker; returns [(host, hash)]"""
+
+    from homyhive.layout import default_cache
+
+    done = []
+    for statement in statements:
+        path = os.path.join(output_dir, f"{statement['host']}.pdf")
+        render_statement(statement, path)
+        done.append((statement["host"], statement_hash(statement)))
+    default_cache().save()
+    return done
+
+
+def read_journal(path):
+    done = {}
+    try:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from an interrupted run
+                done[entry["host"]] = entry["hash"]
+    except OSError:
+        pass
+    return done
+
+
+def generate(export_dir, month=None, output_dir=None, jobs=None, force=False):
+    """Aggregate and render every host's statement; returns a stats dict"""
+
+    month = month or previous_month()
+    output_dir = output_dir or os.path.join(ROOT, OUTPUT_DIR, month)
+    os.makedirs(output_dir, exist_ok=True)
+    journal_path = os.path.join(output_dir, JOURNAL_NAME)
+
+    started = time.perf_counter()
+    statements = aggregate(Exports(export_dir), month)
+    aggregated = time.perf_counter()
+
+    done = {} if force else read_journal(journal_path)
+    todo = [
+        statement
+        for statement in statements
+        if done.get(statement["host"]) != statement_hash(statement)
+        or not os.path.exists(os.path.join(output_dir, f"{statement['host']}.pdf"))
+    ]
+
+    rendered = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool, open(
+            journal_path, "a", encoding="utf-8"
+        ) as journal:
+            pending = {
+                pool.submit(render_chunk, todo[i : i + CHUNK_SIZE], output_dir)
+                for i in range(0, len(todo), CHUNK_SIZE)
+            }
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for host, digest in future.result():
+                        entry = {"host": host, "hash": digest}
+                        journal.write(json.dumps(entry) + "\n")
+                        rendered += 1
+                journal.flush()
+
+    finished = time.perf_counter()
+    return {
+        "hosts": len(statements),
+        "rendered": rendered,
+        "skipped": len(statements) - len(todo),
+        "aggregate_seconds": aggregated - started,
+        "render_seconds": finished - aggregated,
+        "output_dir": output_dir,
+    }
@@ -0,0 +1,108 @@
+"""
+Web delivery for generated files
+Linearizes PDFs ("fast web view", so the first page renders before the
+download finishes) and writes gzip/brotli variants next to any file for the
+app's precompressed static middleware.
+
+Linearization needs pikepdf and brotli variants need the brotli package; both
+are optional and skipped with a warning when missing.
+"""
+
+import gzip
+import os
+import shutil
+import warnings
+
+# (suffix, encoder name) in the order the app prefers them
+VARIANTS = ((".br", "brotli"), (".gz", "gzip"))
+
+# Variants that don't save at least this fraction of the original are dropped
+MIN_SAVING = 0.05
+
+
+def linearize(path, output_path=None):
+    """Rewrite a PDF linearized, with object streams; returns False if skipped
+
+    pikepdf's deterministic_id keeps reproducible inputs reproducible.
+    """
+
+    try:
+        import pikepdf
+    except ImportError:
+        warnings.warn("pikepdf is not installed; leaving PDF unlinearized")
+        return False
+
+    output_path = output_path or path
+    with pikepdf.open(path) as pdf:
+        pdf.save(
+            output_path + ".tmp",
+            linearize=True,
+            object_stream_mode=pikepdf.ObjectStreamMode.generate,
+            compress_streams=True,
+            deterministic_id=True,
+        )
+    os.replace(output_path + ".tmp", output_path)
+    return True
+
+
+def _encode(data, encoder):
+    if encoder == "gzip":
+        # mtime=0 so identical input gives identical .gz bytes
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    import brotli
+
+    return brotli.compress(data, quality=11)
+
+
+def precompress(path, encoders=None):
+    """Write path.br / path.gz beside path; returns the variant paths written
+
+    Stale variants are removed when an encoding stops paying off or its
+    encoder is unavailable, so the app never serves outdated bytes.
+    """
+
+    with open(path, "rb") as handle:
+        data = handle.read()
+
+    written = []
+    for suffix, encoder in VARIANTS:
+        variant = path + suffix
+        if encoders is not None and encoder not in encoders:
+            continue
+        try:
+            encoded = _encode(data, encoder)
+        except ImportError:
+            warnings.warn(f"{encoder} is not installed; skipping {suffix} variant")
+            encoded = None
+        if encoded is None or len(encoded) > len(data) * (1 - MIN_SAVING):
+            if os.path.exists(variant):
+                os.unlink(variant)
+            continue
+        with open(variant + ".tmp", "wb") as handle:
+            handle.write(encoded)
+        os.replace(variant + ".tmp", variant)
+        written.append(variant)
+    return written
+
+
+def variants(path):
+    """Existing precompressed variants of path"""
+
+    return [path + suffix for suffix, _ in VARIANTS if os.path.exists(path + suffix)]
+
+
+def prepare(path, linearized=True):
+    """Linearize (when asked and possible) and precompress a served PDF"""
+
+    if linearized:
+        linearize(path)
+    return precompress(path)
+
+
+def copy_with_variants(path, target):
+    """Copy path and its precompressed variants to target"""
+
+    for source in [path] + variants(path):
+        destination = target + source[len(path):]
+        shutil.copyfile(source, destination + ".tmp")
+        os.replace(destination + ".tmp", destination)
@@ -1,6 +1,8 @@
 // middleware.js
 // ✅ Supabase-only authentication - NO MongoDB User dependencies
 
+const fs = require("fs");
+const path = require("path");
 const url = require("url");
 const Listing = require("./models/listing");
 const Review = require("./models/review");
@@ -222,12 +224,79 @@ const isAdmin = (req, res, next) => {
   return res.redirect("/login");
 };
 
+// ==========================================
+// PRECOMPRESSED STATIC FILES
+// Serves file.br / file.gz written by homyhive/webpdf.py
+// ==========================================
+
+const PRECOMPRESSED = [
+  ["br", ".br"],
+  ["gzip", ".gz"],
+];
+
+// Accept-Encoding as a map of lowercased coding to q-value ("br;q=0" => 0)
+function encodingWeights(header) {
+  const weights = new Map();
+  for (const part of header.split(",")) {
+    const [name, ...params] = part.trim().toLowerCase().split(";");
+    if (!name) continue;
+    let q = 1;
+    for (const param of params) {
+      const [key, value] = param.trim().split("=");
+      if (key === "q") q = Number(value);
+    }
+    weights.set(name.trim(), Number.isFinite(q) ? q : 0);
+  }
+  return weights;
+}
+
+function servePrecompressed(root, options = {}) {
+  const extensions = options.extensions || [".pdf"];
+  const sendOptions = options.sendOptions || {};
+  const base = path.resolve(root);
+
+  return (req, res, next) => {
+    if (req.method !== "GET" && req.method !== "HEAD") return next();
+    // Range requests (fast web view) must see the identity-encoded bytes
+    if (req.headers.range) return next();
+
+    let pathname;
+    try {
+      pathname = decodeURIComponent(normalizePath(req.path));
+    } catch {
+      return next();
+    }
+    if (!extensions.includes(path.extname(pathname))) return next();
+
+    const file = path.join(base, pathname);
+    if (!file.startsWith(base + path.sep)) return next();
+
+    res.vary("Accept-Encoding");
+    const weights = encodingWeights(req.headers["accept-encoding"] || "");
+    const weight = (name) => weights.get(name) ?? weights.get("*") ?? 0;
+    // Only an identity the client ranks above every variant wins over them
+    const identity = weights.get("identity") ?? weights.get("*") ?? 0;
+    let best = null;
+    for (const [encoding, suffix] of PRECOMPRESSED) {
+      const q = weight(encoding);
+      // Ties go to the earlier (smaller) variant
+      if (q <= 0 || (best && q <= best.q)) continue;
+      if (fs.existsSync(file + suffix)) best = { encoding, suffix, q };
+    }
+    if (!best || best.q < identity) return next();
+    res.type(path.extname(pathname));
+    res.set("Content-Encoding", best.encoding);
+    res.sendFile(file + best.suffix, { ...sendOptions, acceptRanges: false });
+  };
+}
+
 // ==========================================
 // EXPORTS
 // ==========================================
 
 module.exports = {
   injectChatbot,
+  servePrecompressed,
   attachSupabaseUser,
   shouldSkipChatbot,
   CHATBOT_EXCLUDE,
@@ -0,0 +1,53 @@
+// models/promotion.js
+const mongoose = require("mongoose");
+const Schema = mongoose.Schema;
+
+// One paid listing promotion, kept for receipts and host statements
+const promotionSchema = new Schema({
+  listing: {
+    type: Schema.Types.ObjectId,
+    ref: "Listing",
+    required: true,
+  },
+  host: {
+    type: Schema.Types.ObjectId,
+    ref: "User",
+    required: true,
+  },
+  amount: {
+    type: Number,
+    required: true,
+  },
+  days: {
+    type: Number,
+    required: true,
+  },
+  paymentId: {
+    type: String,
+    required: true,
+  },
+  orderId: {
+    type: String,
+    required: true,
+  },
+  paymentStatus: {
+    type: String,
+    enum: ["pending", "completed", "failed"],
+    default: "pending",
+  },
+  expiresAt: {
+    type: Date,
+    required: true,
+  },
+  createdAt: {
+    type: Date,
+    default: Date.now,
+  },
+});
+
+// One promotion per payment, however often its verification is retried
+promotionSchema.index({ paymentId: 1 }, { unique: true });
+
+const Promotion = mongoose.model("Promotion", promotionSchema);
+
+module.exports = Promotion;
@@ -75,6 +75,13 @@
       b.className = 'bubble';
       b.textContent = m.text;
       wrapper.appendChild(b);
+      // Intent replies link to an app page; only same-site paths
+      const link = m.meta && m.meta.link;
+      if (link && typeof link.href === 'string' && /^\/(?!\/)/.test(link.href)) {
+        const a = document.createElement('a'); a.className = 'hc-link';
+        a.href = link.href; a.textContent = link.label || link.href;
+        wrapper.appendChild(a);
+      }
       if (m.meta && m.meta.retrieved && Array.isArray(m.meta.retrieved)) {
         const v = document.createElement('div'); v.className = 'hc-source';
         v.textContent = `Retrieved ${m.meta.retrieved.length} docs`;
@@ -107,7 +114,7 @@
       } else {
         const j = await res.json();
         const reply = j && (j.reply || j.answer || '') || 'No response';
-        history[history.length - 1] = { role: 'bot', text: reply, meta: { source_used: j.source_used || null, retrieved: j.retrieved || [] }, t: Date.now() };
+        history[history.length - 1] = { role: 'bot', text: reply, meta: { source_used: j.source_used || null, retrieved: j.retrieved || [], link: j.link || null }, t: Date.now() };
         // populate sources panel
         if (j && j.retrieved && Array.isArray(j.retrieved)) {
           sourcesList.innerHTML = '';
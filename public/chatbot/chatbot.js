@@ -47,6 +47,17 @@
     hcBody.scrollTop = hcBody.scrollHeight;
   }
 
+  // Intent replies carry the page they point to; only same-site paths
+  function appendLink(container, link) {
+    if (!link || typeof link.href !== "string") return;
+    if (!/^\/(?!\/)/.test(link.href)) return;
+    const a = document.createElement("a");
+    a.className = "hc-link";
+    a.href = link.href;
+    a.textContent = link.label || link.href;
+    container.appendChild(a);
+  }
+
   function appendMessage(role, text, save = true, meta = null) {
     const container = document.createElement("div");
     container.className = "hc-msg " + (role === "user" ? "user" : "bot");
@@ -56,6 +67,7 @@
     let html = text.replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>");
     bubble.innerHTML = html;
     container.appendChild(bubble);
+    if (meta) appendLink(container, meta.link);
     if (meta && meta.source_used) {
       const s = document.createElement("div");
       s.className = "hc-source";
@@ -120,6 +132,7 @@
         // Basic markdown to HTML
         const html = reply.replace(/\*\*(.*?)\*\*/g, "<strong>$1</strong>");
         place.querySelector(".bubble").innerHTML = html;
+        appendLink(place, j && j.link);
 
         // show source if available
         if (j && j.source_used) {
@@ -132,7 +145,7 @@
         history.push({
           role: "bot",
           text: reply,
-          meta: { source_used: j.source_used || null },
+          meta: { source_used: j.source_used || null, link: j.link || null },
           t: Date.now(),
         });
         sessionStorage.setItem(HISTORY_KEY, JSON.stringify(history.slice(-60)));
@@ -1,6 +1,7 @@
 // routes/chatbot.js — simple proxy to your FastAPI RAG backend
 const express = require("express");
 const fetch = global.fetch || require("node-fetch");
+const { routeIntent } = require("../utils/intentRouter");
 const router = express.Router();
 
 // Configure upstream FastAPI details via env (default local)
@@ -16,6 +17,20 @@ router.post("/api/chat", express.json(), async (req, res) => {
       return res.status(400).json({ success: false, error: "message is required" });
     }
 
+    // Navigational messages ("my bookings") get a link without retrieval
+    const intent = await routeIntent(message);
+    if (intent) {
+      return res.json({
+        success: true,
+        // Plain text; clients render `link` themselves
+        reply: `${intent.reply} ${intent.label}.`,
+        source_used: null,
+        intent: intent.intent,
+        link: { href: intent.href, label: intent.label },
+        retrieved: null
+      });
+    }
+
     const payload = { query: message };
     if (Number.isInteger(k)) payload.k = k;
     if (typeof temperature === "number") payload.temperature = temperature;
@@ -0,0 +1,140 @@
+import pytest
+
+from homyhive import answers, corpus, retrieval
+
+
+def _chunks(source, *sections):
+    return [
+        {
+            "id": corpus.chunk_id(source, section, text),
+            "source": source,
+            "section": section,
+            "text": text,
+            "audience": "all",
+            "kind": "faq",
+            "locale": "en",
+        }
+        for section, text in sections
+    ]
+
+
+QUESTIONS = ["How do I cancel a booking?", "When are host payouts sent?"]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = retrieval.Index(str(tmp_path / "index"), root=str(tmp_path))
+    index.update(
+        {
+            "cancel.md": _chunks(
+                "cancel.md",
+                ("How do I cancel a booking?", "Cancel a booking from your trips."),
+            ),
+            "payouts.md": _chunks(
+                "payouts.md",
+                ("When are host payouts sent?", "Host payouts are sent weekly."),
+            ),
+        }
+    )
+    return index
+
+
+def test_refresh_publishes_answers_for_the_snapshot(index):
+    stats = answers.refresh(index, QUESTIONS)
+    assert (stats["questions"], stats["computed"]) == (2, 2)
+    assert index.read_manifest()["answers"] == stats["id"]
+
+    snapshot = index.snapshot
+    entry = snapshot.answer("cancel booking", 5)
+    assert entry["results"][0]["source"] == "cancel.md"
+    assert snapshot.answer("How do I cancel a booking?", 5) is entry
+    # Deeper searches than the cache holds run normally
+    assert snapshot.answer("cancel booking", answers.CACHE_K + 1) is None
+
+
+def test_changing_a_chunk_drops_only_the_answers_using_it(index):
+    answers.refresh(index, QUESTIONS)
+    index.update(
+        {
+            "cancel.md": _chunks(
+                "cancel.md",
+                ("How do I cancel a booking?", "Cancel within 48h."),
+            )
+        }
+    )
+    snapshot = index.snapshot
+    assert snapshot.answer("cancel booking", 5) is None
+    assert snapshot.answer("host payouts sent", 5) is not None
+
+    # The next refresh recomputes the stale answer and keeps the other
+    stats = answers.refresh(index)
+    assert (stats["computed"], stats["kept"]) == (1, 1)
+    entry = index.snapshot.answer("cancel booking", 5)
+    assert "48h" in entry["results"][0]["text"]
+
+
+def test_answers_written_for_an_old_generation_are_refused(index):
+    snapshot = index.snapshot
+    index.update({"payouts.md": None})
+    assert (
+        index.write_answers(
+            {
+                "version": answers.ANSWERS_VERSION,
+                "generation": snapshot.generation,
+                "k": answers.CACHE_K,
+                "fingerprints": {},
+                "answers": {},
+            }
+        )
+        is None
+    )
+    assert index.read_manifest()["answers"] is None
+
+
+def test_head_questions_counts_headings_and_logs(index, tmp_path):
+    log = tmp_path / "chat.jsonl"
+    log.write_text(
+        "\n".join(
+            [
+                '{"message": "refund status"}',
+                '"Cancel my booking"',
+                "host payouts sent?",
+                "host payouts sent?",
+                "",
+            ]
+        ),
+        encoding="utf-8",
+    )
+    # Rephrasings of a heading count towards it and keep its wording
+    assert answers.head_questions(index.snapshot, [str(log)]) == [
+        "When are host payouts sent?",
+        "How do I cancel a booking?",
+        "refund status",
+    ]
+    assert answers.head_questions(index.snapshot, [str(log)], limit=1) == [
+        "When are host payouts sent?"
+    ]
+
+
+def test_changing_chunk_metadata_drops_the_answers_using_it(index):
+    answers.refresh(index, QUESTIONS)
+    chunks = _chunks(
+        "cancel.md",
+        ("How do I cancel a booking?", "Cancel a booking from your trips."),
+    )
+    chunks[0]["audience"] = "hosts"
+    index.update({"cancel.md": chunks})
+    assert index.snapshot.answer("cancel booking", 5) is None
+    assert index.snapshot.answer("host payouts sent", 5) is not None
+
+
+def test_answers_expire_once_the_index_has_grown(index):
+    answers.refresh(index, QUESTIONS)
+    # A third more chunks shifts every idf: nothing cached is served
+    index.update(
+        {"house.md": _chunks("house.md", ("Quiet hours", "Keep noise down at night."))}
+    )
+    assert index.snapshot.answers == {}
+    stats = answers.refresh(index)
+    assert (stats["computed"], stats["kept"]) == (2, 0)
+    assert index.snapshot.answer("cancel booking", 5) is not None
@@ -0,0 +1,103 @@
+import glob
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from homyhive import ROOT, assets
+
+
+def test_css_drops_comments_and_whitespace():
+    source = """
+    /* header */
+    .a  >  .b ,
+    .c {
+        color : red ;
+        margin: 0 auto;
+    }
+    """
+    assert assets.minify_css(source) == ".a>.b,.c{color : red;margin: 0 auto}"
+
+
+def test_css_keeps_strings_verbatim():
+    source = '.icon::before { content: "/* not a comment */  x"; }'
+    expected = '.icon::before{content: "/* not a comment */  x"}'
+    assert assets.minify_css(source) == expected
+
+
+def test_js_keeps_line_breaks_for_asi():
+    source = "let a = 1\nlet b = a\n++b\n"
+    assert assets.minify_js(source) == "let a=1\nlet b=a\n++b\n"
+
+
+def test_js_keeps_space_between_words_and_repeated_signs():
+    assert assets.minify_js("return  typeof x") == "return typeof x\n"
+    assert assets.minify_js("a + +b; c - -d") == "a+ +b;c- -d\n"
+
+
+def test_js_copies_strings_templates_and_regexes():
+    source = (
+        "const s = 'a  // b';\n"
+        "const t = `x  ${ y  +  `inner ${ z }` }  w`;\n"
+        "const r = /[/]  +\\/ /g; // trailing\n"
+    )
+    minified = assets.minify_js(source)
+    assert "'a  // b'" in minified
+    assert "`x  ${" in minified and "}  w`" in minified
+    assert "/[/]  +\\/ /g;" in minified
+    assert "trailing" not in minified
+
+
+def test_js_division_is_not_a_regex():
+    assert assets.minify_js("x = a / b / c") == "x=a/b/c\n"
+
+
+needs_node = pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+
+
+def _run_node(path):
+    result = subprocess.run(["node", str(path)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+@needs_node
+def test_minified_js_behaves_the_same(tmp_path):
+    source = """
+    // Comments, ASI, regexes, templates and division side by side
+    let a = 1
+    let b = a
+    ++b
+    const re = /[/]+\\d{2}/g   // not a comment: /[/]
+    const half = b / 2 / 1
+    const label = `n=${ [1, 2].map(n => `#${ n }`).join(" ,  ") }`
+    const obj = { k: 'v  /* kept */' }
+    function f(x) {
+      return typeof x
+    }
+    console.log(a, b, "a/12//34".match(re), half, label, obj.k, f(1))
+    """
+    original = tmp_path / "original.js"
+    minified = tmp_path / "minified.js"
+    original.write_text(source, encoding="utf-8")
+    minified.write_text(assets.minify_js(source), encoding="utf-8")
+    assert _run_node(minified) == _run_node(original)
+
+
+@needs_node
+@pytest.mark.parametrize(
+    "path",
+    sorted(glob.glob(os.path.join(ROOT, "public", "js", "*.js")))
+    + sorted(glob.glob(os.path.join(ROOT, "public", "chatbot", "*.js"))),
+    ids=os.path.basename,
+)
+def test_minified_public_js_still_parses(tmp_path, path):
+    with open(path, encoding="utf-8") as handle:
+        minified = assets.minify_js(handle.read())
+    target = tmp_path / "minified.js"
+    target.write_text(minified, encoding="utf-8")
+    result = subprocess.run(
+        ["node", "--check", str(target)], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,68 @@
+import pytest
+
+from homyhive import build
+
+
+def _concat(output_path, *dep_outputs):
+    # Module-level so it can run in a worker
+    with open(output_path, "w", encoding="utf-8") as handle:
+        handle.write("built")
+        for path in dep_outputs:
+            with open(path, encoding="utf-8") as dep:
+                handle.write("|" + dep.read())
+
+
+def _broken(output_path):
+    raise RuntimeError("no fonts")
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "src.txt").write_text("one", encoding="utf-8")
+    return str(tmp_path)
+
+
+TARGETS = {
+    "base": build.Target("base", "out/base.txt", ["src.txt"], _concat),
+    "doc": build.Target("doc", "out/doc.txt", [], _concat, deps=["base"]),
+    "other": build.Target("other", "out/other.txt", ["missing/*.txt"], _concat),
+}
+
+
+def test_select_includes_dependencies():
+    assert build.select(["doc"], TARGETS) == {"base", "doc"}
+    assert build.select(None, TARGETS) == set(TARGETS)
+    with pytest.raises(KeyError):
+        build.select(["nope"], TARGETS)
+
+
+def test_unchanged_targets_are_fresh(root, tmp_path):
+    assert build.build(jobs=2, targets=TARGETS, root=root) == {
+        "base": "built",
+        "doc": "built",
+        "other": "built",
+    }
+    assert (tmp_path / "out" / "doc.txt").read_text() == "built|built"
+    results = build.build(jobs=2, targets=TARGETS, root=root)
+    assert set(results.values()) == {"fresh"}
+
+    # A changed input rebuilds its target; the same output keeps dependents fresh
+    (tmp_path / "src.txt").write_text("two", encoding="utf-8")
+    assert build.build(jobs=2, targets=TARGETS, root=root) == {
+        "base": "built",
+        "doc": "fresh",
+        "other": "fresh",
+    }
+    assert build.build(["base"], force=True, targets=TARGETS, root=root) == {
+        "base": "built"
+    }
+
+
+def test_failures_propagate_to_dependents(root):
+    targets = dict(
+        TARGETS, base=build.Target("base", "out/base.txt", ["src.txt"], _broken)
+    )
+    results = build.build(targets=targets, root=root)
+    assert results["base"] == "failed: no fonts"
+    assert results["doc"] == "failed: needs base"
+    assert results["other"] == "built"
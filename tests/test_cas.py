@@ -0,0 +1,44 @@
+import os
+
+import generate_privacy_pdf
+
+from homyhive import cas
+
+
+def test_deterministic_pdfs_are_byte_identical(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    first, second = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    generate_privacy_pdf.create_privacy_pdf(str(first), deterministic=True)
+    generate_privacy_pdf.create_privacy_pdf(str(second), deterministic=True)
+    assert first.read_bytes() == second.read_bytes()
+
+    plain = tmp_path / "plain.pdf"
+    generate_privacy_pdf.create_privacy_pdf(
+        str(plain), deterministic=True, compress=False
+    )
+    assert plain.stat().st_size > first.stat().st_size
+
+
+def test_store_addresses_files_by_content(tmp_path):
+    source = tmp_path / "privacy.pdf"
+    source.write_bytes(b"%PDF-1.4 one")
+    url = cas.store(str(source), root=str(tmp_path))
+    digest = cas.file_digest(str(source))[: cas.DIGEST_CHARS]
+    assert url == f"/static/cas/{digest}/privacy.pdf"
+    assert cas.store(str(source), root=str(tmp_path)) == url
+
+    source.write_bytes(b"%PDF-1.4 two")
+    changed = cas.store(str(source), root=str(tmp_path))
+    assert changed != url
+    # The old URL keeps serving its bytes; the manifest names the new one
+    assert os.path.exists(os.path.join(tmp_path, "public", url.lstrip("/")))
+    assert cas.load_manifest(str(tmp_path)) == {"privacy.pdf": changed}
+
+
+def test_store_copies_precompressed_variants(tmp_path):
+    source = tmp_path / "privacy.pdf"
+    source.write_bytes(b"%PDF-1.4 " + b"x" * 1000)
+    (tmp_path / "privacy.pdf.gz").write_bytes(b"gz")
+    url = cas.store(str(source), root=str(tmp_path))
+    stored = os.path.join(tmp_path, "public", url.lstrip("/"))
+    assert open(stored + ".gz", "rb").read() == b"gz"
@@ -0,0 +1,70 @@
+import io
+import json
+
+from reportlab.platypus import Paragraph
+
+import HomyHive_Project_Documentation as documentation
+
+
+def _render(story):
+    output = io.BytesIO()
+    documentation.render_documentation(story, output, deterministic=True)
+    return output.getvalue()
+
+
+def _write_listings(path, count):
+    with open(path, "w", encoding="utf-8") as handle:
+        for number in range(count):
+            listing = {
+                "title": f"Listing {number}",
+                "location": {"address": "Goa"} if number % 2 else "Manali",
+                "country": "India",
+                "price": 1000 + number,
+                "averageRating": 4.5 if number % 3 else None,
+            }
+            handle.write(json.dumps(listing) + "\n")
+
+
+def test_lazy_story_renders_like_a_list(tmp_path):
+    styles = documentation.build_styles()
+    path = tmp_path / "listings.jsonl"
+    _write_listings(path, 300)
+
+    def story():
+        return documentation.catalogue_flowables(
+            documentation.read_listings(str(path)), styles
+        )
+
+    assert _render(documentation.LazyFlowables(story())) == _render(list(story()))
+
+
+class _Probe(Paragraph):
+    drawn = 0
+
+    def draw(self):
+        _Probe.drawn += 1
+        super().draw()
+
+
+def test_story_is_pulled_as_pages_are_drawn():
+    styles = documentation.build_styles()
+    pulled, ahead = 0, []
+
+    def flowables():
+        nonlocal pulled
+        for number in range(2000):
+            pulled += 1
+            ahead.append(pulled - _Probe.drawn)
+            yield _Probe(f"Line {number}", styles["CustomNormal"])
+
+    _Probe.drawn = 0
+    _render(documentation.LazyFlowables(flowables()))
+    assert _Probe.drawn == 2000
+    # Only the look-ahead buffer is ever held undrawn
+    assert max(ahead) <= documentation.LazyFlowables.LOOKAHEAD + 1
+
+
+def test_listing_locations_read_both_shapes():
+    listing = {"location": "Goa", "country": "India"}
+    assert documentation._listing_location(listing) == "Goa, India"
+    assert documentation._listing_location({"location": {"city": "x"}}) == ""
@@ -0,0 +1,18 @@
+import pytest
+
+from homyhive import cli
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [["--help"], ["corpus", "--output", "{scratch}/corpus.jsonl"]],
+)
+def test_light_commands_skip_the_pdf_stacks(argv):
+    assert cli._heavy_modules_loaded(argv) == []
+
+
+def test_every_command_has_a_handler():
+    parser = cli.build_parser()
+    commands = parser._subparsers._group_actions[0].choices
+    for name, command in commands.items():
+        assert callable(command.get_default("handler")), name
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+from homyhive import fonts
+
+
+@pytest.fixture
+def chain():
+    chain = fonts.FontChain.installed([("DejaVuSans", "DejaVuSans.ttf", None)])
+    if not chain.fonts:
+        pytest.skip("needs DejaVuSans")
+    return chain
+
+
+def test_coverage_bitset():
+    coverage = fonts.Coverage.from_codepoints([65, 0x20B9, 0x0915])
+    assert 65 in coverage and 0x20B9 in coverage and 0x0915 in coverage
+    assert 66 not in coverage and 0x10FFFF not in coverage
+    assert ord("é") in fonts.STANDARD_COVERAGE
+    assert 0x20B9 not in fonts.STANDARD_COVERAGE
+
+
+def test_installed_skips_missing_fonts():
+    with pytest.raises(ValueError):
+        fonts.FontChain.installed([("Missing", "NoSuchFont.ttf", None)])
+
+
+def test_runs_leave_covered_text_to_the_base_font(chain):
+    text = "Price ₹1,200 ✓ ok"
+    runs = chain.runs(text, fonts.STANDARD_COVERAGE)
+    assert "".join(run for _, run in runs) == text
+    assert [(font and font.family, run) for font, run in runs] == [
+        (None, "Price "),
+        ("DejaVuSans", "₹"),
+        (None, "1,200 "),
+        ("DejaVuSans", "✓ "),
+        (None, "ok"),
+    ]
+    assert chain.uncovered(text) == set()
+
+
+def test_markup_wraps_runs_but_not_tags(chain):
+    text = "<b>₹</b> &amp; ₹"
+    assert fonts.markup(text, chain) == (
+        '<b><font name="DejaVuSans">₹</font></b> &amp; '
+        '<font name="DejaVuSans">₹</font>'
+    )
+    assert fonts.markup("<b>x</b>", chain) == "<b>x</b>"
+    assert 'name="DejaVuSans-Bold"' in fonts.markup("₹", chain, bold=True)
+
+
+
+class _Recorder:
+    """Canvas and text object stand-in recording the fonts set"""
+
+    def __init__(self):
+        self.fonts = []
+
+    def beginText(self, x, y):
+        return self
+
+    def setFont(self, name, size):
+        self.fonts.append(name)
+
+    def textOut(self, text):
+        pass
+
+    def drawText(self, textobject):
+        pass
+
+
+def test_draw_text_keeps_bold_in_fallback_runs(chain):
+    canvas = _Recorder()
+    fonts.draw_text(canvas, 0, 0, "Total ₹500", "Helvetica-Bold", 10, chain)
+    assert canvas.fonts == ["Helvetica-Bold", "DejaVuSans-Bold", "Helvetica-Bold"]
+    canvas = _Recorder()
+    fonts.draw_text(canvas, 0, 0, "Total ₹500", "Helvetica", 10, chain)
+    assert canvas.fonts == ["Helvetica", "DejaVuSans", "Helvetica"]
+
+
+def test_coverage_is_cached_on_disk(chain, tmp_path, monkeypatch):
+    monkeypatch.setenv("HOMYHIVE_FONT_CACHE", str(tmp_path))
+    path = chain.fonts[0].regular
+    parsed = fonts.coverage.__wrapped__(path)
+    assert os.listdir(tmp_path) and ord("₹") in parsed
+    assert fonts.coverage.__wrapped__(path).bits == parsed.bits
@@ -0,0 +1,59 @@
+import io
+
+import pikepdf
+from reportlab.platypus import PageBreak, Paragraph
+
+import HomyHive_Project_Documentation as documentation
+
+
+def _render(story, **options):
+    output = io.BytesIO()
+    documentation.render_documentation(story, output, deterministic=True, **options)
+    return pikepdf.open(io.BytesIO(output.getvalue()))
+
+
+def _story(pages):
+    styles = documentation.build_styles()
+    story = []
+    for number in range(pages):
+        story += [Paragraph(f"Page body {number}", styles["CustomNormal"]), PageBreak()]
+    return story[:-1]
+
+
+def _forms(page):
+    xobjects = page.obj.Resources.get("/XObject", {})
+    return {
+        xobject.objgen
+        for xobject in xobjects.values()
+        if xobject.get("/Subtype") == "/Form"
+    }
+
+
+def test_furniture_is_one_form_per_kind_shared_by_pages():
+    pdf = _render(_story(6))
+    forms = [_forms(page) for page in pdf.pages]
+    assert len(forms) == 6
+    cover, body = forms[0], forms[1]
+    assert len(cover) == 1 and len(body) == 1 and cover != body
+    assert all(page == body for page in forms[1:])
+
+
+def test_furniture_draws_its_static_parts_once(monkeypatch):
+    calls = {"draw": 0, "per_page": 0}
+
+    def draw(canvas, doc):
+        calls["draw"] += 1
+
+    def per_page(canvas, doc):
+        calls["per_page"] += 1
+
+    furniture = documentation.PageFurniture("TestFurniture", draw, per_page)
+    monkeypatch.setattr(documentation, "COVER_FURNITURE", furniture)
+    monkeypatch.setattr(documentation, "BODY_FURNITURE", furniture)
+    _render(_story(5))
+    assert calls == {"draw": 1, "per_page": 5}
+
+
+def test_without_furniture_pages_have_no_forms():
+    pdf = _render(_story(2), furniture=False)
+    assert all(not _forms(page) for page in pdf.pages)
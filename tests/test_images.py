@@ -0,0 +1,53 @@
+import json
+import os
+
+import pytest
+from PIL import Image
+
+from homyhive import images
+
+
+@pytest.fixture
+def root(tmp_path):
+    source_dir = tmp_path / images.SOURCE_DIR
+    source_dir.mkdir(parents=True)
+    Image.new("RGB", (2000, 1000), (200, 30, 30)).save(source_dir / "id.jpg")
+    (source_dir / "copy.jpg").write_bytes((source_dir / "id.jpg").read_bytes())
+    (source_dir / "broken.png").write_bytes(b"not an image")
+    return str(tmp_path)
+
+
+def test_duplicates_share_variants_and_failures_are_listed(root):
+    sources = images.list_sources(root)
+    stats = images.process(sources, root=root, jobs=1)
+    assert (stats["sources"], stats["unique"], stats["rendered"]) == (3, 2, 1)
+    assert [os.path.basename(p) for p in stats["failed_sources"]] == ["broken.png"]
+
+    manifest = images.load_manifest(root)
+    assert sorted(manifest) == [
+        "/uploads/host-documents/copy.jpg",
+        "/uploads/host-documents/id.jpg",
+    ]
+    entry = manifest["/uploads/host-documents/id.jpg"]
+    assert entry == manifest["/uploads/host-documents/copy.jpg"]
+    thumb = os.path.join(root, "public", entry["variants"]["thumb.jpg"].lstrip("/"))
+    with Image.open(thumb) as image:
+        assert max(image.size) == images.VARIANTS["thumb.jpg"][0]
+
+    # Rendered content is skipped on the next pass; the failure is retried
+    again = images.process(sources, root=root, jobs=1)
+    assert again["rendered"] == 0 and again["failed_sources"] == stats["failed_sources"]
+
+
+def test_manifest_moves_out_of_public(root):
+    legacy = os.path.join(root, images.OUTPUT_DIR, "manifest.json")
+    os.makedirs(os.path.dirname(legacy))
+    with open(legacy, "w", encoding="utf-8") as handle:
+        json.dump({"/uploads/host-documents/old.jpg": {"hash": "x"}}, handle)
+
+    images.process([], root=root)
+    assert not os.path.exists(legacy)
+    assert images.load_manifest(root) == {
+        "/uploads/host-documents/old.jpg": {"hash": "x"}
+    }
+    assert os.path.exists(os.path.join(root, images.MANIFEST_PATH))
@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from homyhive import ROOT, intents
+
+MESSAGES = [
+    "my bookings",
+    "open my wishlist please",
+    "how do I cancel my booking?",
+    "cancel my booking",
+    "show my notifications",
+    "what is the cancellation policy",
+    "become a host",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def router():
+    return intents.compile_router(chunks=[])
+
+
+def test_keywords_route_navigation(router):
+    assert intents.route(router, "my bookings") == ("bookings", 1.0)
+    assert intents.route(router, "Wishlist!") == ("wishlist", 1.0)
+    assert intents.route(router, "go to my profile") == ("profile", 1.0)
+    assert intents.route(router, "") == (None, 0.0)
+
+
+def test_questions_are_left_to_search(router):
+    for question in (
+        "How do I cancel my booking?",
+        "what is the cancellation policy",
+        "why was my payment declined",
+        "how long does host verification take",
+        "is my booking confirmed",
+        "cancel my booking",
+        "refund for my booking",
+        "my booking payment failed",
+        "delete my account",
+    ):
+        assert intents.route(router, question)[0] is None, question
+
+
+def test_examples_route_to_their_intent(router):
+    examples = [
+        (example, name)
+        for name, intent in intents.INTENTS.items()
+        for example in intent["examples"]
+    ]
+    wrong = [e for e, name in examples if intents.route(router, e)[0] != name]
+    assert len(wrong) <= len(examples) // 20, wrong
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_node_router_agrees(router, tmp_path):
+    path = intents.write_router(router, str(tmp_path / "router.json"))
+    script = (
+        "const { routeIntent } = require(process.argv[1]);"
+        "(async () => {"
+        "  const out = [];"
+        "  for (const m of JSON.parse(process.argv[2])) {"
+        "    const r = await routeIntent(m);"
+        "    out.push(r && r.intent);"
+        "  }"
+        "  console.log(JSON.stringify(out));"
+        "})();"
+    )
+    result = subprocess.run(
+        [
+            "node",
+            "-e",
+            script,
+            os.path.join(ROOT, "utils", "intentRouter.js"),
+            json.dumps(MESSAGES),
+        ],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, INTENT_ROUTER_PATH=path),
+    )
+    assert result.returncode == 0, result.stderr
+    expected = [intents.route(router, message)[0] for message in MESSAGES]
+    assert json.loads(result.stdout) == expected
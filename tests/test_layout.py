@@ -0,0 +1,63 @@
+import io
+
+import pytest
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph
+
+from homyhive import layout
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = layout.LayoutCache()
+    monkeypatch.setattr(layout, "_CACHE", cache)
+    return cache
+
+
+def _render_docs():
+    import HomyHive_Project_Documentation as documentation
+
+    styles = documentation.build_styles()
+    story = documentation.build_story(styles, documentation.generation_date(True))
+    output = io.BytesIO()
+    documentation.render_documentation(story, output, deterministic=True)
+    return output.getvalue()
+
+
+def test_cached_layout_renders_identical_bytes(cache, monkeypatch):
+    cold = _render_docs()
+    misses = cache.misses
+    assert misses
+
+    warm = _render_docs()
+    assert cache.misses == misses
+    assert warm == cold
+
+    # And both match reportlab's own line breaking
+    monkeypatch.setattr(layout.CachedParagraph, "breakLines", Paragraph.breakLines)
+    assert _render_docs() == cold
+
+
+def test_key_depends_on_text_style_and_width():
+    # reportlab passes the widths of the first and following lines
+    normal, body = getSampleStyleSheet()["Normal"], getSampleStyleSheet()["BodyText"]
+    key = layout.LayoutCache.key("Some text", normal, [200, 180])
+    assert key == layout.LayoutCache.key("Some text", normal, [200.0000001, 180])
+    assert key != layout.LayoutCache.key("Some text!", normal, [200, 180])
+    assert key != layout.LayoutCache.key("Some text", body, [200, 180])
+    assert key != layout.LayoutCache.key("Some text", normal, [200, 181])
+    assert key != layout.LayoutCache.key("Some text", normal, [200, 180], "•")
+
+
+def test_lru_evicts_oldest_and_persists(tmp_path):
+    path = tmp_path / "layout.pickle"
+    cache = layout.LayoutCache(maxsize=2, path=str(path))
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    cache.save()
+
+    reloaded = layout.LayoutCache(path=str(path))
+    assert (reloaded.get("a"), reloaded.get("c")) == (1, 3)
@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from homyhive import legal
+
+
+def _source_texts(blocks):
+    for kind, text in blocks:
+        yield text.split(":", 1)[0] if kind == "updated" and ":" in text else text
+
+
+@pytest.mark.parametrize("document", sorted(legal.DOCUMENTS))
+def test_catalogs_translate_every_block(document):
+    blocks = legal.extract(legal.DOCUMENTS[document])
+    assert blocks and blocks[0][0] == "title"
+    for locale in legal.locales():
+        if locale == "en":
+            continue
+        catalog = legal.load_catalog(locale)
+        missing = [text for text in _source_texts(blocks) if text not in catalog]
+        assert missing == [], locale
+
+
+def test_localize_keeps_english_without_an_entry():
+    blocks = [
+        ("title", "Privacy"),
+        ("updated", "Last updated: 1 May"),
+        ("para", "x"),
+    ]
+    catalog = {"Privacy": "गोपनीयता", "Last updated": "अद्यतन"}
+    assert legal.localize(blocks, catalog) == [
+        ("title", "गोपनीयता"),
+        ("updated", "अद्यतन: 1 May"),
+        ("para", "x"),
+    ]
+
+
+def test_text_hash_changes_with_the_text():
+    blocks = [("para", "a")]
+    assert legal.text_hash(blocks) == legal.text_hash(list(blocks))
+    assert legal.text_hash(blocks) != legal.text_hash([("para", "b")])
+
+
+def test_digest_follows_the_chosen_font_files(tmp_path):
+    from homyhive import fonts
+
+    installed = fonts.find_font("DejaVuSans.ttf")
+    if not installed:
+        pytest.skip("needs DejaVuSans")
+    path = tmp_path / "DejaVuSans.ttf"
+    path.write_bytes(open(installed, "rb").read())
+    chain = fonts.FontChain([fonts.Font("DejaVuSans", str(path))])
+    blocks = [("para", "गोपनीयता")]
+    before = legal.text_hash(blocks, legal.font_files(blocks, chain))
+    assert before != legal.text_hash(blocks)
+
+    # A newly installed (or updated) font file re-renders the document
+    os.utime(path, ns=(0, 0))
+    assert legal.text_hash(blocks, legal.font_files(blocks, chain)) != before
+
+
+def test_cli_reports_missing_fonts(monkeypatch, capsys):
+    from homyhive import cli, fonts
+
+    def no_fonts():
+        raise ValueError("no fallback fonts are installed")
+
+    monkeypatch.setattr(fonts, "default_chain", no_fonts)
+    assert cli.main(["legal"]) == 1
+    assert "no fallback fonts are installed" in capsys.readouterr().out
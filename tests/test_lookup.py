@@ -0,0 +1,69 @@
+import csv
+import gzip
+import random
+
+import pytest
+
+from homyhive import lookup
+
+
+def _write_pincodes(path, rows):
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "wt", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["OfficeName", "Pincode", "District", "StateName"])
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def pincodes(tmp_path):
+    rng = random.Random(3)
+    pins = rng.sample(range(100000, 1000000), 500)
+    rows = [
+        [f"Office {pin}", str(pin), f"District {pin % 97}", "Karnataka"]
+        for pin in pins
+    ]
+    # A second office under the same PIN and an exact duplicate row
+    rows.append(["Second office", str(pins[0]), "District X", "Karnataka"])
+    rows.append(rows[1])
+    rows.append(["Malformed", "01234", "Nowhere", "None"])
+    source = tmp_path / "pincode.csv.gz"
+    _write_pincodes(source, rows)
+    output = tmp_path / "pincode.idx"
+    count = lookup.compile_dump("pincode", str(source), str(output))
+    return pins, lookup.LookupFile(str(output)), count
+
+
+def test_every_key_is_found(pincodes):
+    pins, table, count = pincodes
+    assert count == len(table) == len(pins)
+    for pin in pins[1:]:
+        assert table.get(str(pin)) == [
+            {
+                "office": f"Office {pin}",
+                "district": f"District {pin % 97}",
+                "state": "Karnataka",
+            }
+        ]
+
+
+def test_duplicate_keys_keep_every_distinct_row(pincodes):
+    pins, table, _ = pincodes
+    offices = [row["office"] for row in table.get(str(pins[0]))]
+    assert offices == [f"Office {pins[0]}", "Second office"]
+
+
+def test_missing_keys_miss(pincodes):
+    pins, table, _ = pincodes
+    present = set(pins)
+    for pin in (100000, 999999, min(pins) - 1, max(pins) + 1):
+        if pin not in present:
+            assert table.get(str(pin)) is None
+    assert table.get("12345") is None  # wrong width
+
+
+def test_normalize_key():
+    assert lookup.normalize_key("ifsc", " hdfc0001234 ") == "HDFC0001234"
+    assert lookup.normalize_key("ifsc", "HDFC1001234") is None
+    assert lookup.normalize_key("pincode", "560 001") == "560001"
+    assert lookup.normalize_key("pincode", "060001") is None
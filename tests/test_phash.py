@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from homyhive import phash
+
+
+def _near(value, flips, rng):
+    for position in rng.sample(range(64), flips):
+        value ^= 1 << position
+    return value
+
+
+@pytest.fixture
+def stored():
+    rng = random.Random(7)
+    values = [rng.getrandbits(64) for _ in range(400)]
+    # Near-duplicates at every distance a lookup can ask about
+    values += [_near(values[i], i % 12, rng) for i in range(200)]
+    table = phash.MultiIndexHash()
+    for key, value in enumerate(values):
+        table.add(value, key)
+    return table, values
+
+
+@pytest.mark.parametrize("radius", [0, 1, 3, 6, 8, 11])
+def test_radius_search_matches_brute_force(stored, radius):
+    table, values = stored
+    rng = random.Random(radius)
+    queries = [_near(rng.choice(values), rng.randrange(10), rng) for _ in range(50)]
+    for query in queries:
+        found = {
+            (d, key) for d, _, keys in table.search(query, radius) for key in keys
+        }
+        expected = {
+            (phash.distance(query, value), key)
+            for key, value in enumerate(values)
+            if phash.distance(query, value) <= radius
+        }
+        assert found == expected
+
+
+def test_results_are_nearest_first(stored):
+    table, values = stored
+    distances = [d for d, _, _ in table.search(values[3], 8)]
+    assert distances == sorted(distances)
+
+
+def test_remove_drops_only_that_key():
+    table = phash.MultiIndexHash()
+    table.add(0xFF, "a")
+    table.add(0xFF, "b")
+    table.remove(0xFF, "a")
+    assert table.search(0xFF, 0) == [(0, 0xFF, ["b"])]
+    table.remove(0xFF, "b")
+    assert table.search(0xFF, 0) == []
+    assert all(not t for t in table.tables)
+
+
+def test_duplicate_index_replaces_and_excludes(tmp_path):
+    index = phash.DuplicateIndex(str(tmp_path / "phash.json"))
+    index.add("/uploads/a.jpg", 0x1234)
+    index.add("/uploads/a.jpg", 0xABCD0000)
+    index.add("/uploads/b.jpg", 0xABCD0001)
+    assert index.check(0x1234, radius=0) == []
+    assert index.check(0xABCD0000, exclude="/uploads/a.jpg") == [
+        {"key": "/uploads/b.jpg", "distance": 1}
+    ]
+
+    index.save()
+    loaded = phash.DuplicateIndex.load(index.path)
+    assert loaded.entries == index.entries
+    assert len(loaded.table) == 2
+
+
+def test_resubmissions_match_earlier_uploads_to_the_same_slot(tmp_path):
+    index = phash.DuplicateIndex(str(tmp_path / "phash.json"))
+    first = "h1:idFront:https://i.ibb.co/a.jpg"
+    second = "h1:idFront:https://i.ibb.co/b.jpg"
+    index.add(first, 0xABCD0000)
+    assert index.check(0xABCD0001, exclude=second) == [{"key": first, "distance": 1}]
+    index.add(second, 0xABCD0001)
+    # A replaced document stays on file for the next account that submits it
+    assert [m["key"] for m in index.check(0xABCD0000, exclude="h2:idFront:c")] == [
+        first,
+        second,
+    ]
@@ -0,0 +1,51 @@
+import numpy as np
+
+from homyhive import pricing
+
+
+def test_suggestions_are_round_and_within_the_comparables_range():
+    listings, bookings = pricing.synthetic(5_000, seed=1, now=1_700_000_000)
+    result = pricing.suggest(listings, bookings, now=1_700_000_000)
+    suggested = result["suggested"]
+    assert np.isfinite(suggested).all()
+    assert (result["low"] <= suggested).all() and (suggested <= result["high"]).all()
+    # Round figures, unless clipped to a bound
+    clipped = (suggested == result["low"]) | (suggested == result["high"])
+    assert (suggested[~clipped] % pricing.ROUND_TO == 0).all()
+
+
+def test_occupancy_only_counts_the_window():
+    day = pricing.DAY_SECONDS
+    now = 1_700_000_000
+    listings = {
+        "category": np.zeros(1, dtype=np.int32),
+        "area": np.zeros(1, dtype=np.int32),
+        "country": np.zeros(1, dtype=np.int32),
+        "price": np.array([2000.0]),
+    }
+    bookings = {
+        "listing": np.array([0, 0], dtype=np.int32),
+        # Nine nights ending now, and one stay long before the window
+        "check_in": np.array([now - 9 * day, now - 400 * day]),
+        "check_out": np.array([now, now - 390 * day]),
+        "total": np.array([18000.0, 20000.0]),
+        "confirmed": np.array([True, True]),
+    }
+    result = pricing.suggest(listings, bookings, now=now)
+    assert result["occupancy"][0] == 9 / pricing.WINDOW_DAYS
+    assert result["booked_rate"][0] == 2000.0
+
+
+def test_read_exports_tolerates_malformed_amounts(tmp_path):
+    (tmp_path / "listings.jsonl").write_text(
+        '{"_id": {"$oid": "a1"}, "category": "Rooms", "price": "n/a"}\n'
+    )
+    (tmp_path / "bookings.jsonl").write_text(
+        '{"listing": {"$oid": "a1"}, "totalAmount": "n/a",'
+        ' "checkIn": {"$date": "2024-01-01T00:00:00Z"},'
+        ' "checkOut": {"$date": "2024-01-03T00:00:00Z"}}\n'
+    )
+    ids, listings, bookings = pricing.read_exports(str(tmp_path))
+    assert ids == ["a1"]
+    assert listings["price"].tolist() == [0.0]
+    assert bookings["total"].tolist() == [0.0]
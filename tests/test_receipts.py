@@ -0,0 +1,80 @@
+import json
+
+from homyhive import receipts
+
+
+def _write(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+    return str(path)
+
+
+BOOKING = {
+    "_id": {"$oid": "64b000000000000000000001"},
+    "listing": {"$oid": "64b0000000000000000000aa"},
+    "checkIn": {"$date": "2024-05-01T00:00:00Z"},
+    "checkOut": {"$date": "2024-05-04T00:00:00Z"},
+    "guests": 2,
+    "totalAmount": 11200,
+    "platformFee": 1000,
+    "paymentId": "pay_ABC123",
+    "orderId": "order_1",
+    "paymentStatus": "completed",
+    "createdAt": {"$date": "2024-04-20T10:00:00Z"},
+}
+PROMOTION = {
+    "_id": {"$oid": "64b000000000000000000002"},
+    "listing": {"$oid": "64b0000000000000000000ff"},
+    "amount": 500,
+    "days": 7,
+    "paymentStatus": "completed",
+    "createdAt": {"$date": "2024-04-21T10:00:00Z"},
+}
+
+
+def test_booking_lines_use_the_stored_fee():
+    receipt = receipts.normalize(BOOKING)
+    assert receipt["kind"] == "booking"
+    assert receipt["listing"] == "64b0000000000000000000aa"
+    assert receipt["receipt"] == "HH-ABC123"
+    assert receipt["lines"] == [
+        ("Stay (3 nights)", 10200.0),
+        ("HomyHive service fee", 1000.0),
+    ]
+    assert receipt["total"] == 11200.0
+
+
+def test_booking_fee_falls_back_to_the_markup():
+    record = {k: v for k, v in BOOKING.items() if k != "platformFee"}
+    fee = dict(receipts.normalize(record)["lines"])["HomyHive service fee"]
+    assert fee == 1200.0
+
+
+def test_promotion_without_payment_id_is_numbered_by_document():
+    receipt = receipts.normalize(PROMOTION)
+    assert receipt["kind"] == "promotion"
+    assert receipt["receipt"] == "HH-doc-64b000000000000000000002"
+    assert receipt["lines"] == [("Featured listing promotion (7 days)", 500.0)]
+
+
+def test_read_export_skips_incomplete_payments(tmp_path):
+    failed = dict(BOOKING, paymentId="pay_FAILED", paymentStatus="failed")
+    bookings = _write(tmp_path / "bookings.jsonl", [BOOKING, failed])
+    promotions = _write(tmp_path / "promotions.jsonl", [PROMOTION])
+    found = [r["receipt"] for r in receipts.read_export(bookings, promotions)]
+    assert found == ["HH-ABC123", "HH-doc-64b000000000000000000002"]
+
+
+def test_titles_come_from_the_listings_export(tmp_path):
+    bookings = _write(tmp_path / "bookings.jsonl", [BOOKING])
+    promotions = _write(tmp_path / "promotions.jsonl", [PROMOTION])
+    _write(
+        tmp_path / "listings.jsonl",
+        [{"_id": BOOKING["listing"], "title": "Lake cottage"}],
+    )
+    paths = [bookings, promotions]
+    titles = receipts.listing_titles(receipts.default_listings_path(paths))
+    assert [r["listing"] for r in receipts.read_export(*paths, titles=titles)] == [
+        "Lake cottage",
+        "64b0000000000000000000ff",
+    ]
+    assert receipts.listing_titles(str(tmp_path / "missing.jsonl")) == {}
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from homyhive import render_daemon
+
+
+def test_allowed_output_stays_inside_output_dirs(tmp_path):
+    dirs = (str(tmp_path / "build"),)
+    assert render_daemon.allowed_output(str(tmp_path / "build" / "a.pdf"), dirs)
+    assert render_daemon.allowed_output(str(tmp_path / "build/x/../b.pdf"), dirs)
+    assert not render_daemon.allowed_output(str(tmp_path / "build"), dirs)
+    assert not render_daemon.allowed_output(str(tmp_path / "build/../a.pdf"), dirs)
+    assert not render_daemon.allowed_output(str(tmp_path / "buildx" / "a.pdf"), dirs)
+
+
+def test_allowed_output_follows_symlinks(tmp_path):
+    (tmp_path / "build").mkdir()
+    os.symlink(tmp_path, tmp_path / "build" / "escape")
+    dirs = (str(tmp_path / "build"),)
+    assert not render_daemon.allowed_output(
+        str(tmp_path / "build" / "escape" / "a.pdf"), dirs
+    )
+
+
+def test_job_defaults_are_allowed():
+    for _, default in render_daemon.JOBS.values():
+        assert render_daemon.allowed_output(default, output_dirs=())
+
+
+def _write_then(error=None):
+    def render(path):
+        with open(path, "w") as handle:
+            handle.write("new")
+        if error:
+            raise error
+
+    return render, None
+
+
+def test_run_job_replaces_output_only_when_render_finishes(tmp_path, monkeypatch):
+    output = tmp_path / "out.pdf"
+    output.write_text("old")
+    monkeypatch.setitem(render_daemon.JOBS, "broken", _write_then(RuntimeError()))
+    with pytest.raises(RuntimeError):
+        render_daemon._run_job("broken", str(output))
+    assert output.read_text() == "old"
+    assert os.listdir(tmp_path) == ["out.pdf"]
+
+    monkeypatch.setitem(render_daemon.JOBS, "ok", _write_then())
+    render_daemon._run_job("ok", str(output))
+    assert output.read_text() == "new"
+    assert os.listdir(tmp_path) == ["out.pdf"]
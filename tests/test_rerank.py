@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from homyhive import rerank
+
+
+def _hit(score, text, section="", kind="help", source="a.md"):
+    chunk = {"text": text, "section": section, "kind": kind, "source": source}
+    return score, chunk
+
+
+def test_features_are_scaled_per_hit():
+    hits = [
+        _hit(4.0, "cancel booking within two days", "Cancel a booking"),
+        _hit(
+            2.0,
+            "booking details, house rules, payment terms, cancel later",
+            kind="technical",
+        ),
+    ]
+    matrix = rerank.features("cancel booking", hits)
+    column = {
+        name: matrix[:, i].tolist() for i, name in enumerate(rerank.FEATURES)
+    }
+    assert column["bm25"] == [1.0, 0.5]
+    assert column["proximity"] == [1.0, 0.0]
+    assert column["heading"] == [1.0, 0.0]
+    assert column["prior"] == pytest.approx([1.0, rerank.KIND_PRIORS["technical"]])
+    assert column["freshness"] == [0.0, 0.0]
+
+
+def test_freshness_halves_every_half_life():
+    now = 1_700_000_000
+    updated = {"a.md": now - rerank.FRESHNESS_HALF_LIFE * 86400}
+    matrix = rerank.features("refund", [_hit(1.0, "refund")], updated, now=now)
+    assert abs(matrix[0, rerank.FEATURES.index("freshness")] - 0.5) < 1e-6
+
+
+def test_rerank_promotes_phrase_and_heading_matches():
+    hits = [
+        _hit(3.0, "cancel the host payout; booking fees", kind="technical"),
+        _hit(2.8, "to cancel booking open trips", "Cancel booking"),
+    ]
+    reranked, done = rerank.rerank("cancel booking", hits, 2)
+    assert done
+    assert [chunk["section"] for _, chunk in reranked] == ["Cancel booking", ""]
+
+
+def test_spent_budget_keeps_first_stage_order():
+    hits = [_hit(3.0, "a booking"), _hit(2.0, "cancel booking", "Cancel booking")]
+    reranked, done = rerank.rerank(
+        "cancel booking", hits, 2, deadline=time.perf_counter() - 1
+    )
+    assert not done and reranked == hits
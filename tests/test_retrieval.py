@@ -0,0 +1,176 @@
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from homyhive import retrieval
+
+
+def _chunks(source, *texts, **metadata):
+    return [
+        {
+            "id": f"{source}#{number}",
+            "source": source,
+            "section": f"Section {number}",
+            "text": text,
+            "audience": metadata.get("audience", "all"),
+            "kind": metadata.get("kind", "help"),
+            "locale": "en",
+        }
+        for number, text in enumerate(texts)
+    ]
+
+
+def _sources(snapshot, query, k=10, filters=None):
+    return sorted({chunk["source"] for _, chunk in snapshot.search(query, k, filters)})
+
+
+@pytest.fixture
+def index(tmp_path):
+    return retrieval.Index(str(tmp_path / "index"), root=str(tmp_path))
+
+
+def test_replacing_a_source_tombstones_its_old_chunks(index):
+    index.update({"a.md": _chunks("a.md", "refund policy for guests")})
+    index.update({"b.md": _chunks("b.md", "host payout schedule")})
+    assert _sources(index.snapshot, "refund") == ["a.md"]
+
+    index.update({"a.md": _chunks("a.md", "cancellation window")})
+    assert _sources(index.snapshot, "refund") == []
+    assert _sources(index.snapshot, "cancellation") == ["a.md"]
+    manifest = index.read_manifest()
+    assert len(manifest["segments"]) == 3
+    assert sum(map(len, manifest["tombstones"].values())) == 1
+
+    index.update({"b.md": None})
+    assert _sources(index.snapshot, "payout") == []
+    assert len(index.snapshot) == 1
+
+
+def test_merge_drops_tombstones_and_keeps_results(index):
+    for number in range(retrieval.MERGE_FACTOR):
+        source = f"s{number}.md"
+        index.update({source: _chunks(source, f"topic{number} shared words")})
+    index.update({"s0.md": _chunks("s0.md", "topic0 rewritten shared words")})
+    before = [
+        (round(score, 4), chunk["id"])
+        for score, chunk in index.snapshot.search("shared", 10)
+    ]
+
+    assert index.merge() == retrieval.MERGE_FACTOR
+    manifest = index.read_manifest()
+    merged = [entry for entry in manifest["segments"] if entry["tier"] == 1]
+    assert len(merged) == 1 and merged[0]["docs"] == retrieval.MERGE_FACTOR - 1
+    # The merge dropped the replaced chunk, so no tombstones remain
+    assert manifest["tombstones"] == {}
+    after = [chunk["id"] for _, chunk in index.snapshot.search("shared", 10)]
+    assert sorted(after) == sorted(chunk_id for _, chunk_id in before)
+
+    assert index.merge(force=True) == 2
+    assert len(index.read_manifest()["segments"]) == 1
+    assert len(index.snapshot) == retrieval.MERGE_FACTOR
+
+
+def test_ranking_ignores_tombstones_before_a_merge(index):
+    index.update({"b.md": _chunks("b.md", "refund once, then host payouts")})
+    for number in range(6):
+        text = f"refund refund refund version {number}"
+        index.update({"a.md": _chunks("a.md", text)})
+    hits = index.snapshot.search("refund", 10)
+    assert [chunk["source"] for _, chunk in hits] == ["a.md", "b.md"]
+    assert all(score > 0 for score, _ in hits)
+
+    # The same scores a merged index gives
+    index.merge(force=True)
+    merged = index.snapshot.search("refund", 10)
+    assert [round(score, 4) for score, _ in merged] == [
+        round(score, 4) for score, _ in hits
+    ]
+
+
+def test_changing_a_source_back_revives_its_segment(index):
+    original = _chunks("a.md", "original text about refunds")
+    index.update({"a.md": original})
+    first = index.read_manifest()["segments"][0]["id"]
+
+    index.update({"a.md": _chunks("a.md", "edited text about payouts")})
+    index.update({"a.md": original})
+    manifest = index.read_manifest()
+    assert [e["id"] for e in manifest["segments"]].count(first) == 1
+    assert first not in manifest["tombstones"]
+    assert _sources(index.snapshot, "refunds") == ["a.md"]
+    assert _sources(index.snapshot, "payouts") == []
+
+
+def test_filters_mask_chunks_before_scoring(index):
+    index.update(
+        {
+            "guest.md": _chunks("guest.md", "refund rules", audience="guest"),
+            "host.md": _chunks("host.md", "refund for hosts", audience="host"),
+            "all.md": _chunks("all.md", "refund faq", kind="policy"),
+        }
+    )
+    snapshot = index.snapshot
+    assert _sources(snapshot, "refund", filters={"audience": ["guest"]}) == [
+        "all.md",
+        "guest.md",
+    ]
+    assert _sources(snapshot, "refund", filters={"kind": ["policy"]}) == ["all.md"]
+    assert _sources(
+        snapshot, "refund", filters={"audience": ["host"], "kind": ["policy"]}
+    ) == ["all.md"]
+    assert snapshot.search("refund", 5, {"source": ["missing.md"]}) == []
+
+
+def _fake_urlopen(primary, tamper=None):
+    """urlopen serving primary's /manifest and /segments/<name>"""
+
+    def urlopen(url, timeout=None):
+        path = url.split("://", 1)[-1].split("/", 1)[1]
+        if path == "manifest":
+            return io.BytesIO(json.dumps(primary.read_manifest()).encode())
+        name = path.removeprefix("segments/")
+        data = primary.segment_bytes(name)
+        if name == tamper:
+            data = gzip.compress(gzip.decompress(data) + b" ")
+        return io.BytesIO(data)
+
+    return urlopen
+
+
+def test_replica_pull_downloads_only_new_segments(tmp_path, index, monkeypatch):
+    index.update({"a.md": _chunks("a.md", "refund rules")})
+    replica = retrieval.Index(str(tmp_path / "replica"), root=str(tmp_path))
+    monkeypatch.setattr(retrieval, "urlopen", _fake_urlopen(index))
+
+    stats = replica.pull("http://primary")
+    assert (stats["downloaded"], stats["reused"]) == (1, 0)
+    assert replica.pull("http://primary") is None
+
+    index.update({"b.md": _chunks("b.md", "payout timing")})
+    stats = replica.pull("http://primary")
+    assert (stats["downloaded"], stats["reused"]) == (1, 1)
+    assert replica.read_manifest() == index.read_manifest()
+    assert _sources(replica.snapshot, "payout") == ["b.md"]
+
+
+def test_replica_rejects_a_segment_that_fails_its_hash(tmp_path, index, monkeypatch):
+    index.update({"a.md": _chunks("a.md", "refund rules")})
+    replica = retrieval.Index(str(tmp_path / "replica"), root=str(tmp_path))
+    name = f"{index.read_manifest()['segments'][0]['id']}.seg"
+    monkeypatch.setattr(retrieval, "urlopen", _fake_urlopen(index, tamper=name))
+
+    with pytest.raises(ValueError, match="doesn't match its hash"):
+        replica.pull("http://primary")
+    assert replica.read_manifest()["generation"] == 0
+    assert not os.path.exists(os.path.join(replica.segment_dir, name))
+
+
+def test_segment_bytes_only_serves_live_files(index):
+    index.update({"a.md": _chunks("a.md", "refund rules")})
+    name = f"{index.read_manifest()['segments'][0]['id']}.seg"
+    assert index.segment_bytes(name)
+    assert index.segment_bytes("../manifest.json") is None
+    assert index.segment_bytes("0123456789abcdef.seg") is None
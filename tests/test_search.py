@@ -0,0 +1,93 @@
+import random
+import re
+
+import pytest
+
+from homyhive import search
+
+WORDS = "goa lake villa cozy beach hut fort palace tea estate snow".split()
+
+
+@pytest.fixture
+def listings():
+    rng = random.Random(5)
+    return [
+        {
+            "_id": {"$oid": f"{number:024x}"},
+            "title": " ".join(rng.sample(WORDS, 2)).title(),
+            "description": " ".join(rng.sample(WORDS, 4)),
+            "location": rng.choice(["Goa", "Manali", "Ooty"]),
+            "country": "India",
+            "category": rng.choice(search.CATEGORIES[:6] + ["unknown"]),
+            "price": rng.randrange(500, 10000),
+            "guests": str(rng.randrange(1, 9)),
+            "host": f"host{number % 4}",
+        }
+        for number in range(400)
+    ]
+
+
+def _expected(listings, hidden, text=None, low=None, high=None, guests=None):
+    found = []
+    for listing in listings:
+        fields = [listing[f].lower() for f in search.TEXT_FIELDS]
+        if listing["host"] in hidden:
+            continue
+        if text is not None and not any(text(field) for field in fields):
+            continue
+        if low is not None and listing["price"] < low:
+            continue
+        if high is not None and listing["price"] > high:
+            continue
+        if guests is not None and int(listing["guests"]) < guests:
+            continue
+        found.append(listing)
+    return found
+
+
+@pytest.mark.parametrize(
+    "params, text",
+    [
+        ({"search": "lake"}, lambda field: "lake" in field),
+        ({"search": "Go"}, lambda field: "go" in field),
+        ({"search": "a v"}, lambda field: "a v" in field),
+        ({"search": "^tea"}, lambda field: re.search("^tea", field)),
+        ({"search": "nowhere"}, lambda field: False),
+    ],
+)
+def test_query_matches_a_scan(listings, params, text):
+    hosts = {"host0": "approved", "host1": "pending"}
+    index = search.ListingIndex(listings, hosts)
+    params = dict(params, minPrice="1000", maxPrice="8000", guests="3")
+    result = index.query(params)
+    expected = _expected(listings, {"host1"}, text, 1000, 8000, 3)
+    assert sorted(result["ids"]) == sorted(
+        listing["_id"]["$oid"] for listing in expected
+    )
+
+    facets = {}
+    for listing in expected:
+        if listing["category"] in search.CATEGORIES:
+            facets[listing["category"]] = facets.get(listing["category"], 0) + 1
+    assert result["facets"] == facets
+
+    # Picking a category narrows the ids but not the facets
+    if facets:
+        category = max(facets, key=facets.get)
+        narrowed = index.query(dict(params, category=category))
+        assert narrowed["total"] == facets[category]
+        assert narrowed["facets"] == facets
+
+
+def test_sorts_by_price(listings):
+    index = search.ListingIndex(listings)
+    prices = {listing["_id"]["$oid"]: listing["price"] for listing in listings}
+    ids = index.query({"sortBy": "price-high"})["ids"]
+    assert [prices[i] for i in ids] == sorted(prices.values(), reverse=True)
+
+
+def test_js_int_reads_query_parameters_like_the_controller():
+    assert search.js_int("42abc") is None
+    assert search.js_int(" 42 ") == 42
+    assert search.js_int("4.9") == 4
+    assert search.js_int("") is None
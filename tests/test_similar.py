@@ -0,0 +1,105 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from homyhive import search, similar
+
+WORDS = (
+    "cozy bright quiet spacious rustic modern heritage garden terrace lake"
+    " forest beach sunset mountain pool villa cottage loft studio cabin"
+).split()
+PLACES = [
+    ("Goa", "India"),
+    ("Manali", "India"),
+    ("Coorg", "India"),
+    ("Bali", "Indonesia"),
+]
+
+
+def _listing(rng, number):
+    location, country = rng.choice(PLACES)
+    return {
+        "_id": {"$oid": f"{number:024x}"},
+        "title": " ".join(rng.sample(WORDS, 3)),
+        "description": " ".join(rng.sample(WORDS, 8)),
+        "category": rng.choice(search.CATEGORIES),
+        "price": rng.randrange(800, 20000),
+        "location": location,
+        "country": country,
+        "geometry": {
+            "type": "Point",
+            "coordinates": [rng.uniform(72, 90), rng.uniform(8, 30)],
+        },
+    }
+
+
+def _write(export_dir, listings):
+    with open(export_dir / "listings.jsonl", "w", encoding="utf-8") as handle:
+        for listing in listings:
+            handle.write(json.dumps(listing) + "\n")
+
+
+def _assert_same_table(incremental, full):
+    a, b = similar.read_table(incremental), similar.read_table(full)
+    assert a["ids"] == b["ids"]
+    assert a["digests"] == b["digests"]
+    np.testing.assert_allclose(a["scores"], b["scores"], rtol=0, atol=1e-5)
+    # Neighbours only differ where two candidates score the same
+    differs = a["columns"] != b["columns"]
+    assert np.allclose(a["scores"][differs], b["scores"][differs], atol=1e-5)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_incremental_run_matches_full_run(tmp_path, seed):
+    rng = random.Random(seed)
+    listings = [_listing(rng, n) for n in range(300)]
+    export_dir = tmp_path / "exports"
+    export_dir.mkdir()
+    _write(export_dir, listings)
+    incremental = str(tmp_path / "incremental.bin")
+    similar.build(str(export_dir), incremental, k=8)
+
+    # Edit, delete and add listings, then catch up incrementally
+    for listing in rng.sample(listings, 15):
+        listing["price"] = rng.randrange(800, 20000)
+        listing["title"] = " ".join(rng.sample(WORDS, 3))
+    for listing in rng.sample(listings, 10):
+        listings.remove(listing)
+    listings += [_listing(rng, n) for n in range(300, 320)]
+    rng.shuffle(listings)
+    _write(export_dir, listings)
+
+    stats = similar.build(str(export_dir), incremental, k=8)
+    assert stats["modified"] == 35
+    assert stats["recomputed"] < len(listings)
+
+    full = str(tmp_path / "full.bin")
+    similar.build(str(export_dir), full, k=8, full=True)
+    _assert_same_table(incremental, full)
+
+
+def test_unchanged_rerun_recomputes_nothing(tmp_path):
+    rng = random.Random(9)
+    _write(tmp_path, [_listing(rng, n) for n in range(50)])
+    output = str(tmp_path / "neighbours.bin")
+    similar.build(str(tmp_path), output, k=5)
+    stats = similar.build(str(tmp_path), output, k=5)
+    assert (stats["modified"], stats["recomputed"]) == (0, 0)
+
+
+def test_neighbours_are_most_similar_first(tmp_path):
+    rng = random.Random(4)
+    listings = [_listing(rng, n) for n in range(40)]
+    twin = dict(listings[0], _id={"$oid": f"{999:024x}"})
+    _write(tmp_path, listings + [twin])
+    output = str(tmp_path / "neighbours.bin")
+    similar.build(str(tmp_path), output, k=5)
+
+    table = similar.NeighbourTable(output)
+    found = table.similar(f"{0:024x}")
+    assert found[0] == (f"{999:024x}", pytest.approx(1.0, abs=1e-5))
+    scores = [score for _, score in found]
+    assert scores == sorted(scores, reverse=True)
+    assert all(listing_id != f"{0:024x}" for listing_id, _ in found)
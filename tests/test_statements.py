@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from homyhive import statements
+
+
+def _write(export_dir, collection, records):
+    path = export_dir / f"{collection}.jsonl"
+    path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+
+
+def _oid(number):
+    return {"$oid": f"{number:024x}"}
+
+
+def _date(day):
+    return {"$date": f"2025-03-{day:02d}T12:00:00Z"}
+
+
+@pytest.fixture
+def exports(tmp_path):
+    _write(tmp_path, "users", [{"_id": _oid(1), "username": "asha"}])
+    _write(
+        tmp_path,
+        "listings",
+        [
+            {"_id": _oid(10), "owner": _oid(1), "title": "Lake hut", "reviews": []},
+            {"_id": _oid(11), "owner": _oid(1), "title": "Tea estate"},
+            {"_id": _oid(12), "owner": _oid(2), "title": "Fort room"},
+        ],
+    )
+    booking = {
+        "listing": _oid(10),
+        "checkIn": _date(3),
+        "checkOut": _date(5),
+        "createdAt": _date(1),
+        "totalAmount": 1120,
+        "platformFee": 120,
+        "hostAmount": 1000,
+    }
+    _write(
+        tmp_path,
+        "bookings",
+        [
+            booking,
+            dict(booking, bookingStatus="cancelled"),
+            dict(booking, createdAt={"$date": "2025-04-01T00:00:00Z"}),
+        ],
+    )
+    promotion = {"listing": _oid(11), "amount": 500, "createdAt": _date(2)}
+    _write(
+        tmp_path,
+        "promotions",
+        [
+            dict(promotion, paymentStatus="completed"),
+            dict(promotion, paymentStatus="failed"),
+            dict(promotion, listing=_oid(12), paymentStatus="completed"),
+        ],
+    )
+    return statements.Exports(str(tmp_path))
+
+
+def test_aggregate_groups_the_month_per_host(exports):
+    asha, other = statements.aggregate(exports, "2025-03")
+    assert (asha["name"], asha["bookings"], asha["nights"]) == ("asha", 1, 2)
+    assert (asha["gross"], asha["fees"], asha["payout"]) == (1120.0, 120.0, 1000.0)
+    # Only completed promotions count
+    assert asha["promotions"] == 500.0
+    assert [row["title"] for row in asha["listings"]] == ["Lake hut", "Tea estate"]
+    assert (other["host"], other["bookings"], other["promotions"]) == (
+        f"{2:024x}",
+        0,
+        500.0,
+    )
+
+
+def test_statement_hash_tracks_the_figures(exports):
+    first, _ = statements.aggregate(exports, "2025-03")
+    again, _ = statements.aggregate(exports, "2025-03")
+    assert statements.statement_hash(first) == statements.statement_hash(again)
+    assert statements.statement_hash(first) != statements.statement_hash(
+        dict(first, payout=0)
+    )
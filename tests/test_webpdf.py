@@ -0,0 +1,34 @@
+import gzip
+
+import generate_privacy_pdf
+import pytest
+
+from homyhive import webpdf
+
+
+def test_precompress_writes_variants_that_pay_off(tmp_path):
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"privacy " * 1000)
+    written = webpdf.precompress(str(path), encoders={"gzip"})
+    assert written == [str(path) + ".gz"]
+    assert gzip.decompress((tmp_path / "big.txt.gz").read_bytes()) == path.read_bytes()
+    assert webpdf.precompress(str(path), encoders={"gzip"}) == written
+
+    # Incompressible bytes drop the stale variant
+    path.write_bytes(bytes(range(256)))
+    assert webpdf.precompress(str(path), encoders={"gzip"}) == []
+    assert webpdf.variants(str(path)) == []
+
+
+def test_linearized_pdf_is_reproducible(tmp_path, monkeypatch):
+    pikepdf = pytest.importorskip("pikepdf")
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    outputs = []
+    for name in ("a.pdf", "b.pdf"):
+        path = str(tmp_path / name)
+        generate_privacy_pdf.create_privacy_pdf(path, deterministic=True)
+        assert webpdf.linearize(path)
+        outputs.append(open(path, "rb").read())
+    assert outputs[0] == outputs[1]
+    with pikepdf.open(tmp_path / "a.pdf") as pdf:
+        assert pdf.is_linearized
@@ -0,0 +1,36 @@
+// utils/assets.js
+// Resolves static asset URLs to the fingerprinted copies written by
+// `python -m homyhive assets`, falling back to the original path
+const fs = require("fs");
+const path = require("path");
+
+const MANIFEST_PATH = path.join(
+  __dirname,
+  "..",
+  "public",
+  "dist",
+  "manifest.json",
+);
+
+let cached = { mtimeMs: 0, assets: {} };
+
+// Re-read the manifest only when the build has rewritten it
+function loadManifest() {
+  try {
+    const { mtimeMs } = fs.statSync(MANIFEST_PATH);
+    if (mtimeMs !== cached.mtimeMs) {
+      const manifest = JSON.parse(fs.readFileSync(MANIFEST_PATH, "utf8"));
+      cached = { mtimeMs, assets: manifest.assets || {} };
+    }
+  } catch {
+    cached = { mtimeMs: 0, assets: {} };
+  }
+  return cached.assets;
+}
+
+// "/css/style.css" -> "/dist/css/style.<hash>.css" once the build has run
+function asset(url) {
+  return loadManifest()[url] || url;
+}
+
+module.exports = { asset };
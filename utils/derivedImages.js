@@ -0,0 +1,49 @@
+// utils/derivedImages.js
+// Looks up the review thumbnails written by `python -m homyhive images`.
+// Only local uploads under public/uploads have them; ImgBB-hosted documents
+// (all current uploads) aren't processed, so they resolve to null.
+const fs = require("fs");
+const path = require("path");
+
+// Outside public/ so the list of uploaded documents is never served
+const MANIFEST_PATH = path.join(
+  __dirname,
+  "..",
+  "build",
+  "images",
+  "manifest.json",
+);
+
+let cached = { mtimeMs: 0, entries: {} };
+
+// Re-read the manifest only when the pipeline has rewritten it
+function loadManifest() {
+  try {
+    const { mtimeMs } = fs.statSync(MANIFEST_PATH);
+    if (mtimeMs !== cached.mtimeMs) {
+      cached = {
+        mtimeMs,
+        entries: JSON.parse(fs.readFileSync(MANIFEST_PATH, "utf8")),
+      };
+    }
+  } catch {
+    cached = { mtimeMs: 0, entries: {} };
+  }
+  return cached.entries;
+}
+
+// Stored paths look like "public/uploads/..." or are remote (ImgBB) URLs
+function publicUrl(storedPath) {
+  if (!storedPath) return null;
+  if (/^https?:\/\//.test(storedPath)) return storedPath;
+  return "/" + storedPath.replace(/^\/+/, "").replace(/^public\//, "");
+}
+
+// URL of a derived variant ("thumb.webp", "thumb.jpg", "review.webp"),
+// or null when the upload hasn't been processed yet
+function derivedImage(storedPath, variant = "thumb.webp") {
+  const entry = loadManifest()[publicUrl(storedPath)];
+  return (entry && entry.variants[variant]) || null;
+}
+
+module.exports = { derivedImage, publicUrl };
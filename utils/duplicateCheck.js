@@ -0,0 +1,37 @@
+// utils/duplicateCheck.js
+// Asks the perceptual-hash service (`python -m homyhive phash serve`) whether
+// an uploaded ID image is a near-duplicate of one already on file, and
+// records it under `key` for future checks. `key` names this one upload
+// (host, field and uploaded URL), so earlier uploads to the same slot stay on
+// file and are matched too. Disabled unless PHASH_SERVICE_URL is set; any
+// failure just means "no answer".
+const fetch = global.fetch || require("node-fetch");
+
+const PHASH_SERVICE_URL = process.env.PHASH_SERVICE_URL;
+const TIMEOUT_MS = 2000;
+
+async function checkDuplicate(file, key) {
+  if (!PHASH_SERVICE_URL || !file?.buffer) return null;
+  try {
+    const response = await fetch(
+      `${PHASH_SERVICE_URL}/check?key=${encodeURIComponent(key)}&add=1`,
+      {
+        method: "POST",
+        headers: { "Content-Type": file.mimetype || "application/octet-stream" },
+        body: file.buffer,
+        signal: AbortSignal.timeout(TIMEOUT_MS),
+      },
+    );
+    if (!response.ok) return null;
+    const result = await response.json();
+    return {
+      perceptualHash: result.hash,
+      possibleDuplicateOf: result.matches.map((m) => m.key),
+    };
+  } catch (err) {
+    console.error("Duplicate check failed:", err.message);
+    return null;
+  }
+}
+
+module.exports = { checkDuplicate };
@@ -0,0 +1,140 @@
+// utils/intentRouter.js
+// Routes navigational chat messages ("my bookings", "open my wishlist") to
+// the page that answers them, using the router compiled by
+// `python -m homyhive intents` (build/intents/router.json, or
+// INTENT_ROUTER_PATH): a keyword trie first, then a linear model over hashed
+// words. Resolves to { intent, href, label, reply, confidence } or to null
+// when the message is an open question or no router has been built, so the
+// caller falls through to retrieval. homyhive/intents.py documents the model.
+const fs = require("fs");
+const path = require("path");
+
+const INTENT_ROUTER_PATH =
+  process.env.INTENT_ROUTER_PATH ||
+  path.join(__dirname, "..", "build", "intents", "router.json");
+const ROUTER_VERSION = 2;
+const NONE = "none";
+// The file is checked for a new build at most this often
+const CHECK_INTERVAL_MS = 1000;
+
+let router = null;
+let loadedMtime = 0;
+let checkedAt = 0;
+
+async function loadRouter() {
+  if (Date.now() - checkedAt < CHECK_INTERVAL_MS) return router;
+  checkedAt = Date.now();
+  try {
+    const { mtimeMs } = await fs.promises.stat(INTENT_ROUTER_PATH);
+    if (mtimeMs !== loadedMtime) {
+      const parsed = JSON.parse(
+        await fs.promises.readFile(INTENT_ROUTER_PATH, "utf8"),
+      );
+      router = parsed.version === ROUTER_VERSION ? parsed : null;
+      loadedMtime = mtimeMs;
+    }
+  } catch (err) {
+    if (err.code !== "ENOENT") {
+      console.error("Intent router unavailable:", err.message);
+    }
+    router = null;
+    loadedMtime = 0;
+  }
+  return router;
+}
+
+function tokenize(text) {
+  return String(text).toLowerCase().match(/[a-z0-9]+/g) || [];
+}
+
+// 32-bit FNV-1a of the UTF-8 bytes, as in homyhive/intents.py
+function fnv1a(text) {
+  let value = 0x811c9dc5;
+  for (const byte of Buffer.from(text, "utf8")) {
+    value = Math.imul(value ^ byte, 0x01000193) >>> 0;
+  }
+  return value;
+}
+
+function keywordHits(trie, tokens) {
+  const hits = [];
+  for (let start = 0; start < tokens.length; start++) {
+    let node = trie;
+    for (let position = start; position < tokens.length; position++) {
+      node = node[tokens[position]];
+      if (!node) break;
+      if (node.$) hits.push([node.$, start, position + 1 - start]);
+    }
+  }
+  return hits;
+}
+
+function features(tokens, hits, dims) {
+  const names = [...tokens];
+  for (let i = 1; i < tokens.length; i++) {
+    names.push(`${tokens[i - 1]} ${tokens[i]}`);
+  }
+  for (const [intent] of hits) names.push(`kw:${intent}`);
+  names.push(`len:${Math.min(tokens.length, 8)}`);
+  return new Set(names.map((name) => fnv1a(name) % dims));
+}
+
+// The keyword phrase covers enough of the message and the rest is navigation
+// words ("show my trips", but not "cancel my booking")
+function isNavigational(current, tokens, hits) {
+  const covered = new Array(tokens.length).fill(false);
+  for (const [, start, length] of hits) {
+    covered.fill(true, start, start + length);
+  }
+  const longest = Math.max(...hits.map(([, , length]) => length));
+  return (
+    longest >= current.keyword_cover * tokens.length &&
+    tokens.every(
+      (token, position) =>
+        covered[position] || current.navigation_words.includes(token),
+    )
+  );
+}
+
+function classify(current, message) {
+  const tokens = tokenize(message);
+  if (!tokens.length) return null;
+  const hits = keywordHits(current.keywords, tokens);
+
+  // A message that is mostly one keyword phrase needs no model
+  if (
+    new Set(hits.map(([intent]) => intent)).size === 1 &&
+    isNavigational(current, tokens, hits)
+  ) {
+    return { name: hits[0][0], confidence: 1 };
+  }
+
+  const logits = [...current.bias];
+  for (const feature of features(tokens, hits, current.dims)) {
+    const weights = current.weights[feature];
+    if (!weights) continue;
+    for (let i = 0; i < logits.length; i++) logits[i] += weights[i];
+  }
+  const top = Math.max(...logits);
+  const exps = logits.map((logit) => Math.exp(logit - top));
+  const total = exps.reduce((sum, value) => sum + value, 0);
+  const best = exps.indexOf(Math.max(...exps));
+  const confidence = exps[best] / total;
+  const name = current.labels[best];
+  if (name === NONE || confidence < current.threshold) return null;
+  return { name, confidence };
+}
+
+async function routeIntent(message) {
+  const current = await loadRouter();
+  if (!current) return null;
+  const match = classify(current, message);
+  if (!match) return null;
+  return {
+    intent: match.name,
+    confidence: match.confidence,
+    ...current.intents[match.name],
+  };
+}
+
+module.exports = { routeIntent };
@@ -0,0 +1,42 @@
+// utils/listingSearch.js
+// Asks the listing search service
+// (`python -m homyhive search exports/ --serve`) to run the listings index
+// query, so the page doesn't need a $regex scan of the collection. Returns the
+// matching ids in display order plus the page's category counts, price stats
+// and popular locations. Disabled unless LISTING_SEARCH_URL is set; any
+// failure just means "no answer" and the caller falls back to MongoDB.
+const fetch = global.fetch || require("node-fetch");
+
+const LISTING_SEARCH_URL = process.env.LISTING_SEARCH_URL;
+const TIMEOUT_MS = 1000;
+const PARAMS = [
+  "search",
+  "category",
+  "minPrice",
+  "maxPrice",
+  "guests",
+  "sortBy",
+];
+
+async function searchListings(query) {
+  if (!LISTING_SEARCH_URL) return null;
+  const params = new URLSearchParams();
+  for (const name of PARAMS) {
+    if (typeof query[name] === "string" && query[name] !== "") {
+      params.set(name, query[name]);
+    }
+  }
+  try {
+    const response = await fetch(`${LISTING_SEARCH_URL}/search?${params}`, {
+      signal: AbortSignal.timeout(TIMEOUT_MS),
+    });
+    if (!response.ok) return null;
+    const result = await response.json();
+    return result.success ? result : null;
+  } catch (err) {
+    console.error("Listing search failed:", err.message);
+    return null;
+  }
+}
+
+module.exports = { searchListings };
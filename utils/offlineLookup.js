@@ -0,0 +1,32 @@
+// utils/offlineLookup.js
+// Looks up an IFSC or PIN code in the offline lookup service
+// (`python -m homyhive lookup serve`), which answers from compiled copies of
+// the public IFSC and pincode dumps. Resolves to { found, data } when the
+// service answered and to null when LOOKUP_SERVICE_URL isn't set or the
+// service couldn't be reached, so callers can fall back.
+const fetch = global.fetch || require("node-fetch");
+
+const LOOKUP_SERVICE_URL = process.env.LOOKUP_SERVICE_URL;
+const TIMEOUT_MS = 500;
+
+async function offlineLookup(kind, key) {
+  if (!LOOKUP_SERVICE_URL) return null;
+  try {
+    const response = await fetch(
+      `${LOOKUP_SERVICE_URL}/${kind}/${encodeURIComponent(key || "")}`,
+      { signal: AbortSignal.timeout(TIMEOUT_MS) },
+    );
+    // 400 (malformed) and 404 (unknown) are answers; anything else isn't
+    if (response.status === 400 || response.status === 404) {
+      return { found: false, data: null };
+    }
+    if (!response.ok) return null;
+    const result = await response.json();
+    return { found: true, data: result.data };
+  } catch (err) {
+    console.error("Offline lookup failed:", err.message);
+    return null;
+  }
+}
+
+module.exports = { offlineLookup };
@@ -0,0 +1,71 @@
+// utils/similarListings.js
+// Reads the neighbour table written by `python -m homyhive similar exports/`
+// (build/similar/neighbours.bin, or SIMILAR_LISTINGS_PATH) and returns the
+// ids of the listings most similar to a given one. The file is loaded once and
+// reloaded when it changes; a lookup is a Map get and k reads. Missing or
+// unreadable tables just mean "no recommendations".
+const fs = require("fs");
+const path = require("path");
+
+const SIMILAR_LISTINGS_PATH =
+  process.env.SIMILAR_LISTINGS_PATH ||
+  path.join(__dirname, "..", "build", "similar", "neighbours.bin");
+const MAGIC = "HHNEIGHB";
+const FEATURE_VERSION = 1;
+const HEADER_SIZE = 24;
+const ID_WIDTH = 24;
+
+let table = null;
+let loadedMtime = 0;
+
+function parseTable(buffer) {
+  if (buffer.toString("latin1", 0, 8) !== MAGIC) return null;
+  if (buffer.readUInt32LE(8) !== FEATURE_VERSION) return null;
+  const count = buffer.readUInt32LE(12);
+  const k = buffer.readUInt32LE(16);
+  const ids = new Array(count);
+  const rows = new Map();
+  for (let row = 0; row < count; row++) {
+    const start = HEADER_SIZE + row * ID_WIDTH;
+    ids[row] = buffer
+      .toString("latin1", start, start + ID_WIDTH)
+      .replace(/\0+$/, "");
+    rows.set(ids[row], row);
+  }
+  // Neighbour rows follow the ids and the 8-byte feature digests
+  const columns = HEADER_SIZE + count * (ID_WIDTH + 8);
+  return { buffer, ids, rows, k, columns };
+}
+
+async function loadTable() {
+  try {
+    const { mtimeMs } = await fs.promises.stat(SIMILAR_LISTINGS_PATH);
+    if (mtimeMs !== loadedMtime) {
+      table = parseTable(await fs.promises.readFile(SIMILAR_LISTINGS_PATH));
+      loadedMtime = mtimeMs;
+    }
+  } catch (err) {
+    if (err.code !== "ENOENT") {
+      console.error("Similar listings unavailable:", err.message);
+    }
+    table = null;
+    loadedMtime = 0;
+  }
+  return table;
+}
+
+async function similarListingIds(listingId, limit = 4) {
+  const current = await loadTable();
+  const row = current?.rows.get(String(listingId));
+  if (row === undefined) return [];
+  const ids = [];
+  for (let i = 0; i < current.k && ids.length < limit; i++) {
+    const offset = (row * current.k + i) * 4;
+    const column = current.buffer.readInt32LE(current.columns + offset);
+    if (column < 0) break;
+    ids.push(current.ids[column]);
+  }
+  return ids;
+}
+
+module.exports = { similarListingIds };